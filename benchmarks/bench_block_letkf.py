@@ -0,0 +1,127 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import logging
+import argparse
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import torch
+from tabulate import tabulate
+
+# Internal modules
+from py_bacy.tasks.block_letkf import BlockLETKF
+
+
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser(
+    description='Benchmark the throughput of the batched block LETKF in '
+                '`py_bacy.tasks.block_letkf` against a loop with one '
+                'weight problem per grid point.',
+)
+parser.add_argument(
+    '--n_grid', type=int, default=5000,
+    help='Number of grid points (default=5000)'
+)
+parser.add_argument(
+    '--n_obs', type=int, default=500,
+    help='Number of observations (default=500)'
+)
+parser.add_argument(
+    '--ens_mems', type=int, default=40,
+    help='Number of ensemble members (default=40)'
+)
+parser.add_argument(
+    '--loc_fraction', type=float, default=0.05,
+    help='Average fraction of locally used observations (default=0.05)'
+)
+parser.add_argument(
+    '--block_sizes', type=int, nargs='+', default=(100, 250, 1000),
+    help='Tested block sizes (default=100 250 1000)'
+)
+
+
+def create_problem(n_grid, n_obs, ens_mems, loc_fraction):
+    rnd = np.random.RandomState(42)
+    innov = torch.from_numpy(rnd.normal(size=n_obs))
+    hx_perts = rnd.normal(size=(n_obs, ens_mems))
+    hx_perts = torch.from_numpy(hx_perts - hx_perts.mean(axis=1)[:, None])
+    obs_var = torch.from_numpy(rnd.uniform(0.5, 2, size=n_obs))
+    obs_weights = rnd.uniform(size=(n_grid, n_obs))
+    obs_weights[obs_weights < 1-loc_fraction] = 0
+    back_prec = torch.eye(ens_mems, dtype=torch.float64) * (ens_mems-1)
+    return innov, hx_perts, obs_var, obs_weights, back_prec
+
+
+def loop_weights(innov, hx_perts, obs_var, obs_weights, back_prec):
+    ens_mems = hx_perts.shape[-1]
+    weights = []
+    for point_weights in obs_weights:
+        use_obs = torch.from_numpy(point_weights > 0)
+        local_prec = torch.from_numpy(point_weights)[use_obs] \
+            / obs_var[use_obs]
+        local_perts = hx_perts[use_obs]
+        prec_ana = local_perts.t() @ (local_perts * local_prec[:, None]) \
+            + back_prec
+        evals, evects = torch.linalg.eigh(prec_ana)
+        evals_inv = 1 / evals
+        cov_ana = (evects * evals_inv) @ evects.t()
+        w_mean = cov_ana @ local_perts.t() @ (local_prec * innov[use_obs])
+        w_perts = (evects * torch.sqrt((ens_mems-1) * evals_inv)) \
+            @ evects.t()
+        weights.append(w_mean[:, None] + w_perts)
+    return torch.stack(weights, dim=0).numpy()
+
+
+def main(args):
+    innov, hx_perts, obs_var, obs_weights, back_prec = create_problem(
+        args.n_grid, args.n_obs, args.ens_mems, args.loc_fraction
+    )
+    start_time = time.perf_counter()
+    ref_weights = loop_weights(
+        innov, hx_perts, obs_var, obs_weights, back_prec
+    )
+    loop_time = time.perf_counter() - start_time
+    results = [{
+        'engine': 'loop',
+        'block size': 1,
+        'grid points/s': args.n_grid / loop_time,
+        'speedup': 1.,
+        'max abs diff': 0.,
+    }]
+    for block_size in args.block_sizes:
+        block_letkf = BlockLETKF(back_prec, block_size=block_size)
+        start_time = time.perf_counter()
+        weights = block_letkf.gen_weights(
+            innov, hx_perts, obs_var, lambda grid_slice: obs_weights[
+                grid_slice
+            ], args.n_grid
+        )
+        block_time = time.perf_counter() - start_time
+        results.append({
+            'engine': 'block',
+            'block size': block_size,
+            'grid points/s': args.n_grid / block_time,
+            'speedup': loop_time / block_time,
+            'max abs diff': np.abs(weights - ref_weights).max(),
+        })
+    print(tabulate(pd.DataFrame(results), headers='keys', tablefmt='psql',
+                   showindex=False))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import logging
+import argparse
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+# Internal modules
+from py_bacy.tasks.distance import cart_dist_func, array_dist_func, \
+    coords_to_array
+
+
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser(
+    description='Benchmark the per-grid-point overhead of the tuple-based '
+                '`cart_dist_func` against the array-backed '
+                '`array_dist_func` in `py_bacy.tasks.distance`.',
+)
+parser.add_argument(
+    '--n_grid', type=int, default=5000,
+    help='Number of state grid points (default=5000)'
+)
+parser.add_argument(
+    '--n_obs', type=int, nargs='+', default=(10, 100, 1000),
+    help='Number of observations (default=10 100 1000)'
+)
+parser.add_argument(
+    '--n_repeats', type=int, default=3,
+    help='Every distance function is timed this number of times '
+         '(default=3)'
+)
+
+
+def create_grids(n_grid, n_obs):
+    rnd = np.random.RandomState(42)
+    n_rlat = int(np.sqrt(n_grid))
+    state_grid = pd.MultiIndex.from_product(
+        [np.linspace(47, 55, n_rlat),
+         np.linspace(3, 15, int(np.ceil(n_grid / n_rlat)))],
+        names=['rlat', 'rlon']
+    )[:n_grid]
+    obs_grid = pd.MultiIndex.from_arrays(
+        [rnd.uniform(47, 55, size=n_obs), rnd.uniform(3, 15, size=n_obs),
+         rnd.uniform(0, 500, size=n_obs)],
+        names=['lat', 'lon', 'height']
+    )
+    return state_grid, obs_grid
+
+
+def time_tuple_based(state_grid, obs_grid):
+    state_values = state_grid.values
+    obs_values = obs_grid.values
+    start_time = time.perf_counter()
+    distances = [cart_dist_func(x, obs_values) for x in state_values]
+    return time.perf_counter() - start_time, np.stack(distances)
+
+
+def time_array_based(state_grid, obs_grid):
+    start_time = time.perf_counter()
+    state_coords = coords_to_array(state_grid)
+    obs_coords = coords_to_array(obs_grid)
+    distances = [array_dist_func(x, obs_coords) for x in state_coords]
+    return time.perf_counter() - start_time, np.stack(distances)
+
+
+def main(args):
+    results = []
+    for n_obs in args.n_obs:
+        state_grid, obs_grid = create_grids(args.n_grid, n_obs)
+        for name, time_func in [('cart_dist_func', time_tuple_based),
+                                ('array_dist_func', time_array_based)]:
+            needed_times = []
+            for _ in range(args.n_repeats):
+                needed_time, distances = time_func(state_grid, obs_grid)
+                needed_times.append(needed_time)
+            if name == 'cart_dist_func':
+                ref_distances = distances
+            results.append({
+                'dist_func': name,
+                'n_obs': n_obs,
+                'us/grid point': np.median(needed_times) / len(state_grid)
+                                 * 1E6,
+                'max abs diff [m]': np.abs(distances - ref_distances).max(),
+            })
+    print('State grid points: {0:d}'.format(args.n_grid))
+    print(tabulate(pd.DataFrame(results), headers='keys', tablefmt='psql',
+                   showindex=False))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import logging
+import argparse
+import os
+import tempfile
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+from tabulate import tabulate
+
+# Internal modules
+from py_bacy.tasks.encoding import ENCODING_PROFILES, get_encoding
+
+
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser(
+    description='Benchmark the write time and file size of the encoding '
+                'profiles in `py_bacy.tasks.encoding`.',
+)
+parser.add_argument(
+    '--n_vars', type=int, default=5,
+    help='Number of written 3D variables (default=5)'
+)
+parser.add_argument(
+    '--grid_size', type=int, nargs=3, default=(50, 200, 200),
+    help='Size of the 3D grid as level rlat rlon (default=50 200 200)'
+)
+parser.add_argument(
+    '--n_repeats', type=int, default=3,
+    help='Every profile is written this number of times (default=3)'
+)
+parser.add_argument(
+    '--data_dir', type=str, default=None,
+    help='The files are written to this directory (default=temporary dir)'
+)
+
+
+def create_fields(n_vars, grid_size):
+    level = np.linspace(0, 1, grid_size[0])[:, None, None]
+    rlat = np.linspace(0, np.pi, grid_size[1])[None, :, None]
+    rlon = np.linspace(0, 2*np.pi, grid_size[2])[None, None, :]
+    smooth_field = 280 - 60 * level + 5 * np.sin(rlat) * np.cos(rlon)
+    ds = xr.Dataset(
+        {
+            'var_{0:02d}'.format(var_num): (
+                ('time', 'level', 'rlat', 'rlon'),
+                (smooth_field + np.random.normal(
+                    scale=0.5, size=grid_size
+                ))[None, ...].astype(np.float32)
+            )
+            for var_num in range(n_vars)
+        },
+        coords={'time': pd.date_range('2015-07-31 06:00', periods=1)}
+    )
+    return ds
+
+
+def main(args):
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    ds = create_fields(args.n_vars, args.grid_size)
+    raw_size = sum(var.nbytes for var in ds.data_vars.values())
+    results = []
+    for profile in ENCODING_PROFILES.keys():
+        file_path = os.path.join(data_dir, 'fields_{0:s}.nc'.format(profile))
+        encoding = get_encoding(ds, profile)
+        needed_times = []
+        for _ in range(args.n_repeats):
+            start_time = time.perf_counter()
+            ds.to_netcdf(file_path, encoding=encoding)
+            needed_times.append(time.perf_counter() - start_time)
+        file_size = os.path.getsize(file_path)
+        with xr.open_dataset(file_path) as ds_read:
+            max_error = max(
+                float(np.abs(ds_read[var] - ds[var]).max())
+                for var in ds.data_vars
+            )
+        results.append({
+            'profile': profile,
+            'time [s]': np.median(needed_times),
+            'MB/s': raw_size / np.median(needed_times) / 1024**2,
+            'file size [MB]': file_size / 1024**2,
+            'ratio': raw_size / file_size,
+            'max abs error': max_error,
+        })
+        os.remove(file_path)
+    print('Raw field size: {0:.2f} MB'.format(raw_size / 1024**2))
+    print(tabulate(pd.DataFrame(results), headers='keys', tablefmt='psql',
+                   showindex=False))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,123 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import logging
+import argparse
+import os
+import tempfile
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+from distributed import Client, LocalCluster
+from tabulate import tabulate
+
+# Internal modules
+from py_bacy.tasks.io import load_ens_data
+
+
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser(
+    description='Benchmark the time to open an ensemble of NetCDF-files '
+                'with `py_bacy.tasks.io.load_ens_data`.',
+)
+parser.add_argument(
+    '--ens_sizes', type=int, nargs='+', default=(10, 20, 40, 80),
+    help='Ensemble sizes that are benchmarked (default=10 20 40 80)'
+)
+parser.add_argument(
+    '--n_files', type=int, default=6,
+    help='Number of files per ensemble member (default=6)'
+)
+parser.add_argument(
+    '--n_vars', type=int, default=20,
+    help='Number of variables per file (default=20)'
+)
+parser.add_argument(
+    '--n_workers', type=int, default=4,
+    help='Number of workers for the distributed client (default=4)'
+)
+parser.add_argument(
+    '--data_dir', type=str, default=None,
+    help='The synthetic ensemble is stored in this directory, which should '
+         'be on the file system that is benchmarked (default=temporary dir)'
+)
+
+
+def create_member_files(mem_dir, n_files, n_vars):
+    os.makedirs(mem_dir, exist_ok=True)
+    file_paths = []
+    for file_num in range(n_files):
+        ds = xr.Dataset(
+            {
+                'var_{0:02d}'.format(var_num): (
+                    ('time', 'level', 'rlat', 'rlon'),
+                    np.random.normal(size=(1, 10, 32, 32)).astype(np.float32)
+                )
+                for var_num in range(n_vars)
+            },
+            coords={
+                'time': pd.date_range('2015-07-31 06:00', periods=1) +
+                pd.Timedelta(minutes=10*file_num)
+            }
+        )
+        file_path = os.path.join(mem_dir, 'lfff{0:08d}.nc'.format(file_num))
+        ds.to_netcdf(file_path)
+        file_paths.append(file_path)
+    return file_paths
+
+
+def time_loading(file_paths, client=None, parallel=True):
+    start_time = time.perf_counter()
+    ds_ens = load_ens_data.run(
+        file_paths=file_paths, client=client, parallel=parallel
+    )
+    needed_time = time.perf_counter() - start_time
+    ds_ens.close()
+    return needed_time
+
+
+def main(args):
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    cluster = LocalCluster(n_workers=args.n_workers, threads_per_worker=1)
+    client = Client(cluster)
+    results = []
+    all_paths = [
+        create_member_files(
+            os.path.join(data_dir, 'ens{0:03d}'.format(mem)),
+            args.n_files, args.n_vars
+        )
+        for mem in range(1, max(args.ens_sizes)+1)
+    ]
+    for ens_size in args.ens_sizes:
+        file_paths = all_paths[:ens_size]
+        results.append({
+            'ensemble': ens_size,
+            'serial [s]': time_loading(file_paths, parallel=False),
+            'threads [s]': time_loading(file_paths, parallel=True),
+            'client [s]': time_loading(
+                file_paths, client=client, parallel=True
+            ),
+        })
+    client.close()
+    cluster.close()
+    print(tabulate(pd.DataFrame(results), headers='keys', tablefmt='psql',
+                   showindex=False))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import logging
+import argparse
+import os
+import tempfile
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+from tabulate import tabulate
+
+# Internal modules
+from py_bacy.tasks.io import write_single_ens_mem, WRITE_STRATEGIES
+
+
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser(
+    description='Benchmark the throughput of the analysis write strategies '
+                'in `py_bacy.tasks.io.write_single_ens_mem`.',
+)
+parser.add_argument(
+    '--ens_size', type=int, default=10,
+    help='Number of written ensemble members (default=10)'
+)
+parser.add_argument(
+    '--n_vars', type=int, default=30,
+    help='Number of 3D variables within the background file (default=30)'
+)
+parser.add_argument(
+    '--n_assim_vars', type=int, default=3,
+    help='Number of variables that are changed by the analysis (default=3)'
+)
+parser.add_argument(
+    '--grid_size', type=int, nargs=3, default=(50, 200, 200),
+    help='Size of the 3D grid as level rlat rlon (default=50 200 200)'
+)
+parser.add_argument(
+    '--data_dir', type=str, default=None,
+    help='The files are written to this directory, which should be on the '
+         'file system that is benchmarked (default=temporary dir)'
+)
+
+
+def create_background(file_path, n_vars, grid_size):
+    ds = xr.Dataset(
+        {
+            'var_{0:02d}'.format(var_num): (
+                ('time', 'level', 'rlat', 'rlon'),
+                np.random.normal(size=(1, *grid_size)).astype(np.float32)
+            )
+            for var_num in range(n_vars)
+        },
+        coords={'time': pd.date_range('2015-07-31 06:00', periods=1)}
+    )
+    ds.to_netcdf(file_path)
+    return ds
+
+
+def get_disk_usage(file_path):
+    return os.stat(file_path).st_blocks * 512
+
+
+def main(args):
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    source_path = os.path.join(data_dir, 'laf_background.nc')
+    ds_bg = create_background(source_path, args.n_vars, args.grid_size)
+    assim_vars = list(ds_bg.data_vars)[:args.n_assim_vars]
+    ds_analysis = ds_bg[assim_vars] + 1
+    file_size = os.path.getsize(source_path)
+    results = []
+    for strategy in WRITE_STRATEGIES:
+        target_paths = [
+            os.path.join(data_dir, 'laf_{0:s}_{1:03d}.nc'.format(strategy, mem))
+            for mem in range(args.ens_size)
+        ]
+        start_time = time.perf_counter()
+        for target_path in target_paths:
+            write_single_ens_mem(
+                source_path, target_path, ds_analysis, assim_vars,
+                strategy=strategy
+            )
+        needed_time = time.perf_counter() - start_time
+        disk_usage = sum(get_disk_usage(path) for path in target_paths)
+        results.append({
+            'strategy': strategy,
+            'time [s]': needed_time,
+            'members/s': args.ens_size / needed_time,
+            'logical MB/s': args.ens_size * file_size / needed_time / 1024**2,
+            'disk usage [MB]': disk_usage / 1024**2,
+        })
+        for target_path in target_paths:
+            os.remove(target_path)
+    os.remove(source_path)
+    print('Background file size: {0:.2f} MB'.format(file_size / 1024**2))
+    print(tabulate(pd.DataFrame(results), headers='keys', tablefmt='psql',
+                   showindex=False))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
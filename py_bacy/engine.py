@@ -11,6 +11,7 @@
 
 
 # System modules
+from typing import Union
 import logging
 
 # External modules
@@ -21,20 +22,42 @@ import pandas as pd
 
 # Internal modules
 from .tasks.general import config_reader
+from .tasks.static_cache import STATIC_CACHE
 
 
 logger = logging.getLogger(__name__)
 
 
 class CyclingEngine(object):
+    """
+    The cycling engine runs a given flow for every cycle between the start
+    and end time of the cycle configuration.
+    Static data, like station lists and constant fields, are cached by
+    :py:data:`~py_bacy.tasks.static_cache.STATIC_CACHE` as long as the engine
+    is running.
+
+    Parameters
+    ----------
+    flow : prefect.Flow
+        This flow is run for every cycle.
+    cycle_config_path : str
+        The path to the cycle configuration.
+    static_cache_dir : None or str, optional
+        The decoded static data is persisted within this directory and can be
+        shared between engines. If None (default), the directory is taken
+        from `EXPERIMENT: static_cache_dir` in the cycle configuration and
+        static data is only cached in memory if this is not set.
+    """
     def __init__(
             self,
             flow: Flow,
-            cycle_config_path: str
+            cycle_config_path: str,
+            static_cache_dir: Union[None, str] = None
     ):
         self._config = None
         self.flow = flow
         self.cycle_config_path = cycle_config_path
+        self.static_cache_dir = static_cache_dir
 
     @property
     def config(self):
@@ -57,6 +80,11 @@ class CyclingEngine(object):
         return flow_state
 
     def start(self):
+        if self.static_cache_dir is None:
+            self.static_cache_dir = self.config.get(
+                'EXPERIMENT', {}
+            ).get('static_cache_dir', None)
+        STATIC_CACHE.persist_dir = self.static_cache_dir
         curr_time = pd.to_datetime(
             self.config['TIME']['start_time'],
             format=self.config['TIME']['time_format']
@@ -104,4 +132,5 @@ class CyclingEngine(object):
                     analysis_time.strftime('%Y-%m-%d %H:%Mz'),
                     run_end_time.strftime('%Y-%m-%d %H:%Mz'),
                 ))
+            STATIC_CACHE.log_stats(logger)
             curr_time = analysis_time
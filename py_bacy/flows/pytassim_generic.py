@@ -12,7 +12,7 @@
 
 # System modules
 import logging
-from typing import Union
+from typing import Dict, Tuple, Union
 import os.path
 
 # External modules
@@ -33,6 +33,113 @@ from py_bacy.tasks.pytassim.diagnostics import *
 logger = logging.getLogger(__name__)
 
 
+def _initialize_cluster(cycle_config: Parameter) -> Tuple[Task, Task]:
+    cluster_mode = get_cluster_mode(cycle_config)
+    with case(cluster_mode, 'slurm'):
+        slurm_client, slurm_cluster = initialize_slurm_cluster(cycle_config)
+    with case(cluster_mode, 'local'):
+        local_client, local_cluster = initialize_local_cluster(cycle_config)
+    with case(cluster_mode, None):
+        no_client = no_cluster = Constant(None)
+    client = merge(slurm_client, local_client, no_client)
+    cluster = merge(slurm_cluster, local_cluster, no_cluster)
+    return client, cluster
+
+
+def _prepare_model_dirs(
+        name: Union[str, Parameter],
+        start_time: Parameter,
+        cycle_config: Parameter,
+        parent_model_name: Parameter,
+        ens_suffix: Task
+) -> Tuple[Task, Task, Task, Task]:
+    run_dir = construct_rundir(
+        name=name,
+        time=start_time,
+        cycle_config=cycle_config
+    )
+    zipped_directories = create_directory_structure.map(
+        directories=unmapped(('input', 'output')),
+        run_dir=unmapped(run_dir),
+        ens_suffix=ens_suffix
+    )
+    input_dirs, output_dirs = unzip_mapped_result(
+        zipped_directories, task_args=dict(nout=2)
+    )
+    parent_dirs = get_parent_output.map(
+        cycle_config=unmapped(cycle_config),
+        run_dir=unmapped(run_dir),
+        ens_suffix=ens_suffix,
+        parent_model_name=unmapped(parent_model_name),
+    )
+    return run_dir, input_dirs, output_dirs, parent_dirs
+
+
+def _output_analysis(
+        analysis: Task,
+        model_dataset: Task,
+        linked_bg_files: Task,
+        output_dirs: Task,
+        ens_suffix: Task,
+        analysis_time: Parameter,
+        assim_config: Task,
+        cycle_config: Parameter,
+        client: Task,
+        post_process_analysis: Task,
+        write_analysis: Task,
+        stream_analysis: Union[Task, None] = None,
+) -> Task:
+    path_join = FunctionTask(
+        lambda prefix, suffix: os.path.join(prefix, suffix)
+    )
+    if stream_analysis is None:
+        analysis_dataset = post_process_analysis(
+            analysis=analysis,
+            model_dataset=model_dataset
+        )
+        output_files, written_analysis = write_analysis(
+            analysis=analysis_dataset,
+            background_files=linked_bg_files,
+            output_dirs=output_dirs,
+            analysis_time=analysis_time,
+            assim_config=assim_config,
+            cycle_config=cycle_config,
+            client=client
+        )
+        analysis_dir = construct_rundir(
+            name='analysis',
+            time=analysis_time,
+            cycle_config=cycle_config,
+            upstream_tasks=[written_analysis]
+        )
+        analysis_dirs = path_join.map(unmapped(analysis_dir), ens_suffix)
+        analysis_dirs = create_folders.map(dir_path=analysis_dirs)
+        linked_analysis = link_analysis.map(
+            output_file=output_files,
+            analysis_folder=analysis_dirs,
+        )
+    else:
+        analysis_dir = construct_rundir(
+            name='analysis',
+            time=analysis_time,
+            cycle_config=cycle_config
+        )
+        analysis_dirs = path_join.map(unmapped(analysis_dir), ens_suffix)
+        analysis_dirs = create_folders.map(dir_path=analysis_dirs)
+        output_files, linked_analysis = stream_analysis(
+            analysis=analysis,
+            model_dataset=model_dataset,
+            background_files=linked_bg_files,
+            output_dirs=output_dirs,
+            analysis_dirs=analysis_dirs,
+            analysis_time=analysis_time,
+            assim_config=assim_config,
+            cycle_config=cycle_config,
+            client=client
+        )
+    return linked_analysis
+
+
 def get_pytassim_flow(
         link_background: Task,
         link_first_guess: Task,
@@ -43,6 +150,7 @@ def get_pytassim_flow(
         post_process_analysis: Task,
         write_analysis: Task,
         post_process_obs: Union[Task, None] = None,
+        stream_analysis: Union[Task, None] = None,
 ):
     if post_process_obs is None:
         post_process_obs = default_post_process_obs
@@ -56,39 +164,18 @@ def get_pytassim_flow(
         name = Parameter('name')
         use_fg = Parameter('use_fg', default=True)
         parent_model_name = Parameter('parent_model_name', default=None)
-    
+
         pytassim_config = config_reader(config_path)
-        run_dir = construct_rundir(
-            name=name,
-            time=start_time,
-            cycle_config=cycle_config
-        )
-    
         ens_suffix, ens_range = construct_ensemble(cycle_config=cycle_config)
-        zipped_directories = create_directory_structure.map(
-            directories=unmapped(('input', 'output')),
-            run_dir=unmapped(run_dir),
+        run_dir, input_dirs, output_dirs, parent_dirs = _prepare_model_dirs(
+            name=name,
+            start_time=start_time,
+            cycle_config=cycle_config,
+            parent_model_name=parent_model_name,
             ens_suffix=ens_suffix
         )
-        input_dirs, output_dirs = unzip_mapped_result(
-            zipped_directories, task_args=dict(nout=2)
-        )
-        parent_dirs = get_parent_output.map(
-            cycle_config=unmapped(cycle_config),
-            run_dir=unmapped(run_dir),
-            ens_suffix=ens_suffix,
-            parent_model_name=unmapped(parent_model_name),
-        )
-    
-        cluster_mode = get_cluster_mode(cycle_config)
-        with case(cluster_mode, 'slurm'):
-            slurm_client, slurm_cluster = initialize_slurm_cluster(cycle_config)
-        with case(cluster_mode, 'local'):
-            local_client, local_cluster = initialize_local_cluster(cycle_config)
-        with case(cluster_mode, None):
-            no_client = no_cluster = Constant(None)
-        client = merge(slurm_client, local_client, no_client)
-        cluster = merge(slurm_cluster, local_cluster, no_cluster)
+
+        client, cluster = _initialize_cluster(cycle_config)
 
         assimilation = initialize_assimilation(
             start_time=start_time,
@@ -152,6 +239,26 @@ def get_pytassim_flow(
             first_guess=first_guess
         )
 
+        observations = superob_obs(
+            observations=observations,
+            assim_config=pytassim_config
+        )
+
+        observations = background_check_obs(
+            observations=observations,
+            first_guess=first_guess,
+            assim_config=pytassim_config,
+            run_dir=run_dir,
+            analysis_time=analysis_time,
+            upstream_tasks=[output_dirs]
+        )
+
+        observations = temporal_localize_obs(
+            observations=observations,
+            assim_config=pytassim_config,
+            analysis_time=analysis_time
+        )
+
         # obs_diagnostics = info_observations(
         #     first_guess=first_guess,
         #     observations=observations,
@@ -159,57 +266,272 @@ def get_pytassim_flow(
         #     client=client,
         # )
 
-        analysis = assimilate(
-            assimilation=assimilation,
-            background=background,
-            observations=observations,
-            first_guess=first_guess,
+        weight_interp_mode = uses_weight_interp(assim_config=pytassim_config)
+        with case(weight_interp_mode, True):
+            coarse_weights, coarse_coords = generate_coarse_weights(
+                assimilation=assimilation,
+                background=background,
+                observations=observations,
+                first_guess=first_guess,
+                assim_config=pytassim_config
+            )
+            interp_analysis = apply_coarse_weights(
+                background=background,
+                coarse_weights=coarse_weights,
+                coarse_coords=coarse_coords,
+                assim_config=pytassim_config
+            )
+        with case(weight_interp_mode, False):
+            full_analysis = assimilate(
+                assimilation=assimilation,
+                background=background,
+                observations=observations,
+                first_guess=first_guess,
+                analysis_time=analysis_time,
+            )
+        analysis = merge(interp_analysis, full_analysis)
+
+        linked_analysis = _output_analysis(
+            analysis=analysis,
+            model_dataset=model_dataset,
+            linked_bg_files=linked_bg_files,
+            output_dirs=output_dirs,
+            ens_suffix=ens_suffix,
             analysis_time=analysis_time,
+            assim_config=pytassim_config,
+            cycle_config=cycle_config,
+            client=client,
+            post_process_analysis=post_process_analysis,
+            write_analysis=write_analysis,
+            stream_analysis=stream_analysis
         )
 
-        analysis_dataset = post_process_analysis(
-            analysis=analysis,
-            model_dataset=model_dataset
+        shutdown_cluster(
+            client=client,
+            cluster=cluster,
+            upstream_tasks=[linked_analysis]
         )
-        #
-        # assimilation_diagnostics = info_assimilation(
-        #     analysis=analysis_dataset,
-        #     background=background,
-        #     run_dir=run_dir,
-        #     assim_config=pytassim_config,
-        #     cycle_config=cycle_config,
-        #     client=client
-        # )
+    return pytassim_flow
 
-        output_files, written_analysis = write_analysis(
-            analysis=analysis_dataset,
-            background_files=linked_bg_files,
-            output_dirs=output_dirs,
+
+def get_coupled_pytassim_flow(
+        cos_tasks: Dict[str, Task],
+        clm_tasks: Dict[str, Task],
+        link_first_guess: Task,
+        load_first_guess: Task,
+        load_obs: Task,
+        initialize_assimilation: Task,
+        post_process_obs: Union[Task, None] = None,
+        stream: bool = False,
+) -> Flow:
+    """
+    Construct a coupled assimilation flow, where the ensemble weights are
+    generated once on the COSMO grid and applied to the COSMO and CLM
+    backgrounds.
+    Observations and first guess are loaded only once and both models share
+    the same dask cluster.
+    The weights are generated with
+    :py:func:`~py_bacy.tasks.pytassim.utils.generate_coarse_weights` for
+    every level of the COSMO columns, coarsened by `weight_interp` in the
+    COSMO configuration, and interpolated to the columns of both models.
+    Without `weight_interp`, the weights are generated for every COSMO grid
+    point, which equals the local analyses of :py:func:`get_pytassim_flow`,
+    but all weights are kept in memory with shape
+    (level, column, ensemble, ensemble).
+
+    Parameters
+    ----------
+    cos_tasks : Dict[str, Task]
+        The COSMO specific tasks with the keys `link_background`,
+        `load_background`, `apply_weights`, `post_process_analysis`,
+        `write_analysis` and optionally `stream_analysis`.
+    clm_tasks : Dict[str, Task]
+        The CLM specific tasks with the same keys as for COSMO.
+    link_first_guess : Task
+        This task links the first guess files into the COSMO input folders.
+    load_first_guess : Task
+        This task loads the first guess in observation space.
+    load_obs : Task
+        This task loads the observations.
+    initialize_assimilation : Task
+        This task initializes the assimilation algorithm, which is used to
+        prepare the observations and to localize them.
+    post_process_obs : Task or None, optional
+        This task post-processes the observations and first guess. If None
+        (default), the default post-processing is used.
+    stream : bool, optional
+        If the analyses should be streamed to the output files instead of
+        written, default is False.
+
+    Returns
+    -------
+    coupled_flow : Flow
+        The constructed coupled flow with the parameters of
+        :py:func:`get_pytassim_flow`, where `config_path` and `name` are
+        split into `cos_config_path`, `clm_config_path`, `cos_name` and
+        `clm_name`.
+    """
+    if post_process_obs is None:
+        post_process_obs = default_post_process_obs
+
+    with Flow('pytassim_coupled') as coupled_flow:
+        start_time = Parameter('start_time')
+        end_time = Parameter('end_time')
+        analysis_time = Parameter('analysis_time')
+        cos_config_path = Parameter('cos_config_path')
+        clm_config_path = Parameter('clm_config_path')
+        cycle_config = Parameter('cycle_config')
+        cos_name = Parameter('cos_name', default='pytassim_cos')
+        clm_name = Parameter('clm_name', default='pytassim_clm')
+        use_fg = Parameter('use_fg', default=True)
+        parent_model_name = Parameter('parent_model_name', default=None)
+
+        model_configs = {
+            'cos': config_reader(cos_config_path),
+            'clm': config_reader(clm_config_path)
+        }
+        model_names = {'cos': cos_name, 'clm': clm_name}
+        model_tasks = {'cos': cos_tasks, 'clm': clm_tasks}
+        ens_suffix, ens_range = construct_ensemble(cycle_config=cycle_config)
+        model_dirs = {
+            model: _prepare_model_dirs(
+                name=model_names[model],
+                start_time=start_time,
+                cycle_config=cycle_config,
+                parent_model_name=parent_model_name,
+                ens_suffix=ens_suffix
+            )
+            for model in model_tasks.keys()
+        }
+        run_dir, input_dirs, output_dirs, parent_dirs = model_dirs['cos']
+        pytassim_config = model_configs['cos']
+
+        client, cluster = _initialize_cluster(cycle_config)
+
+        assimilation = initialize_assimilation(
+            start_time=start_time,
             analysis_time=analysis_time,
+            end_time=end_time,
             assim_config=pytassim_config,
             cycle_config=cycle_config,
             client=client
         )
 
-        analysis_dir = construct_rundir(
-            name='analysis',
-            time=analysis_time,
+        linked_bg_files = {}
+        model_datasets = {}
+        backgrounds = {}
+        for model, tasks in model_tasks.items():
+            _, model_input_dirs, _, model_parent_dirs = model_dirs[model]
+            linked_bg_files[model] = tasks['link_background'].map(
+                parent_model_output=model_parent_dirs,
+                input_folder=model_input_dirs,
+                config=unmapped(model_configs[model]),
+                cycle_config=unmapped(cycle_config),
+                analysis_time=unmapped(analysis_time)
+            )
+            model_datasets[model], backgrounds[model] = tasks[
+                'load_background'
+            ](
+                bg_files=linked_bg_files[model],
+                analysis_time=analysis_time,
+                assim_config=model_configs[model],
+                cycle_config=cycle_config,
+                ens_members=ens_range,
+                client=client
+            )
+
+        obs_window = get_observation_window(
+            analysis_time=analysis_time,
+            assim_config=pytassim_config,
+            cycle_config=cycle_config
+        )
+
+        observations = load_obs(
+            obs_window=obs_window,
+            assim_config=pytassim_config,
             cycle_config=cycle_config,
-            upstream_tasks=[written_analysis]
+            client=client
         )
-        path_join = FunctionTask(
-            lambda prefix, suffix: os.path.join(prefix, suffix)
+
+        with case(use_fg, True):
+            linked_fg_files = link_first_guess.map(
+                parent_model_output=parent_dirs,
+                input_folder=input_dirs,
+                config=unmapped(pytassim_config),
+                cycle_config=unmapped(cycle_config),
+                analysis_time=unmapped(analysis_time)
+            )
+            first_guess = load_first_guess(
+                fg_files=linked_fg_files,
+                obs_window=obs_window,
+                assim_config=pytassim_config,
+                cycle_config=cycle_config,
+                ens_members=ens_range,
+                client=client
+            )
+        first_guess = merge(first_guess, Constant(None))
+
+        observations, first_guess = post_process_obs(
+            observations=observations,
+            first_guess=first_guess
         )
-        analysis_dirs = path_join.map(unmapped(analysis_dir), ens_suffix)
-        analysis_dirs = create_folders.map(dir_path=analysis_dirs)
-        linked_analysis = link_analysis.map(
-            output_file=output_files,
-            analysis_folder=analysis_dirs,
+
+        observations = superob_obs(
+            observations=observations,
+            assim_config=pytassim_config
+        )
+
+        observations = background_check_obs(
+            observations=observations,
+            first_guess=first_guess,
+            assim_config=pytassim_config,
+            run_dir=run_dir,
+            analysis_time=analysis_time,
+            upstream_tasks=[output_dirs]
+        )
+
+        observations = temporal_localize_obs(
+            observations=observations,
+            assim_config=pytassim_config,
+            analysis_time=analysis_time
+        )
+
+        coarse_weights, coarse_coords = generate_coarse_weights(
+            assimilation=assimilation,
+            background=backgrounds['cos'],
+            observations=observations,
+            first_guess=first_guess,
+            assim_config=pytassim_config
         )
 
+        linked_analysis = []
+        for model, tasks in model_tasks.items():
+            analysis = tasks['apply_weights'](
+                background=backgrounds[model],
+                coarse_weights=coarse_weights,
+                coarse_coords=coarse_coords,
+                assim_config=model_configs[model]
+            )
+            linked_analysis.append(_output_analysis(
+                analysis=analysis,
+                model_dataset=model_datasets[model],
+                linked_bg_files=linked_bg_files[model],
+                output_dirs=model_dirs[model][2],
+                ens_suffix=ens_suffix,
+                analysis_time=analysis_time,
+                assim_config=model_configs[model],
+                cycle_config=cycle_config,
+                client=client,
+                post_process_analysis=tasks['post_process_analysis'],
+                write_analysis=tasks['write_analysis'],
+                stream_analysis=(
+                    tasks.get('stream_analysis', None) if stream else None
+                )
+            ))
+
         shutdown_cluster(
             client=client,
             cluster=cluster,
-            upstream_tasks=[linked_analysis]
+            upstream_tasks=linked_analysis
         )
-    return pytassim_flow
+    return coupled_flow
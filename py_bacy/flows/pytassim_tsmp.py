@@ -18,9 +18,10 @@ from typing import Union
 from prefect import Flow, Task
 
 # Internal modules
-from .pytassim_generic import get_pytassim_flow
+from .pytassim_generic import get_pytassim_flow, get_coupled_pytassim_flow
 from .symbolic import get_symbolic_flow
 from py_bacy.tasks.pytassim import clm, cosmo
+from py_bacy.tasks.pytassim.utils import apply_coarse_weights
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,7 @@ def get_pytassim_clm(
         load_obs: Task,
         initialize_assimilation: Task,
         post_process_obs: Union[Task, None] = None,
+        stream: bool = False,
 ) -> Flow:
     pytassim_clm_flow = get_pytassim_flow(
         link_background=clm.link_background,
@@ -43,6 +45,7 @@ def get_pytassim_clm(
         initialize_assimilation=initialize_assimilation,
         post_process_analysis=clm.post_process_analysis,
         write_analysis=clm.write_analysis,
+        stream_analysis=clm.stream_analysis if stream else None,
     )
     return pytassim_clm_flow
 
@@ -53,6 +56,7 @@ def get_pytassim_cosmo(
         load_obs: Task,
         initialize_assimilation: Task,
         post_process_obs: Union[Task, None] = None,
+        stream: bool = False,
 ) -> Flow:
     pytassim_cos_flow = get_pytassim_flow(
         link_background=cosmo.link_background,
@@ -64,10 +68,48 @@ def get_pytassim_cosmo(
         initialize_assimilation=initialize_assimilation,
         post_process_analysis=cosmo.post_process_analysis,
         write_analysis=cosmo.write_analysis,
+        stream_analysis=cosmo.stream_analysis if stream else None,
     )
     return pytassim_cos_flow
 
 
+def get_pytassim_tsmp(
+        link_first_guess: Task,
+        load_first_guess: Task,
+        load_obs: Task,
+        initialize_assimilation: Task,
+        post_process_obs: Union[Task, None] = None,
+        stream: bool = False,
+) -> Flow:
+    cos_tasks = dict(
+        link_background=cosmo.link_background,
+        load_background=cosmo.load_background,
+        apply_weights=apply_coarse_weights,
+        post_process_analysis=cosmo.post_process_analysis,
+        write_analysis=cosmo.write_analysis,
+        stream_analysis=cosmo.stream_analysis,
+    )
+    clm_tasks = dict(
+        link_background=clm.link_background,
+        load_background=clm.load_background,
+        apply_weights=clm.apply_cosmo_weights,
+        post_process_analysis=clm.post_process_analysis,
+        write_analysis=clm.write_analysis,
+        stream_analysis=clm.stream_analysis,
+    )
+    pytassim_tsmp_flow = get_coupled_pytassim_flow(
+        cos_tasks=cos_tasks,
+        clm_tasks=clm_tasks,
+        link_first_guess=link_first_guess,
+        load_first_guess=load_first_guess,
+        load_obs=load_obs,
+        post_process_obs=post_process_obs,
+        initialize_assimilation=initialize_assimilation,
+        stream=stream,
+    )
+    return pytassim_tsmp_flow
+
+
 def get_symbolic_clm() -> Flow:
     symbolic_flow = get_symbolic_flow(
         link_background=clm.link_background,
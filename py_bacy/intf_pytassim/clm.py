@@ -23,9 +23,10 @@ import pandas as pd
 from pytassim.model.terrsysmp.clm import preprocess_clm, postprocess_clm
 
 # Internal modules
-from .cosmo import DEG_TO_M
 from .io import load_ens_data, write_ens_data
 from .utils import constrain_var
+from py_bacy.tasks.distance import ClmDistance
+from py_bacy.tasks.static_cache import load_static_dataset
 
 
 logger = logging.getLogger(__name__)
@@ -37,14 +38,14 @@ ANA_FNAME = 'clm_ana%Y%m%d%H%M%S.nc'
 DENSITY = 1000
 
 
-def distance_func(x, y):
-    grid_hori = rotated_pole.transform_point(x[1], x[0], plate_carree)[::-1]
-    diff_obs_clm_deg = y[:, :-1] - grid_hori
-    diff_obs_clm_m = diff_obs_clm_deg * DEG_TO_M
-    dist_obs_clm_2d = np.sqrt(np.sum(diff_obs_clm_m**2, axis=-1))
+def transform_to_rotated(lon, lat):
+    rotated_points = rotated_pole.transform_points(
+        plate_carree, np.asarray(lon), np.asarray(lat)
+    )
+    return rotated_points[..., 0], rotated_points[..., 1]
+
 
-    dist_obs_clm_vert = np.abs(y[:, -1]-x[-1])
-    return dist_obs_clm_2d, dist_obs_clm_vert
+distance_func = ClmDistance(transform_to_rotated, horiz_start=0)
 
 
 def get_bg_filename(bg_files, end_time):
@@ -82,17 +83,22 @@ def load_background(run_dir, bg_files, end_time, ensemble_members, client=None):
 
 def load_constant_data(util_dir):
     file_path_const = os.path.join(util_dir, 'clm_const.nc')
-    ds_clm_const = xr.open_dataset(file_path_const).load()
+    ds_clm_const = load_static_dataset(file_path_const)
     logger.info(
         'Loaded constant CLM data from {0:s}'.format(file_path_const)
     )
     return ds_clm_const
 
 
+def _read_auxiliary_data(file_path_aux):
+    with xr.open_dataset(file_path_aux) as ds_clm_aux:
+        ds_clm_aux = ds_clm_aux.load()
+    return ds_clm_aux.stack(column=['lat', 'lon'])
+
+
 def load_auxiliary_data(util_dir):
     file_path_aux = os.path.join(util_dir, 'clm_aux.nc')
-    ds_clm_aux = xr.open_dataset(file_path_aux)
-    ds_clm_aux = ds_clm_aux.stack(column=['lat', 'lon'])
+    ds_clm_aux = STATIC_CACHE.get(file_path_aux, _read_auxiliary_data)
     logger.info(
         'Loaded auxiliary CLM data from {0:s}'.format(file_path_aux)
     )
@@ -130,6 +136,10 @@ def preprocess_array(ds_bg, ds_const, end_time, assim_vars):
          ds_const['levels'].values], names=['lat', 'lon', 'vgrid']
     )
     state_bg['grid'] = grid_index
+    distance_func.set_grid(
+        grid_index.get_level_values('lat'),
+        grid_index.get_level_values('lon')
+    )
     return state_bg
 
 
@@ -24,6 +24,8 @@ from pytassim.model.terrsysmp.cosmo import preprocess_cosmo, postprocess_cosmo
 # Internal modules
 from .io import load_ens_data, write_ens_data
 from .utils import constrain_var
+from py_bacy.tasks.static_cache import load_static_dataset
+from py_bacy.tasks.distance import CosmoDistance, press_int
 
 
 logger = logging.getLogger(__name__)
@@ -34,35 +36,12 @@ DEG_TO_M = 2 * np.pi / 360 * EARTH_RADIUS
 ANA_FNAME = 'laf%Y%m%d%H%M%S.nc'
 
 
-def distance_func(x, y):
-    try:
-        diff_obs_cos_deg = y[:, :-1] - x[:-1]
-    except IndexError:
-        logger.error('Grid point type: {0}'.format(type(x)))
-        logger.error('Grid point: {0}'.format(x))
-        logger.error('Grid point shape: {0}'.format(x.shape))
-        logger.error('Obs grid type: {0}'.format(type(y)))
-        logger.error('Obs grid: {0}'.format(y))
-        logger.error('Obs grid shape: {0}'.format(y.shape))
-        raise IndexError
-    diff_obs_cos_m = diff_obs_cos_deg * DEG_TO_M
-    dist_obs_cos_2d = np.sqrt(np.sum(diff_obs_cos_m**2, axis=-1))
-
-    cos_press = press_int(x[-1])
-    obs_press = press_int(y[:, -1])
-    obs_lnp = np.log(obs_press)
-    cos_lnp = np.log(cos_press)
-    dist_obs_cos_vert = np.abs(cos_lnp - obs_lnp)
-    return dist_obs_cos_2d, dist_obs_cos_vert
-
-
-def press_int(level_height):
-    return 1013.25 * np.power(1 - (0.0065 * level_height / 288.15), 5.255)
+distance_func = CosmoDistance(horiz_start=0)
 
 
 def load_constant_data(util_dir):
     file_path_const = os.path.join(util_dir, 'cosmo_const.nc')
-    ds_cos_const = xr.open_dataset(file_path_const).load()
+    ds_cos_const = load_static_dataset(file_path_const)
     logger.info(
         'Loaded constant COSMO data from {0:s}'.format(file_path_const)
     )
@@ -15,7 +15,6 @@ import logging
 import os
 import pickle as pk
 import glob
-from shutil import copyfile
 
 # External modules
 import numpy as np
@@ -30,12 +29,15 @@ from distributed.diagnostics import progress
 import dask
 
 # Internal modules
+from py_bacy.tasks.io import copy_file
+from py_bacy.tasks.obs_store import get_obs_store, load_obs_window
+from py_bacy.tasks.static_cache import STATIC_CACHE
 
 
 logger = logging.getLogger(__name__)
 
 
-def load_ens_data(file_path, ensemble_members, client=None):
+def load_ens_data(file_path, ensemble_members, client=None, chunking=None):
     logger.debug('Source file path: {0:s}'.format(file_path.format(1)))
     ens_mems_list = np.arange(1, ensemble_members+1)
     if client is None:
@@ -43,18 +45,27 @@ def load_ens_data(file_path, ensemble_members, client=None):
         client = distributed.get_client(timeout=10)
     ds_ens_list = []
     pbar_mem = tqdm(ens_mems_list)
+    chunks = None
     for mem in pbar_mem:
         path_mem = file_path.format(mem)
         found_paths = sorted(list(glob.glob(path_mem)))
+        if chunking is not None and chunks is None:
+            chunks = chunking.get_chunks(
+                found_paths[0], ens_size=ensemble_members
+            )
         ds_mem = xr.open_mfdataset(
             found_paths, parallel=True, combine='nested',
             concat_dim='time', decode_cf=True, decode_times=True,
-            data_vars='minimal', coords='minimal', compat='override'
+            data_vars='minimal', coords='minimal', compat='override',
+            chunks=chunks
         )
         ds_ens_list.append(ds_mem)
     logger.info('Starting to concat ensemble')
     ds_ens = xr.concat(ds_ens_list, dim='ensemble')
-    ds_ens = ds_ens.chunk({'ensemble': 1})
+    if chunking is None:
+        ds_ens = ds_ens.chunk({'ensemble': 1})
+    else:
+        ds_ens = chunking.apply(ds_ens)
     ds_ens['ensemble'] = ens_mems_list
     del ds_ens_list
     return ds_ens
@@ -79,16 +90,25 @@ def load_coords(ds):
 #     return coords_latlon
 
 
+def _read_stations(file_path_station):
+    return pd.read_hdf(file_path_station, 'stations')
+
+
 def load_stations(util_dir):
     file_path_station = os.path.join(util_dir, 'stations.hd5')
-    df_stations = pd.read_hdf(file_path_station, 'stations')
+    df_stations = STATIC_CACHE.get(file_path_station, _read_stations)
     logger.info(
         'Loaded station information from {0:s}'.format(file_path_station)
     )
     return df_stations
 
 
-def load_observations(file_path_obs):
+def load_observations(file_path_obs, obs_window=None, store_freq=None):
+    if obs_window is not None and store_freq is not None:
+        store_dir = get_obs_store(file_path_obs, freq=store_freq)
+        ds_obs = load_obs_window(store_dir, obs_window[0], obs_window[1])
+        logger.info('Loaded observations from {0:s}'.format(store_dir))
+        return ds_obs
     ds_obs_raw = xr.open_dataset(file_path_obs).load()
     ds_obs = ds_obs_raw.drop_vars(ds_obs_raw.attrs['multiindex'])
     ds_obs['obs_grid_1'] = pd.MultiIndex.from_frame(
@@ -108,10 +128,13 @@ def write_weights(run_dir, ds_weights, suffix=''):
     logger.info('Written ensemble weights to {0:s}'.format(file_path_weights))
 
 
-def write_single_ens_mem(path_src_mem, path_trg_mem, ana_ds, assim_vars):
-    copyfile(path_src_mem, path_trg_mem)
+def write_single_ens_mem(path_src_mem, path_trg_mem, ana_ds, assim_vars,
+                         strategy='reflink'):
+    used_strategy = copy_file(path_src_mem, path_trg_mem, strategy=strategy)
     logger.info(
-        'Copied file {0:s} to {1:s}'.format(path_src_mem, path_trg_mem)
+        'Copied file {0:s} to {1:s} with {2:s}'.format(
+            path_src_mem, path_trg_mem, used_strategy
+        )
     )
     with nc4.Dataset(path_trg_mem, mode='r+') as mem_ds:
         for var_name in assim_vars:
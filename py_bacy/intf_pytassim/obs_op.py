@@ -20,16 +20,22 @@ from pytassim.model.terrsysmp.cosmo import preprocess_cosmo
 # Internal modules
 from . import cosmo
 from .io import load_coords, load_observations, load_stations, load_ens_data
+from py_bacy.tasks.pytassim.obs.t2m import get_stencil_operator
 
 
 logger = logging.getLogger(__name__)
 
 
 def prepare_obs_op_t2m(ds_first_guess, ds_obs, df_stations, ds_const_data,
-                       coords_fg):
-    obs_operator = CosmoT2mOperator(
-        df_stations, coords_fg, ds_const_data
-    )
+                       coords_fg, stencil_dir=None):
+    if stencil_dir is not None:
+        obs_operator = get_stencil_operator(
+            df_stations, ds_const_data, cache_dir=stencil_dir
+        )
+    else:
+        obs_operator = CosmoT2mOperator(
+            df_stations, coords_fg, ds_const_data
+        )
     time_intersection = ds_obs.indexes['time'].intersection(
         ds_first_guess.indexes['time']
     )
@@ -43,15 +49,19 @@ def prepare_obs_op_t2m(ds_first_guess, ds_obs, df_stations, ds_const_data,
 
 
 def load_obs_fg_t2m(run_dir, fg_files, ensemble_members,
-                    start_time, file_path_obs, util_dir, client=None):
+                    start_time, file_path_obs, util_dir, client=None,
+                    use_stencil=False, obs_window=None, store_freq=None):
     ds_fg = cosmo.load_first_guess(run_dir, fg_files, ensemble_members,
                                    start_time, client=client)
-    ds_obs = load_observations(file_path_obs)
+    ds_obs = load_observations(
+        file_path_obs, obs_window=obs_window, store_freq=store_freq
+    )
     df_stations = load_stations(util_dir)
     ds_const_data = cosmo.load_constant_data(util_dir)
     coords_fg = load_coords(ds_fg)
     prepared_fg, prepared_obs, obs_op = prepare_obs_op_t2m(
-        ds_fg, ds_obs, df_stations, ds_const_data, coords_fg
+        ds_fg, ds_obs, df_stations, ds_const_data, coords_fg,
+        stencil_dir=util_dir if use_stencil else None
     )
     logger.info('Loaded observations and first guess for T2m from COSMO')
     return prepared_fg, prepared_obs, obs_op
@@ -31,6 +31,10 @@ from pytassim.localization.gaspari_cohn import GaspariCohn
 # Internal modules
 from .logger_mixin import LoggerMixin
 from .intf_pytassim import obs_op, utils
+from .intf_pytassim.io import write_df
+from .tasks.distance import IndexedDistance
+from .tasks.obs_processing import background_check, \
+    load_temporal_localization
 from .model import ModelModule
 from .utilities import check_if_folder_exist_create
 
@@ -52,9 +56,17 @@ class PyTassimModule(ModelModule, LoggerMixin, abc.ABC):
                           cycle_config):
         if 'smoother' not in self.config:
             self.config['smoother'] = True
+        distance_func = self.module.distance_func
+        if self.config.get('spatial_index', False):
+            distance_func = IndexedDistance.from_radius(
+                distance_func, self.config['loc_radius']
+            )
+            self.logger.info(
+                'Pre-select observations with {0}'.format(distance_func)
+            )
         localization = GaspariCohn(
             np.array(self.config['loc_radius']),
-            dist_func=self.module.distance_func
+            dist_func=distance_func
         )
         letkf = DistributedLETKFUncorr(
             client=cycle_config['CLUSTER']['client'],
@@ -103,27 +115,41 @@ class PyTassimModule(ModelModule, LoggerMixin, abc.ABC):
         if self.config['obs']['path_loc_mat'] is None:
             logger.info('No temporal localization of observations')
             return ds_obs
-        ds_obs = ds_obs.copy()
-        loc_mat = xr.open_dataset(self.config['obs']['path_loc_mat'])
-        loc_mat = loc_mat['localization']
-        sel_loc_mat = loc_mat.sel(analysis_time=analysis_time)
-        sel_loc_mat['timedelta'] = sel_loc_mat['timedelta'] + pd.to_datetime(analysis_time)
-        sel_loc_mat = sel_loc_mat.rename({'timedelta': 'time'})
-        time_intersection = sel_loc_mat.indexes['time'].intersection(
-            ds_obs.indexes['time']
-        )
-        sel_loc_mat = sel_loc_mat.sel(time=time_intersection)
-        ds_obs = ds_obs.sel(time=time_intersection)
-        non_zero_weight = sel_loc_mat != 0
-        ds_obs = ds_obs.isel(time=non_zero_weight)
-        sel_loc_mat = sel_loc_mat.isel(time=non_zero_weight)
-        print('Temporal weights:', sel_loc_mat)
-        cov_matrix = ds_obs['covariance'].expand_dims(time=ds_obs.time)
-        cov_matrix = cov_matrix / sel_loc_mat
-        ds_obs['covariance'] = cov_matrix
+        localization = load_temporal_localization(
+            self.config['obs']['path_loc_mat']
+        )
+        ds_obs = localization.localize(ds_obs, analysis_time)
         logger.info('Observations are temporal localized')
         return ds_obs
 
+    def check_obs(
+            self,
+            ds_obs: xr.Dataset,
+            state_fg: xr.DataArray,
+            run_dir: str,
+            analysis_time: Any
+    ) -> xr.Dataset:
+        qc_config = self.config['obs'].get('qc', None)
+        if not qc_config:
+            logger.info('No background check of observations')
+            return ds_obs
+        qc_config = {} if qc_config is True else qc_config
+        obs_equivalent = ds_obs.obs.operator(ds_obs, state_fg)
+        checked_obs, summary = background_check(
+            ds_obs, obs_equivalent,
+            threshold=qc_config.get('threshold', 5.),
+            max_reject_fraction=qc_config.get('max_reject_fraction', 0.5)
+        )
+        checked_obs.obs.operator = ds_obs.obs.operator
+        summary.index = [analysis_time]
+        write_df(summary, run_dir, 'info_qc.txt')
+        logger.info(
+            'Rejected {0:d} of {1:d} observations by background check'.format(
+                summary['n_rejected'].sum(), summary['n_obs'].sum()
+            )
+        )
+        return checked_obs
+
     def assimilate_data(self, start_time, analysis_time, parent_model,
                         cycle_config):
         cycle_config['CLUSTER']['cluster'].scale(
@@ -162,7 +188,10 @@ class PyTassimModule(ModelModule, LoggerMixin, abc.ABC):
         obs_times = (start_time+obs_timedelta[0], start_time+obs_timedelta[1])
         state_fg, obs_raw, obs_operator = obs_op.load_obs_fg_t2m(
             run_dir, fg_files, ensemble_members, start_time, file_path_obs,
-            util_dir, client=cycle_config['CLUSTER']['client']
+            util_dir, client=cycle_config['CLUSTER']['client'],
+            use_stencil=self.config['obs'].get('stencil', False),
+            obs_window=obs_times,
+            store_freq=self.config['obs'].get('store_freq', None)
         )
 
         logger.info('I\'ll slice the observations to {0}'.format(obs_times))
@@ -174,6 +203,10 @@ class PyTassimModule(ModelModule, LoggerMixin, abc.ABC):
             time=slice(obs_times[0], obs_times[1])
         )
         observations = self.disturb_obs(observations)
+        observations.obs.operator = obs_operator
+        observations = self.check_obs(
+            observations, state_fg, run_dir, analysis_time
+        )
         observations = self.localize_obs(observations, analysis_time)
         observations.obs.operator = obs_operator
         logger.info('Observation times: {0}'.format(
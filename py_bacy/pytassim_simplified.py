@@ -20,42 +20,30 @@ from shutil import copyfile
 import pandas as pd
 import xarray as xr
 import numpy as np
-import torch
-import scipy.spatial
 import netCDF4 as nc4
 from tabulate import tabulate
 
 from pytassim.assimilation import LETKFUncorr
-from pytassim.assimilation.filter.letkf import local_etkf
 from pytassim.localization import GaspariCohn
-from pytassim.obs_ops.terrsysmp.cos_t2m import CosmoT2mOperator, EARTH_RADIUS
+from pytassim.obs_ops.terrsysmp.cos_t2m import CosmoT2mOperator
 from pytassim.model.terrsysmp.cosmo import preprocess_cosmo, postprocess_cosmo
 from pytassim.model.terrsysmp.clm import preprocess_clm, postprocess_clm
 
 # Internal modules
 from .logger_mixin import LoggerMixin
 from .model import ModelModule
+from .tasks.io import load_ens_data_cached
+from .tasks.encoding import get_encoding, get_profile_name
+from .tasks.block_letkf import BlockLETKF
+from .tasks.stencil import get_idw_matrix
+from .tasks.distance import cart_dist_func, array_dist_func, \
+    coords_to_array
 
 
 _height_vars = ['level', 'level1', 'levlak', 'levsno', 'levtot', 'numrad',
                 'height_2m', 'height_10m', 'height_toa', 'soil1']
 
 
-def cart_dist_func(x, y):
-    deg_m = 2 * np.pi * EARTH_RADIUS / 360
-    x_arr = np.atleast_1d(
-        np.array(x, dtype=('float, float'))
-    ).view(float).reshape(-1, 2)
-    y_arr = np.atleast_1d(
-        np.array(y, dtype=('float, float, float'))
-    ).view(float).reshape(-1, 3)[..., :-1]
-    diff = x_arr - y_arr
-    hori_diff = diff * deg_m
-    hori_diff = np.sqrt(np.sum(hori_diff ** 2, axis=-1))
-    # vert_diff = np.abs(diff[..., -1])
-    return hori_diff
-
-
 def abs_dist_func(x, y):
     return np.abs(x-y)
 
@@ -64,10 +52,12 @@ class PytassimModule(ModelModule, LoggerMixin):
     def __init__(self, name, parent=None, config=None):
         super().__init__(name, parent, config)
         self.algorithm = self.init_assimilation()
+        self.state_coords = None
+        self.obs_coords = None
 
     def init_assimilation(self):
         localization = GaspariCohn(np.array(self.config['loc_radius']),
-                                   cart_dist_func)
+                                   array_dist_func)
         letkf = LETKFUncorr(localization=localization,
                             inf_factor=self.config['inf_factor'])
         return letkf
@@ -139,7 +129,8 @@ class PytassimModule(ModelModule, LoggerMixin):
 
         ds_clm_bg = self.get_clm_background(start_time, end_time, cycle_config)
         weights_clm = self.interpolate_weights(
-            coords_weights, coords_clm, weights
+            coords_weights, coords_clm, weights,
+            cache_dir=self.expand_dir(self.config['utils_path'], cycle_config)
         )
         weights_clm = weights_clm.rename({'grid': 'column'})
         weights_clm['column'] = ds_clm_bg['column']
@@ -157,7 +148,12 @@ class PytassimModule(ModelModule, LoggerMixin):
         run_dir = self.get_run_dir(start_time, cycle_config)
         out_dir = os.path.join(run_dir, 'output')
         file_path_weights = os.path.join(out_dir, 'ens_weights.nc')
-        ds_weights.to_netcdf(file_path_weights)
+        ds_weights.to_netcdf(
+            file_path_weights,
+            encoding=get_encoding(
+                ds_weights, get_profile_name(self.config, 'weights')
+            )
+        )
 
     @staticmethod
     def prepare_assimilation(ds_first_guess, ds_obs, df_stations,
@@ -371,6 +367,12 @@ class PytassimModule(ModelModule, LoggerMixin):
     def load_ens_data(self, file_path, ens_mems):
         self.logger.debug('Source file path: {0:s}'.format(file_path))
         ens_mems_list = np.arange(1, ens_mems+1)
+        if self.config.get('zarr_cache', False):
+            ens_ds = load_ens_data_cached.run(
+                file_paths=[file_path.format(mem) for mem in ens_mems_list]
+            )
+            ens_ds['ensemble'] = ens_mems_list
+            return ens_ds
         ens_ds_list = [
             xr.open_mfdataset(file_path.format(mem))
             for mem in ens_mems_list
@@ -423,28 +425,34 @@ class PytassimModule(ModelModule, LoggerMixin):
         innov, hx_perts, obs_cov, back_state = self.algorithm._states_to_torch(
             innov, hx_perts, obs_cov, state_perts.values,
         )
-        state_grid = state_perts.grid.values
-        len_state_grid = len(state_grid)
-        grid_inds = range(len_state_grid)
-        delta_ana = []
-        weights = []
-        self.logger.info('Iterating through state grid')
-        for grid_ind in grid_inds:
-            tmp_ana_l, w_l, _ = local_etkf(
-                self.algorithm._gen_weights_func, grid_ind, innov, hx_perts,
-                obs_cov, back_prec, obs_grid, state_grid, back_state,
-                self.algorithm.localization,
-            )
-            delta_ana.append(tmp_ana_l)
-            weights.append(w_l)
-        delta_ana = torch.stack(delta_ana, dim=0)
-        delta_ana = state_perts.copy(data=delta_ana.numpy())
-        weights = torch.stack(weights, dim=0).numpy()
+        self.state_coords = coords_to_array(state_perts.indexes['grid'])
+        self.obs_coords = coords_to_array(obs_grid)
+        block_letkf = BlockLETKF(
+            back_prec, block_size=self.config.get('block_size', 250),
+            group_tol=self.config.get('group_tol', None)
+        )
+        self.logger.info(
+            'Iterating through state grid with {0}'.format(block_letkf)
+        )
+        weights = block_letkf.gen_weights(
+            innov, hx_perts, obs_cov, self.localize_block,
+            n_grid=len(self.state_coords)
+        )
         weights_gridded = self.algorithm._get_weight_array(
-            weights, delta_ana.indexes['grid'], delta_ana.ensemble.values
+            weights, state_perts.indexes['grid'], state_perts.ensemble.values
         ).unstack('grid')
         return weights_gridded
 
+    def localize_block(self, grid_slice):
+        localization = self.algorithm.localization
+        obs_weights = []
+        for grid_point in self.state_coords[grid_slice]:
+            use_obs, point_weights = localization.localize_obs(
+                grid_point, self.obs_coords
+            )
+            obs_weights.append(np.where(use_obs, point_weights, 0))
+        return np.stack(obs_weights, axis=0)
+
     @staticmethod
     def ll_to_cartesian(lat_lon, earth_radius=6371000):
         """
@@ -459,22 +467,17 @@ class PytassimModule(ModelModule, LoggerMixin):
         return x, y, z
 
     def interpolate_weights(self, lat_lon_src, lat_lon_trg, weights,
-                            stack_coords=('rlat', 'rlon')):
-        cart_src = np.stack(
-            self.ll_to_cartesian(lat_lon_src), axis=-1
-        ).reshape(-1, 3)
-        cart_trg = np.stack(
-            self.ll_to_cartesian(lat_lon_trg), axis=-1
-        ).reshape(-1, 3)
+                            stack_coords=('rlat', 'rlon'), cache_dir=None):
+        interp_matrix = get_idw_matrix(
+            lat_lon_src, lat_lon_trg, n_neighbors=4, cache_dir=cache_dir
+        )
         weights_stacked = weights.stack(grid=stack_coords)
-
-        tree = scipy.spatial.cKDTree(cart_src)
-        dist, neighbors = tree.query(cart_trg, k=4)
-        inv_dist_squared = 1 / np.power(dist, 2)
-        lam = inv_dist_squared / np.sum(inv_dist_squared, axis=-1)[:, None]
-
-        weight_neighbors = weights_stacked.values[..., neighbors]
-        weight_interp = np.sum(weight_neighbors * lam, axis=-1)
+        weights_flat = weights_stacked.values.reshape(
+            -1, weights_stacked.shape[-1]
+        )
+        weight_interp = (interp_matrix @ weights_flat.T).T.reshape(
+            weights_stacked.shape[:-1] + (interp_matrix.shape[0], )
+        )
 
         non_grid_dims = [dim for dim in weights_stacked.dims if dim != 'grid']
         weight_interp = xr.DataArray(
@@ -28,6 +28,7 @@ from .logger_mixin import LoggerMixin
 from .intf_pytassim import utils, cosmo, clm, io
 from .model import ModelModule
 from .utilities import check_if_folder_exist_create
+from .tasks.encoding import get_encoding, get_profile_name
 
 
 logger = logging.getLogger(__name__)
@@ -130,11 +131,11 @@ class SEKFModule(ModelModule, LoggerMixin):
         return analysis
 
     @staticmethod
-    def _write_info_fields(fields_to_write, run_dir):
+    def _write_info_fields(fields_to_write, run_dir, profile='fast'):
         out_dir = os.path.join(run_dir, 'output')
         for field_name, field in fields_to_write.items():
             field_path = os.path.join(out_dir, '{0:s}.nc'.format(field_name))
-            field.to_netcdf(field_path)
+            field.to_netcdf(field_path, encoding=get_encoding(field, profile))
 
     def _write_analysis(self, analysis, run_dir, file_path_bg, bg_files,
                         analysis_time):
@@ -219,7 +220,9 @@ class SEKFModule(ModelModule, LoggerMixin):
             'gain': gain,
             'increment': increment
         }
-        self._write_info_fields(info_fields, run_dir)
+        self._write_info_fields(
+            info_fields, run_dir, get_profile_name(self.config, 'info')
+        )
         logger.info('Wrote information fields')
 
         analysis = self._create_analysis(ds_bg, increment)
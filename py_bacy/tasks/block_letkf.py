@@ -0,0 +1,339 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Callable, Dict, List, Tuple, Union
+import logging
+import time
+
+# External modules
+import numpy as np
+import torch
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'gather_local_obs',
+    'group_local_obs',
+    'BlockLETKF'
+]
+
+
+def gather_local_obs(
+        obs_weights: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the indices of the locally used observations for a block of grid
+    points into a padded index array.
+    Observations with a localization weight of zero are not used.
+
+    Parameters
+    ----------
+    obs_weights : np.ndarray
+        The localization weights with shape (block, obs).
+
+    Returns
+    -------
+    obs_index : np.ndarray
+        The indices of the local observations with shape
+        (block, n_obs_local_max), padded with zeros.
+    obs_mask : np.ndarray
+        The mask of valid local observations with the same shape as the
+        indices.
+    """
+    use_obs = obs_weights > 0
+    n_local = use_obs.sum(axis=1)
+    n_local_max = max(int(n_local.max(initial=0)), 1)
+    obs_mask = np.arange(n_local_max)[None, :] < n_local[:, None]
+    obs_index = np.zeros(obs_mask.shape, dtype=np.int64)
+    obs_index[obs_mask] = np.nonzero(use_obs)[1]
+    return obs_index, obs_mask
+
+
+def group_local_obs(
+        obs_weights: np.ndarray,
+        tol: float
+) -> Tuple[np.ndarray, np.ndarray, List[bytes]]:
+    """
+    Group the grid points of a block by their local observation set and
+    their localization weights, quantised to a given tolerance.
+
+    Parameters
+    ----------
+    obs_weights : np.ndarray
+        The localization weights with shape (block, obs).
+    tol : float
+        The localization weights are quantised to multiples of this
+        tolerance.
+
+    Returns
+    -------
+    group_weights : np.ndarray
+        The quantised localization weights of every group with shape
+        (group, obs).
+    group_inverse : np.ndarray
+        The group index of every grid point with shape (block, ).
+    group_keys : List[bytes]
+        The hashable key of every group, composed of the indices and the
+        quantised weights of the local observations.
+    """
+    quantised = np.rint(obs_weights / tol).astype(np.int64)
+    unique_quantised, group_inverse = np.unique(
+        quantised, axis=0, return_inverse=True
+    )
+    group_keys = []
+    for group_quantised in unique_quantised:
+        local_index = np.flatnonzero(group_quantised)
+        group_keys.append(np.concatenate(
+            (local_index, group_quantised[local_index])
+        ).tobytes())
+    group_weights = unique_quantised * tol
+    return group_weights, group_inverse.ravel(), group_keys
+
+
+class BlockLETKF(object):
+    """
+    Local ensemble transform Kalman filter weights for uncorrelated
+    observations, solved for blocks of grid points at once.
+    The local observations of every grid point in a block are gathered into
+    padded tensors of shape (block, n_obs_local_max, ensemble), where the
+    padded observations get a precision of zero and thus do not change the
+    solution. Observations with a non-finite innovation, perturbation or
+    variance, e.g. rejected by a quality control, are not used.
+    All local weight problems of a block are then solved with one batched
+    eigendecomposition.
+    If a grouping tolerance is set, grid points with the same local
+    observation set and the same localization weights up to the tolerance
+    share their weights, which are solved only once per cycle.
+
+    Parameters
+    ----------
+    back_prec : torch.Tensor
+        The background precision in ensemble space with shape
+        (ensemble, ensemble), e.g. (k-1)/inflation times the identity.
+    block_size : int, optional
+        The number of grid points solved at once, default is 250.
+    group_tol : None or float, optional
+        The localization weights are quantised to this tolerance to group
+        the grid points. If None (default), every grid point is solved on
+        its own.
+    """
+    def __init__(
+            self,
+            back_prec: torch.Tensor,
+            block_size: int = 250,
+            group_tol: Union[None, float] = None
+    ):
+        self.back_prec = torch.as_tensor(back_prec)
+        self.block_size = block_size
+        self.group_tol = group_tol
+        self.stats: Dict[str, float] = {}
+
+    def __repr__(self) -> str:
+        return '{0:s}(ens_mems={1:d}, block_size={2:d}, group_tol={3})'.format(
+            self.__class__.__name__, self.back_prec.shape[0],
+            self.block_size, self.group_tol
+        )
+
+    def _solve_grouped(
+            self,
+            innov: torch.Tensor,
+            hx_perts: torch.Tensor,
+            obs_var: torch.Tensor,
+            obs_weights: np.ndarray,
+            groups: Dict[bytes, np.ndarray]
+    ) -> Tuple[np.ndarray, int]:
+        group_weights, group_inverse, group_keys = group_local_obs(
+            obs_weights, self.group_tol
+        )
+        missing = [
+            group_idx for group_idx, key in enumerate(group_keys)
+            if key not in groups
+        ]
+        if missing:
+            solved_weights = self.solve_block(
+                innov, hx_perts, obs_var, group_weights[missing]
+            ).cpu().numpy()
+            groups.update(zip(
+                [group_keys[group_idx] for group_idx in missing],
+                solved_weights
+            ))
+        weights_block = np.stack([groups[key] for key in group_keys])
+        return weights_block[group_inverse], len(missing)
+
+    def solve_block(
+            self,
+            innov: torch.Tensor,
+            hx_perts: torch.Tensor,
+            obs_var: torch.Tensor,
+            obs_weights: np.ndarray
+    ) -> torch.Tensor:
+        """
+        Solve the local weight problems for a block of grid points.
+        Local observations with non-finite values get a precision of zero.
+
+        Parameters
+        ----------
+        innov : torch.Tensor
+            The innovations with shape (obs, ).
+        hx_perts : torch.Tensor
+            The ensemble perturbations in observation space with shape
+            (obs, ensemble).
+        obs_var : torch.Tensor
+            The observation error variances with shape (obs, ).
+        obs_weights : np.ndarray
+            The localization weights with shape (block, obs).
+
+        Returns
+        -------
+        weights : torch.Tensor
+            The ensemble weights with shape (block, ensemble, ensemble),
+            where the analysis perturbations are the background
+            perturbations multiplied by the weights.
+        """
+        obs_index, obs_mask = gather_local_obs(obs_weights)
+        local_weights = np.take_along_axis(obs_weights, obs_index, axis=1)
+        local_weights = torch.as_tensor(
+            np.where(obs_mask, local_weights, 0)
+        ).to(hx_perts)
+        obs_index = torch.as_tensor(obs_index)
+        ens_mems = hx_perts.shape[-1]
+
+        local_innov = innov[obs_index]
+        local_var = obs_var[obs_index]
+        local_perts = hx_perts[obs_index]
+        local_valid = torch.isfinite(local_innov) & torch.isfinite(
+            local_var
+        ) & torch.isfinite(local_perts).all(dim=-1)
+        local_prec = torch.where(
+            local_valid, local_weights / local_var, 0.
+        )
+        local_innov = torch.where(local_valid, local_innov, 0.)
+        local_perts = torch.where(local_valid[..., None], local_perts, 0.)
+        weighted_perts = local_perts * local_prec[..., None]
+        prec_ana = torch.matmul(
+            local_perts.transpose(-1, -2), weighted_perts
+        ) + self.back_prec.to(hx_perts)
+        evals, evects = torch.linalg.eigh(prec_ana)
+        evals_inv = 1 / evals
+        weighted_innov = torch.matmul(
+            weighted_perts.transpose(-1, -2), local_innov[..., None]
+        )
+        cov_ana = torch.matmul(
+            evects * evals_inv[..., None, :], evects.transpose(-1, -2)
+        )
+        w_mean = torch.matmul(cov_ana, weighted_innov)
+        w_perts = torch.matmul(
+            evects * torch.sqrt((ens_mems-1) * evals_inv)[..., None, :],
+            evects.transpose(-1, -2)
+        )
+        return w_mean + w_perts
+
+    def gen_weights(
+            self,
+            innov: torch.Tensor,
+            hx_perts: torch.Tensor,
+            obs_cov: torch.Tensor,
+            localize: Callable[[slice], np.ndarray],
+            n_grid: int,
+            out: Union[None, np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Generate the ensemble weights for all grid points, block by block.
+
+        Parameters
+        ----------
+        innov : torch.Tensor
+            The innovations with shape (obs, ).
+        hx_perts : torch.Tensor
+            The ensemble perturbations in observation space with shape
+            (obs, ensemble).
+        obs_cov : torch.Tensor
+            The observation error variances with shape (obs, ) or the
+            diagonal observation error covariance with shape (obs, obs).
+        localize : Callable[[slice], np.ndarray]
+            This callable returns the localization weights with shape
+            (block, obs) for a slice of grid points.
+        n_grid : int
+            The number of grid points.
+        out : None or np.ndarray, optional
+            The weights are written into this array with shape
+            (grid, ensemble, ensemble). If None (default), a new array is
+            allocated.
+
+        Returns
+        -------
+        weights : np.ndarray
+            The ensemble weights with shape (grid, ensemble, ensemble).
+        """
+        obs_var = obs_cov
+        if obs_var.dim() == 2:
+            obs_var = torch.diagonal(obs_var)
+        valid_obs = (
+            torch.isfinite(innov) & torch.isfinite(obs_var)
+            & torch.isfinite(hx_perts).all(dim=-1)
+        ).cpu().numpy()
+        if not valid_obs.all():
+            logger.info(
+                'Skip {0:d} of {1:d} observations with non-finite '
+                'values'.format(int((~valid_obs).sum()), len(valid_obs))
+            )
+        ens_mems = hx_perts.shape[-1]
+        if out is None:
+            out = np.empty(
+                (n_grid, ens_mems, ens_mems),
+                dtype=torch.empty(0, dtype=hx_perts.dtype).numpy().dtype
+            )
+        groups = {}
+        n_solved = 0
+        start_time = time.perf_counter()
+        for block_start in range(0, n_grid, self.block_size):
+            grid_slice = slice(
+                block_start, min(block_start+self.block_size, n_grid)
+            )
+            obs_weights = np.where(valid_obs, localize(grid_slice), 0)
+            if self.group_tol is None:
+                out[grid_slice] = self.solve_block(
+                    innov, hx_perts, obs_var, obs_weights
+                ).cpu().numpy()
+                n_solved += len(obs_weights)
+            else:
+                out[grid_slice], n_block_solved = self._solve_grouped(
+                    innov, hx_perts, obs_var, obs_weights, groups
+                )
+                n_solved += n_block_solved
+        needed_time = time.perf_counter() - start_time
+        self.stats = {
+            'n_grid': n_grid,
+            'n_solved': n_solved,
+            'hit_rate': 1 - n_solved / max(n_grid, 1),
+            'speedup': n_grid / max(n_solved, 1),
+            'time': needed_time
+        }
+        logger.info(
+            'Generated weights for {0:d} grid points in {1:.2f} s '
+            '({2:.0f} grid points/s)'.format(
+                n_grid, needed_time, n_grid / max(needed_time, 1E-12)
+            )
+        )
+        if self.group_tol is not None:
+            logger.info(
+                'Solved {0:d} unique local problems, group cache hit rate: '
+                '{1:.1%}, speed-up: {2:.1f}x'.format(
+                    n_solved, self.stats['hit_rate'], self.stats['speedup']
+                )
+            )
+        return out
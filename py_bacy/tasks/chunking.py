@@ -0,0 +1,235 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Dict, Any, List, Union, Tuple
+import logging
+import math
+
+# External modules
+import xarray as xr
+from dask.utils import parse_bytes
+
+# Internal modules
+from .handle_cache import open_netcdf4
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'GRID_DIMS',
+    'ChunkingPolicy'
+]
+
+
+GRID_DIMS = (
+    'rlat', 'rlon', 'srlat', 'srlon', 'lat', 'lon', 'column', 'pft',
+    'gridcell', 'landunit'
+)
+
+
+class ChunkingPolicy(object):
+    """
+    The chunking policy derives chunk shapes for ensemble datasets from the
+    number of workers, the memory per worker and the grid layout of the
+    files.
+    The grid dimensions are split such that every worker gets at least a
+    single grid block, while a block, stacked over all ensemble members,
+    should not exceed a given fraction of the worker memory.
+    The innermost grid dimension is kept as long as possible such that the
+    chunks stay contiguous on disk.
+    All other dimensions are not chunked, whereas the ensemble dimension is
+    stacked into every chunk.
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        The number of dask workers, default is 1.
+    memory_per_worker : int or str, optional
+        The memory of a single worker in bytes or as string, which can be
+        parsed by :py:func:`dask.utils.parse_bytes`. Default is '2 GB'.
+    memory_fraction : float, optional
+        A single chunk, stacked over the ensemble, should be at most this
+        fraction of the worker memory. Default is 0.1.
+    var_chunks : None or Dict[str, Dict[str, int]], optional
+        Chunk shapes per variable, which overwrite the derived chunks for
+        these variables. Default is None, where no variable is overwritten.
+    grid_dims : Tuple[str], optional
+        These dimensions are treated as grid dimensions. Default is
+        :py:data:`GRID_DIMS`.
+    """
+    def __init__(
+            self,
+            n_workers: int = 1,
+            memory_per_worker: Union[int, str] = '2 GB',
+            memory_fraction: float = 0.1,
+            var_chunks: Union[None, Dict[str, Dict[str, int]]] = None,
+            grid_dims: Tuple[str] = GRID_DIMS
+    ):
+        self.n_workers = max(int(n_workers), 1)
+        if isinstance(memory_per_worker, str):
+            memory_per_worker = parse_bytes(memory_per_worker)
+        self.memory_per_worker = int(memory_per_worker)
+        self.memory_fraction = memory_fraction
+        self.var_chunks = var_chunks or {}
+        self.grid_dims = grid_dims
+
+    def __repr__(self) -> str:
+        return '{0:s}(n_workers={1:d}, memory_per_worker={2:d})'.format(
+            self.__class__.__name__, self.n_workers, self.memory_per_worker
+        )
+
+    @classmethod
+    def from_config(
+            cls,
+            cycle_config: Dict[str, Any],
+            assim_config: Union[None, Dict[str, Any]] = None
+    ) -> 'ChunkingPolicy':
+        """
+        Initialize the chunking policy from the cycle and assimilation
+        configuration.
+        The number of workers is taken from `CLUSTER: n_workers` and the
+        memory per worker is derived from `EXPERIMENT: memory_per_node`,
+        divided by `EXPERIMENT: cpus_per_node` for slurm clusters and by the
+        number of workers otherwise. Per-variable chunks and the memory
+        fraction can be set within the `chunks` section of the assimilation
+        configuration.
+
+        Parameters
+        ----------
+        cycle_config : Dict[str, Any]
+            The cluster and experiment information are searched within this
+            configuration.
+        assim_config : None or Dict[str, Any], optional
+            The `chunks` section of this configuration is used to overwrite
+            the chunks of single variables.
+
+        Returns
+        -------
+        policy : ChunkingPolicy
+            The initialized chunking policy.
+        """
+        cluster_config = cycle_config.get('CLUSTER', {})
+        exp_config = cycle_config.get('EXPERIMENT', {})
+        n_workers = cluster_config.get('n_workers', 1)
+        memory_per_worker = parse_bytes(
+            exp_config.get('memory_per_node', '2 GB')
+        )
+        if cluster_config.get('slurm', False):
+            memory_per_worker /= exp_config.get('cpus_per_node', 1)
+        else:
+            memory_per_worker /= max(n_workers, 1)
+        chunks_config = {}
+        if assim_config is not None:
+            chunks_config = assim_config.get('chunks', None) or {}
+        policy = cls(
+            n_workers=n_workers,
+            memory_per_worker=int(memory_per_worker),
+            memory_fraction=chunks_config.get('memory_fraction', 0.1),
+            var_chunks=chunks_config.get('variables', None)
+        )
+        return policy
+
+    def get_chunks(
+            self,
+            file_path: str,
+            variables: Union[None, List[str]] = None,
+            ens_size: int = 1
+    ) -> Dict[str, int]:
+        """
+        Derive the dimension chunks for files with the same layout as given
+        file path.
+        Only the metadata of the file is read.
+
+        Parameters
+        ----------
+        file_path : str
+            The layout is inferred from this NetCDF-file.
+        variables : None or List[str], optional
+            Only these variables are used to estimate the bytes per grid
+            point. If None (default), all variables are used.
+        ens_size : int, optional
+            The number of ensemble members, which are stacked into a single
+            chunk, default is 1.
+
+        Returns
+        -------
+        chunks : Dict[str, int]
+            The chunk size for every dimension in the file, which can be
+            passed to `xarray.open_mfdataset`.
+        """
+        nc_file = open_netcdf4(file_path)
+        dim_sizes = {
+            name: len(dim) for name, dim in nc_file.dimensions.items()
+        }
+        if variables is None:
+            variables = list(nc_file.variables.keys())
+        var_layouts = [
+            (nc_file.variables[var].dimensions,
+             nc_file.variables[var].dtype.itemsize)
+            for var in variables
+            if var in nc_file.variables
+            and nc_file.variables[var].dtype != str
+        ]
+        grid_dims = [dim for dim in self.grid_dims if dim in dim_sizes]
+        bytes_per_point = 1
+        for var_dims, itemsize in var_layouts:
+            var_bytes = itemsize * ens_size
+            for dim in var_dims:
+                if dim not in grid_dims:
+                    var_bytes *= dim_sizes[dim]
+            bytes_per_point = max(bytes_per_point, var_bytes)
+        chunks = {dim: -1 for dim in dim_sizes.keys()}
+        if not grid_dims:
+            return chunks
+        n_points = math.prod(dim_sizes[dim] for dim in grid_dims)
+        memory_points = int(
+            self.memory_per_worker * self.memory_fraction // bytes_per_point
+        )
+        points_per_chunk = max(
+            min(math.ceil(n_points / self.n_workers), memory_points), 1
+        )
+        remaining_points = points_per_chunk
+        for dim in reversed(grid_dims):
+            chunks[dim] = max(min(dim_sizes[dim], remaining_points), 1)
+            remaining_points = max(remaining_points // dim_sizes[dim], 1)
+        logger.debug('Derived chunks {0} for {1:s}'.format(chunks, file_path))
+        return chunks
+
+    def apply(self, ds_ens: xr.Dataset) -> xr.Dataset:
+        """
+        Apply the policy to a concatenated ensemble dataset.
+        The ensemble dimension is stacked into every chunk and the chunks of
+        variables with an explicit chunk shape are overwritten.
+
+        Parameters
+        ----------
+        ds_ens : xr.Dataset
+            This ensemble dataset is rechunked.
+
+        Returns
+        -------
+        ds_ens : xr.Dataset
+            The rechunked ensemble dataset.
+        """
+        if 'ensemble' in ds_ens.dims:
+            ds_ens = ds_ens.chunk({'ensemble': -1})
+        for var, var_chunks in self.var_chunks.items():
+            if var not in ds_ens.data_vars:
+                continue
+            var_chunks = {
+                dim: size for dim, size in var_chunks.items()
+                if dim in ds_ens[var].dims
+            }
+            ds_ens[var] = ds_ens[var].chunk(var_chunks)
+        return ds_ens
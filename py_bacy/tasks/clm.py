@@ -20,7 +20,7 @@ from prefect import task
 import pandas as pd
 
 # Internal modules
-from .system import symlink
+from .io import link_or_merge
 
 
 __all__ = [
@@ -40,6 +40,8 @@ def link_clm_restart(
     Link clm_in-files to start CÖ; from a given output folder into the given
     input folder for the case of a internal model restart without any data
     assimilation.
+    If the source file is an analysis overlay, it is merged with its base
+    file into the input folder instead of linked.
 
     Parameters
     ----------
@@ -58,7 +60,7 @@ def link_clm_restart(
     """
     clm_source = os.path.join(parent_model_output, output_fname)
     clm_target = os.path.join(input_folder, 'clm_in.nc')
-    symlink.run(clm_source, clm_target)
+    link_or_merge(clm_source, clm_target)
     return clm_target
 
 
@@ -71,6 +73,8 @@ def link_clm_initial(
     """
     Link clm_in files to start CLM from a given output folder into the given
     input folder for the case of a fresh initial start of CLM.
+    If the source file is an analysis overlay, it is merged with its base
+    file into the input folder instead of linked.
 
     Parameters
     ----------
@@ -92,7 +96,7 @@ def link_clm_initial(
     )
     clm_source = os.path.join(parent_model_output, clm_out_file)
     clm_target = os.path.join(input_folder, 'clm_in.nc')
-    symlink.run(clm_source, clm_target)
+    link_or_merge(clm_source, clm_target)
     return clm_target
 
 
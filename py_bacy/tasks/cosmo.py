@@ -22,7 +22,7 @@ from prefect import task
 import pandas as pd
 
 # Internal modules
-from .system import symlink
+from .io import link_or_merge
 
 
 __all__ = [
@@ -43,6 +43,8 @@ def link_cos_restart(
     Link laf* files to start COSMO from a given output folder into the given
     input folder for the case of a internal model restart without any data
     assimilation.
+    If the source file is an analysis overlay, it is merged with its base
+    file into the input folder instead of linked.
 
     Parameters
     ----------
@@ -68,7 +70,7 @@ def link_cos_restart(
     )
     cos_source = list(sorted(glob.glob(cos_search_path)))[0]
     cos_target = os.path.join(input_folder, laf_file)
-    symlink.run(cos_source, cos_target)
+    link_or_merge(cos_source, cos_target)
     return cos_target
 
 
@@ -81,6 +83,8 @@ def link_cos_initial(
     """
     Link laf* files to start COSMO from a given output folder into the given
     input folder for the case of a fresh initial start of COSMO.
+    If the source file is an analysis overlay, it is merged with its base
+    file into the input folder instead of linked.
 
     Parameters
     ----------
@@ -99,7 +103,7 @@ def link_cos_initial(
     laf_file = model_start_time.strftime('laf%Y%m%d%H%M%S.nc')
     cos_source = os.path.join(parent_model_output, laf_file)
     cos_target = os.path.join(input_folder, laf_file)
-    symlink.run(cos_source, cos_target)
+    link_or_merge(cos_source, cos_target)
     return cos_target
 
 
@@ -0,0 +1,728 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Any, Callable, Dict, List, Tuple, Union
+import logging
+
+# External modules
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'EARTH_RADIUS',
+    'DEG_TO_M',
+    'press_int',
+    'coords_to_array',
+    'cart_dist_func',
+    'array_dist_func',
+    'CosmoDistance',
+    'ClmDistance',
+    'IndexedDistance'
+]
+
+
+EARTH_RADIUS = 6371000
+DEG_TO_M = 2 * np.pi / 360 * EARTH_RADIUS
+
+
+def press_int(level_height):
+    return 1013.25 * np.power(1 - (0.0065 * level_height / 288.15), 5.255)
+
+
+def coords_to_array(coords: Any) -> np.ndarray:
+    """
+    Convert grid coordinates into a contiguous float64 array with one row
+    per grid point and one column per coordinate.
+
+    Parameters
+    ----------
+    coords : pd.MultiIndex or np.ndarray
+        The coordinates, either as multiindex, as array of tuples or as
+        numeric array.
+
+    Returns
+    -------
+    coords_array : np.ndarray
+        The coordinates with shape (grid, coords).
+    """
+    if isinstance(coords, pd.MultiIndex):
+        coords_array = np.stack([
+            coords.get_level_values(level).values
+            for level in range(coords.nlevels)
+        ], axis=-1)
+    else:
+        coords_array = np.asarray(coords)
+        if coords_array.dtype == object:
+            coords_array = np.array(coords_array.tolist())
+    coords_array = np.ascontiguousarray(coords_array, dtype=np.float64)
+    return coords_array.reshape(len(coords_array), -1)
+
+
+def cart_dist_func(x: Any, y: Any) -> np.ndarray:
+    x_arr = np.atleast_1d(
+        np.array(x, dtype=('float, float'))
+    ).view(float).reshape(-1, 2)
+    y_arr = np.atleast_1d(
+        np.array(y, dtype=('float, float, float'))
+    ).view(float).reshape(-1, 3)[..., :-1]
+    diff = x_arr - y_arr
+    hori_diff = diff * DEG_TO_M
+    hori_diff = np.sqrt(np.sum(hori_diff ** 2, axis=-1))
+    return hori_diff
+
+
+def array_dist_func(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Horizontal distance in metres between a grid point and observations,
+    both given as float arrays from :py:func:`coords_to_array`.
+    This is the array-backed equivalent of :py:func:`cart_dist_func`
+    without conversion of the coordinates per call.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        The latitude and longitude of the grid point with shape (2, ).
+    y : np.ndarray
+        The latitude, longitude and height of the observations with shape
+        (obs, 3).
+
+    Returns
+    -------
+    hori_diff : np.ndarray
+        The horizontal distances with shape (obs, ).
+    """
+    diff = (x - y[:, :-1]) * DEG_TO_M
+    return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+
+def _get_values(coords: Any) -> np.ndarray:
+    return np.asarray(getattr(coords, 'values', coords))
+
+
+class CosmoDistance(object):
+    """
+    Horizontal and log-pressure distance between COSMO grid points and
+    observations.
+    The log-pressure of the grid levels is looked up from a table, which
+    is filled once per level height, while the log-pressure of the
+    observations is cached for the last observation grid.
+    The distance can be called for a single grid point, as expected by the
+    localization of pytassim, or for a whole block of grid points with
+    :py:meth:`batch`.
+
+    Parameters
+    ----------
+    horiz_start : int, optional
+        The horizontal coordinates start at this position of a grid point
+        and observation coordinate, while the last position is the height.
+        Default is 1.
+    """
+    def __init__(self, horiz_start: int = 1):
+        self.horiz_start = horiz_start
+        self._lnp_table: Dict[float, float] = {}
+        self._obs_cache = (None, None, None)
+
+    def __repr__(self) -> str:
+        return '{0:s}(horiz_start={1:d}, n_levels={2:d})'.format(
+            self.__class__.__name__, self.horiz_start, len(self._lnp_table)
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_obs_cache'] = (None, None, None)
+        return state
+
+    @staticmethod
+    def height_to_lnp(height: np.ndarray) -> np.ndarray:
+        return np.log(press_int(height))
+
+    def set_levels(self, level_heights: np.ndarray):
+        """
+        Precompute the log-pressure table for given level heights.
+
+        Parameters
+        ----------
+        level_heights : np.ndarray
+            The heights of the vertical grid in metres.
+        """
+        level_heights = np.unique(np.asarray(level_heights, dtype=float))
+        self._lnp_table.update(
+            zip(level_heights.tolist(),
+                self.height_to_lnp(level_heights).tolist())
+        )
+
+    def get_level_lnp(self, level_heights: np.ndarray) -> np.ndarray:
+        """
+        Look up the log-pressure of given level heights from the table.
+        Missing heights are added to the table.
+
+        Parameters
+        ----------
+        level_heights : np.ndarray
+            The heights of the grid levels in metres.
+
+        Returns
+        -------
+        level_lnp : np.ndarray
+            The log-pressure with the same shape as the heights.
+        """
+        level_heights = np.asarray(level_heights, dtype=float)
+        unique_heights, inverse = np.unique(
+            level_heights, return_inverse=True
+        )
+        missing = [
+            height for height in unique_heights.tolist()
+            if height not in self._lnp_table
+        ]
+        if missing:
+            self.set_levels(np.array(missing))
+        unique_lnp = np.array([
+            self._lnp_table[height] for height in unique_heights.tolist()
+        ])
+        return unique_lnp[inverse].reshape(level_heights.shape)
+
+    def get_obs(self, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the horizontal coordinates and log-pressure of the observations.
+        Both are cached for the last observation grid object.
+
+        Parameters
+        ----------
+        y : Any
+            The observation coordinates with the height as last column.
+
+        Returns
+        -------
+        obs_horiz : np.ndarray
+            The horizontal observation coordinates.
+        obs_lnp : np.ndarray
+            The log-pressure of the observations.
+        """
+        obs_ref, obs_horiz, obs_lnp = self._obs_cache
+        if y is not obs_ref:
+            obs_coords = _get_values(y)
+            obs_horiz = np.ascontiguousarray(
+                obs_coords[:, self.horiz_start:-1], dtype=float
+            )
+            obs_lnp = self.height_to_lnp(obs_coords[:, -1].astype(float))
+            self._obs_cache = (y, obs_horiz, obs_lnp)
+        return obs_horiz, obs_lnp
+
+    def get_point_horiz(self, x: Any) -> np.ndarray:
+        return np.asarray(x[self.horiz_start:-1], dtype=float)
+
+    def get_grid_horiz(self, x: Any) -> np.ndarray:
+        grid_coords = np.atleast_2d(_get_values(x))
+        return grid_coords[:, self.horiz_start:-1].astype(float)
+
+    def from_obs(
+            self,
+            x: Any,
+            obs_horiz: np.ndarray,
+            obs_lnp: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances of a grid point to observations, which are
+        already converted by :py:meth:`get_obs`.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid point, where the height is the last
+            coordinate.
+        obs_horiz : np.ndarray
+            The horizontal observation coordinates.
+        obs_lnp : np.ndarray
+            The log-pressure of the observations.
+
+        Returns
+        -------
+        dist_2d : np.ndarray
+            The horizontal distances in metres.
+        dist_vert : np.ndarray
+            The absolute log-pressure differences.
+        """
+        grid_horiz = self.get_point_horiz(x)
+        diff_obs_cos_m = (obs_horiz - grid_horiz) * DEG_TO_M
+        dist_obs_cos_2d = np.sqrt(np.sum(diff_obs_cos_m**2, axis=-1))
+        grid_height = float(x[-1])
+        try:
+            cos_lnp = self._lnp_table[grid_height]
+        except KeyError:
+            cos_lnp = self.get_level_lnp(grid_height)
+        dist_obs_cos_vert = np.abs(cos_lnp - obs_lnp)
+        return dist_obs_cos_2d, dist_obs_cos_vert
+
+    def __call__(self, x: Any, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        return self.from_obs(x, *self.get_obs(y))
+
+    def batch(self, x: Any, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances for a block of grid points at once.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid points with shape (grid, coords),
+            where the height is the last coordinate.
+        y : Any
+            The observation coordinates with shape (obs, coords), where the
+            height is the last coordinate.
+
+        Returns
+        -------
+        dist_2d : np.ndarray
+            The horizontal distances in metres with shape (grid, obs).
+        dist_vert : np.ndarray
+            The absolute log-pressure differences with shape (grid, obs).
+        """
+        return self.batch_from_obs(x, *self.get_obs(y))
+
+    def batch_from_obs(
+            self,
+            x: Any,
+            obs_horiz: np.ndarray,
+            obs_lnp: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances for a block of grid points to observations,
+        which are already converted by :py:meth:`get_obs`.
+        """
+        grid_coords = np.atleast_2d(_get_values(x))
+        grid_horiz = self.get_grid_horiz(grid_coords)
+        diff_obs_cos_m = (
+            obs_horiz[None, ...] - grid_horiz[:, None, :]
+        ) * DEG_TO_M
+        dist_obs_cos_2d = np.sqrt(np.sum(diff_obs_cos_m**2, axis=-1))
+        cos_lnp = self.get_level_lnp(grid_coords[:, -1].astype(float))
+        dist_obs_cos_vert = np.abs(cos_lnp[:, None] - obs_lnp[None, :])
+        return dist_obs_cos_2d, dist_obs_cos_vert
+
+
+class ClmDistance(object):
+    """
+    Horizontal and vertical distance between CLM grid points and
+    observations.
+    The CLM grid points are given as latitude and longitude, which have to
+    be transformed into the rotated coordinates of the observations.
+    The rotated coordinates of the whole grid are computed once with a
+    vectorized transform in :py:meth:`set_grid` and looked up afterwards,
+    such that no projection is needed per grid point.
+    Grid points, which are not part of the registered grid, are transformed
+    on demand and added to the lookup table.
+
+    Parameters
+    ----------
+    transform : Callable
+        This vectorized transform is called with arrays of longitudes and
+        latitudes and returns the rotated longitudes and latitudes.
+    horiz_start : int, optional
+        The latitude and longitude of a grid point start at this position,
+        while its last position is the height. The rotated latitude and
+        longitude of the observations start at the same position.
+        Default is 1.
+    """
+    def __init__(
+            self,
+            transform: Callable[
+                [np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]
+            ],
+            horiz_start: int = 1
+    ):
+        self.transform = transform
+        self.horiz_start = horiz_start
+        self._rotated: Dict[Tuple[float, float], Tuple[float, float]] = {}
+        self._obs_cache = (None, None, None)
+
+    def __repr__(self) -> str:
+        return '{0:s}(horiz_start={1:d}, n_grid={2:d})'.format(
+            self.__class__.__name__, self.horiz_start, len(self._rotated)
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_obs_cache'] = (None, None, None)
+        return state
+
+    def set_grid(self, lat: np.ndarray, lon: np.ndarray):
+        """
+        Transform the horizontal grid into rotated coordinates and store
+        them in the lookup table. Already registered points are skipped.
+
+        Parameters
+        ----------
+        lat : np.ndarray
+            The latitudes of the grid points in degrees.
+        lon : np.ndarray
+            The longitudes of the grid points in degrees.
+        """
+        grid_points = np.unique(
+            np.stack((np.ravel(lat), np.ravel(lon)), axis=-1).astype(float),
+            axis=0
+        )
+        is_missing = np.array([
+            point not in self._rotated for point in map(tuple, grid_points)
+        ], dtype=bool)
+        grid_points = grid_points[is_missing]
+        if not len(grid_points):
+            return
+        rot_lon, rot_lat = self.transform(grid_points[:, 1], grid_points[:, 0])
+        self._rotated.update(zip(
+            map(tuple, grid_points.tolist()),
+            zip(np.asarray(rot_lat).tolist(), np.asarray(rot_lon).tolist())
+        ))
+        logger.debug('Registered {0:d} CLM grid points'.format(
+            len(grid_points)
+        ))
+
+    def get_rotated(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """
+        Look up the rotated coordinates of given grid points.
+
+        Parameters
+        ----------
+        lat : np.ndarray
+            The latitudes of the grid points in degrees.
+        lon : np.ndarray
+            The longitudes of the grid points in degrees.
+
+        Returns
+        -------
+        rotated : np.ndarray
+            The rotated latitude and longitude as last axis.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        points = list(zip(lat.ravel().tolist(), lon.ravel().tolist()))
+        if any(point not in self._rotated for point in points):
+            self.set_grid(lat, lon)
+        rotated = np.array([self._rotated[point] for point in points])
+        return rotated.reshape(lat.shape + (2, ))
+
+    def get_obs(self, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the horizontal and vertical coordinates of the observations,
+        cached for the last observation grid object.
+
+        Parameters
+        ----------
+        y : Any
+            The observation coordinates with the height as last column.
+
+        Returns
+        -------
+        obs_horiz : np.ndarray
+            The rotated latitude and longitude of the observations.
+        obs_vert : np.ndarray
+            The height of the observations.
+        """
+        obs_ref, obs_horiz, obs_vert = self._obs_cache
+        if y is not obs_ref:
+            obs_coords = _get_values(y)
+            obs_horiz = np.ascontiguousarray(
+                obs_coords[:, self.horiz_start:-1], dtype=float
+            )
+            obs_vert = obs_coords[:, -1].astype(float)
+            self._obs_cache = (y, obs_horiz, obs_vert)
+        return obs_horiz, obs_vert
+
+    def get_point_horiz(self, x: Any) -> np.ndarray:
+        grid_point = (
+            float(x[self.horiz_start]), float(x[self.horiz_start+1])
+        )
+        try:
+            return np.array(self._rotated[grid_point])
+        except KeyError:
+            return self.get_rotated(*grid_point)
+
+    def get_grid_horiz(self, x: Any) -> np.ndarray:
+        grid_coords = np.atleast_2d(_get_values(x))
+        return self.get_rotated(
+            grid_coords[:, self.horiz_start],
+            grid_coords[:, self.horiz_start+1]
+        )
+
+    def from_obs(
+            self,
+            x: Any,
+            obs_horiz: np.ndarray,
+            obs_vert: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances of a grid point to observations, which are
+        already converted by :py:meth:`get_obs`.
+        """
+        grid_hori = self.get_point_horiz(x)
+        diff_obs_clm_m = (obs_horiz - grid_hori) * DEG_TO_M
+        dist_obs_clm_2d = np.sqrt(np.sum(diff_obs_clm_m**2, axis=-1))
+        dist_obs_clm_vert = np.abs(obs_vert - float(x[-1]))
+        return dist_obs_clm_2d, dist_obs_clm_vert
+
+    def __call__(self, x: Any, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        return self.from_obs(x, *self.get_obs(y))
+
+    def batch(self, x: Any, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances for a block of grid points at once.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid points with shape (grid, coords),
+            where the height is the last coordinate.
+        y : Any
+            The observation coordinates with shape (obs, coords), where the
+            height is the last coordinate.
+
+        Returns
+        -------
+        dist_2d : np.ndarray
+            The horizontal distances in metres with shape (grid, obs).
+        dist_vert : np.ndarray
+            The absolute height differences with shape (grid, obs).
+        """
+        return self.batch_from_obs(x, *self.get_obs(y))
+
+    def batch_from_obs(
+            self,
+            x: Any,
+            obs_horiz: np.ndarray,
+            obs_vert: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate the distances for a block of grid points to observations,
+        which are already converted by :py:meth:`get_obs`.
+        """
+        grid_coords = np.atleast_2d(_get_values(x))
+        grid_hori = self.get_grid_horiz(grid_coords)
+        diff_obs_clm_m = (
+            obs_horiz[None, ...] - grid_hori[:, None, :]
+        ) * DEG_TO_M
+        dist_obs_clm_2d = np.sqrt(np.sum(diff_obs_clm_m**2, axis=-1))
+        grid_vert = grid_coords[:, -1].astype(float)
+        dist_obs_clm_vert = np.abs(obs_vert[None, :] - grid_vert[:, None])
+        return dist_obs_clm_2d, dist_obs_clm_vert
+
+
+class IndexedDistance(object):
+    """
+    Pre-select the observations within a horizontal cutoff radius by a
+    spatial index, before the wrapped distance is estimated.
+    A :py:class:`scipy.spatial.cKDTree` is built once per observation grid
+    on the horizontal observation coordinates in metres, the same metric as
+    used by the wrapped distance.
+    For every grid point or grid block, only the observations within the
+    cutoff radius are passed to the wrapped distance, while all other
+    observations get the fill value as distance. The selected observations
+    are sliced out of the converted observations, which are cached by the
+    wrapped distance, such that they are converted only once per
+    observation grid.
+    The localized result is unchanged as long as the cutoff radius covers
+    the support of the horizontal localization function, e.g. twice the
+    horizontal length scale for Gaspari-Cohn.
+
+    Parameters
+    ----------
+    distance : CosmoDistance or ClmDistance
+        This distance is estimated for the pre-selected observations.
+    cutoff : float
+        The cutoff radius in metres.
+    fill_value : None or float, optional
+        The distances to observations outside the cutoff radius are set to
+        this value. If None (default), twice the cutoff radius is used.
+    """
+    def __init__(
+            self,
+            distance: Union[CosmoDistance, ClmDistance],
+            cutoff: float,
+            fill_value: Union[None, float] = None
+    ):
+        self.distance = distance
+        self.cutoff = float(cutoff)
+        if fill_value is None:
+            fill_value = 2 * self.cutoff
+        self.fill_value = fill_value
+        self._tree_cache = (None, None)
+
+    def __repr__(self) -> str:
+        return '{0:s}({1}, cutoff={2:.0f})'.format(
+            self.__class__.__name__, self.distance, self.cutoff
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_tree_cache'] = (None, None)
+        return state
+
+    @classmethod
+    def from_radius(
+            cls,
+            distance: Union[CosmoDistance, ClmDistance],
+            loc_radius: Any,
+            support_factor: float = 2.
+    ) -> 'IndexedDistance':
+        """
+        Initialize the indexed distance from localization radii, where the
+        first radius is the horizontal length scale in metres.
+
+        Parameters
+        ----------
+        distance : CosmoDistance or ClmDistance
+            This distance is estimated for the pre-selected observations.
+        loc_radius : float or Iterable[float]
+            The localization radii with the horizontal radius first.
+        support_factor : float, optional
+            The cutoff radius is the horizontal radius times this factor,
+            default is 2 as for Gaspari-Cohn.
+
+        Returns
+        -------
+        indexed_distance : IndexedDistance
+            The initialized indexed distance.
+        """
+        hori_radius = float(np.atleast_1d(loc_radius)[0])
+        return cls(distance, cutoff=hori_radius*support_factor)
+
+    def get_tree(self, y: Any) -> cKDTree:
+        """
+        Get the spatial index of the observations, which is cached for the
+        last observation grid object.
+
+        Parameters
+        ----------
+        y : Any
+            The observation coordinates.
+
+        Returns
+        -------
+        tree : cKDTree
+            The spatial index on the horizontal coordinates in metres.
+        """
+        obs_ref, tree = self._tree_cache
+        if y is not obs_ref:
+            obs_horiz = self.distance.get_obs(y)[0]
+            tree = cKDTree(obs_horiz * DEG_TO_M)
+            self._tree_cache = (y, tree)
+            logger.debug('Built spatial index for {0:d} observations'.format(
+                tree.n
+            ))
+        return tree
+
+    def select(self, x: Any, y: Any) -> List[np.ndarray]:
+        """
+        Select the observations within the cutoff radius for every grid
+        point of a block.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid points with shape (grid, coords).
+        y : Any
+            The observation coordinates with shape (obs, coords).
+
+        Returns
+        -------
+        obs_indices : List[np.ndarray]
+            The sorted indices of the selected observations per grid point.
+        """
+        tree = self.get_tree(y)
+        grid_horiz = self.distance.get_grid_horiz(x) * DEG_TO_M
+        obs_indices = tree.query_ball_point(
+            grid_horiz, r=self.cutoff, return_sorted=True
+        )
+        return [np.array(indices, dtype=int) for indices in obs_indices]
+
+    def select_block(self, x: Any, y: Any) -> np.ndarray:
+        """
+        Select the observations within the cutoff radius of any grid point
+        of a block.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid points with shape (grid, coords).
+        y : Any
+            The observation coordinates with shape (obs, coords).
+
+        Returns
+        -------
+        obs_index : np.ndarray
+            The sorted indices of the selected observations.
+        """
+        obs_indices = self.select(x, y)
+        if not obs_indices:
+            return np.zeros(0, dtype=int)
+        return np.unique(np.concatenate(obs_indices))
+
+    def _fill_distances(
+            self,
+            distances: Tuple[np.ndarray, ...],
+            obs_index: np.ndarray,
+            shape: Tuple[int, ...]
+    ) -> Tuple[np.ndarray, ...]:
+        filled_distances = []
+        for dist in distances:
+            filled = np.full(shape, self.fill_value, dtype=float)
+            filled[..., obs_index] = dist
+            filled_distances.append(filled)
+        return tuple(filled_distances)
+
+    def __call__(self, x: Any, y: Any) -> Tuple[np.ndarray, ...]:
+        tree = self.get_tree(y)
+        grid_horiz = self.distance.get_point_horiz(x) * DEG_TO_M
+        obs_index = np.array(
+            tree.query_ball_point(grid_horiz, r=self.cutoff,
+                                  return_sorted=True),
+            dtype=int
+        )
+        obs_horiz, obs_vert = self.distance.get_obs(y)
+        distances = self.distance.from_obs(
+            x, obs_horiz[obs_index], obs_vert[obs_index]
+        )
+        return self._fill_distances(distances, obs_index, (tree.n, ))
+
+    def batch(self, x: Any, y: Any) -> Tuple[np.ndarray, ...]:
+        """
+        Estimate the distances for a block of grid points at once, where
+        only the observations within the cutoff radius of the block are
+        passed to the wrapped distance.
+
+        Parameters
+        ----------
+        x : Any
+            The coordinates of the grid points with shape (grid, coords).
+        y : Any
+            The observation coordinates with shape (obs, coords).
+
+        Returns
+        -------
+        distances : Tuple[np.ndarray, ...]
+            The distances of the wrapped distance with shape (grid, obs).
+        """
+        grid_coords = np.atleast_2d(_get_values(x))
+        tree = self.get_tree(y)
+        obs_index = self.select_block(grid_coords, y)
+        obs_horiz, obs_vert = self.distance.get_obs(y)
+        distances = self.distance.batch_from_obs(
+            grid_coords, obs_horiz[obs_index], obs_vert[obs_index]
+        )
+        return self._fill_distances(
+            distances, obs_index, (len(grid_coords), tree.n)
+        )
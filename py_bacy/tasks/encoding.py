@@ -0,0 +1,174 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Dict, Any, Union
+
+# External modules
+import numpy as np
+import xarray as xr
+
+# Internal modules
+
+
+__all__ = [
+    'ENCODING_PROFILES',
+    'get_profile',
+    'get_profile_name',
+    'get_var_encoding',
+    'get_encoding'
+]
+
+
+DATAARRAY_VARIABLE = '__xarray_dataarray_variable__'
+ENCODING_PROFILES = {
+    'fast': {},
+    'balanced': {
+        'zlib': True,
+        'complevel': 1,
+        'shuffle': True
+    },
+    'archive': {
+        'zlib': True,
+        'complevel': 6,
+        'shuffle': True,
+        'least_significant_digit': 4
+    },
+}
+
+
+def get_profile(profile: str) -> Dict[str, Any]:
+    """
+    Get the encoding arguments of a named encoding profile.
+
+    Parameters
+    ----------
+    profile : str
+        The name of the profile, see :py:data:`ENCODING_PROFILES`.
+
+    Returns
+    -------
+    profile_encoding : Dict[str, Any]
+        A copy of the encoding arguments of the profile.
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if the profile is unknown.
+    """
+    try:
+        return ENCODING_PROFILES[profile].copy()
+    except KeyError:
+        raise ValueError(
+            'The given encoding profile {0:s} is unknown, available '
+            'profiles: {1}'.format(profile, list(ENCODING_PROFILES.keys()))
+        )
+
+
+def get_profile_name(
+        config: Dict[str, Any],
+        output_class: str,
+        default: str = 'fast'
+) -> str:
+    """
+    Get the name of the encoding profile for an output class from a given
+    configuration.
+    The profile is searched under the `encoding` keyword, which is either a
+    single profile name for all output classes or a mapping from output
+    class, e.g. `analysis`, `weights` or `info`, to profile name.
+
+    Parameters
+    ----------
+    config : Dict[str, Any]
+        The profile is searched within this configuration.
+    output_class : str
+        The profile is returned for this output class.
+    default : str, optional
+        This profile is returned if no profile is specified for the output
+        class, default is `fast`.
+
+    Returns
+    -------
+    profile : str
+        The name of the encoding profile.
+    """
+    encoding_config = config.get('encoding', None)
+    if encoding_config is None:
+        return default
+    elif isinstance(encoding_config, str):
+        return encoding_config
+    return encoding_config.get(output_class, default)
+
+
+def get_var_encoding(
+        dtype: np.dtype,
+        profile: str = 'fast'
+) -> Dict[str, Any]:
+    """
+    Get the encoding arguments of a profile for a variable with given data
+    type.
+    The arguments can be passed to `netCDF4.Dataset.createVariable`.
+    Lossy arguments are only used for floating point variables, whereas
+    non-numeric variables are never compressed.
+
+    Parameters
+    ----------
+    dtype : np.dtype
+        The data type of the variable.
+    profile : str, optional
+        The name of the encoding profile, default is `fast`.
+
+    Returns
+    -------
+    var_encoding : Dict[str, Any]
+        The encoding arguments for the variable.
+    """
+    var_encoding = get_profile(profile)
+    dtype = np.dtype(dtype)
+    if dtype.kind not in 'fiu':
+        return {}
+    if dtype.kind != 'f':
+        var_encoding.pop('least_significant_digit', None)
+    return var_encoding
+
+
+def get_encoding(
+        dataset: Union[xr.Dataset, xr.DataArray],
+        profile: str = 'fast'
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the encoding of an encoding profile for all data variables of a
+    dataset, which can be passed to `to_netcdf`.
+
+    Parameters
+    ----------
+    dataset : xr.Dataset or xr.DataArray
+        The encoding is created for the data variables of this dataset or
+        for this data array.
+    profile : str, optional
+        The name of the encoding profile, default is `fast`.
+
+    Returns
+    -------
+    encoding : Dict[str, Dict[str, Any]]
+        The encoding for every data variable.
+    """
+    if isinstance(dataset, xr.DataArray):
+        var_name = dataset.name
+        if var_name is None:
+            var_name = DATAARRAY_VARIABLE
+        return {var_name: get_var_encoding(dataset.dtype, profile)}
+    encoding = {
+        var_name: get_var_encoding(var.dtype, profile)
+        for var_name, var in dataset.data_vars.items()
+    }
+    return encoding
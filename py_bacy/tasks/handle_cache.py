@@ -0,0 +1,251 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Any, Callable, Dict, Hashable, Tuple
+from collections import OrderedDict
+import atexit
+import logging
+import os
+import threading
+
+# External modules
+import netCDF4 as nc4
+import xarray as xr
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'HandleCache',
+    'HANDLE_CACHE',
+    'open_netcdf4',
+    'open_dataset'
+]
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(
+            sorted((key, _freeze(val)) for key, val in value.items())
+        )
+    elif isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(val) for val in value)
+    return value
+
+
+class HandleCache(object):
+    """
+    A bounded cache for read-only file handles, which evicts the least
+    recently used handle.
+    The handles are keyed by the real path and modification time of the
+    file, the opener and its arguments. A rewritten file gets a new key such
+    that stale handles are never returned, while they are closed during
+    eviction.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The maximum number of cached handles, default is 64.
+    """
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._handles = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __repr__(self) -> str:
+        return '{0:s}(size={1:d}/{2:d}, hits={3:d}, misses={4:d})'.format(
+            self.__class__.__name__, len(self), self.max_size, self.hits,
+            self.misses
+        )
+
+    @staticmethod
+    def get_key(
+            file_path: str,
+            opener_name: str,
+            mode: str = 'r',
+            **kwargs
+    ) -> Tuple:
+        real_path = os.path.realpath(file_path)
+        mtime = os.stat(real_path).st_mtime_ns
+        return real_path, mtime, opener_name, mode, _freeze(kwargs)
+
+    @staticmethod
+    def _close(handle: Any):
+        try:
+            handle.close()
+        except (RuntimeError, OSError, AttributeError):
+            pass
+
+    def get(
+            self,
+            file_path: str,
+            opener: Callable,
+            mode: str = 'r',
+            **kwargs
+    ) -> Any:
+        """
+        Get a cached handle or open the file with given opener.
+
+        Parameters
+        ----------
+        file_path : str
+            This file is opened.
+        opener : Callable
+            This callable is called with the real path of the file and the
+            additional keyword arguments, if the handle is not cached.
+        mode : str, optional
+            The open mode, which is only used as part of the key.
+            Default is `r`.
+        **kwargs
+            Additional keyword arguments for the opener.
+
+        Returns
+        -------
+        handle : Any
+            The cached or newly opened handle.
+        """
+        key = self.get_key(
+            file_path, opener.__qualname__, mode=mode, **kwargs
+        )
+        with self._lock:
+            try:
+                handle = self._handles[key]
+                self._handles.move_to_end(key)
+                self.hits += 1
+                return handle
+            except KeyError:
+                self.misses += 1
+            handle = opener(key[0], **kwargs)
+            self._handles[key] = handle
+            self._evict()
+        logger.debug('Opened {0:s} into handle cache'.format(key[0]))
+        return handle
+
+    def _evict(self):
+        stale_keys = [
+            key for key in self._handles.keys()
+            if not os.path.exists(key[0])
+            or os.stat(key[0]).st_mtime_ns != key[1]
+        ]
+        for key in stale_keys:
+            self._close(self._handles.pop(key))
+        while len(self._handles) > self.max_size:
+            _, handle = self._handles.popitem(last=False)
+            self._close(handle)
+
+    def invalidate(self, file_path: str):
+        """
+        Close and remove all cached handles of a given file.
+        This should be called before the file is opened for writing.
+
+        Parameters
+        ----------
+        file_path : str
+            The handles of this file are invalidated.
+        """
+        real_path = os.path.realpath(file_path)
+        with self._lock:
+            invalid_keys = [
+                key for key in self._handles.keys() if key[0] == real_path
+            ]
+            for key in invalid_keys:
+                self._close(self._handles.pop(key))
+
+    def clear(self):
+        """
+        Close all cached handles and reset the counters.
+        """
+        with self._lock:
+            while self._handles:
+                _, handle = self._handles.popitem()
+                self._close(handle)
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of this cache.
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            The number of hits, misses and cached handles.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def log_stats(self, cache_logger: logging.Logger = logger):
+        """
+        Log the statistics of this cache as info.
+
+        Parameters
+        ----------
+        cache_logger : logging.Logger, optional
+            The statistics are logged with this logger, default is the
+            logger of this module.
+        """
+        cache_logger.info('Handle cache: {0}'.format(repr(self)))
+
+
+HANDLE_CACHE = HandleCache()
+atexit.register(HANDLE_CACHE.clear)
+
+
+def open_netcdf4(file_path: str) -> nc4.Dataset:
+    """
+    Open a netCDF-file read-only with netCDF4 through the process-wide
+    handle cache.
+    The returned handle is shared and should not be closed.
+
+    Parameters
+    ----------
+    file_path : str
+        This file is opened.
+
+    Returns
+    -------
+    nc_file : netCDF4.Dataset
+        The opened file.
+    """
+    return HANDLE_CACHE.get(file_path, nc4.Dataset, mode='r')
+
+
+def open_dataset(file_path: str, **kwargs) -> xr.Dataset:
+    """
+    Open a netCDF-file lazily with xarray through the process-wide handle
+    cache.
+    A shallow copy of the cached dataset is returned such that the cached
+    dataset is not changed by the caller.
+
+    Parameters
+    ----------
+    file_path : str
+        This file is opened.
+    **kwargs
+        Additional keyword arguments for `xarray.open_dataset`.
+
+    Returns
+    -------
+    ds : xr.Dataset
+        The opened dataset.
+    """
+    return HANDLE_CACHE.get(
+        file_path, xr.open_dataset, mode='r', **kwargs
+    ).copy(deep=False)
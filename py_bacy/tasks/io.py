@@ -11,49 +11,299 @@
 
 
 # System modules
-from typing import List, Union
-from shutil import copyfile
+from typing import List, Union, Tuple, Dict, Callable
+import os
+import glob
+import fcntl
+import hashlib
+import tempfile
+import threading
+import time
+from shutil import copyfile, copymode, rmtree
 
 # External modules
 import prefect
 from prefect import task
 
 import dask
-from distributed import Client, get_client
+from distributed import Client, Future, get_client, as_completed
 import netCDF4 as nc4
 import xarray as xr
 import numpy as np
 from tqdm.autonotebook import tqdm
 
 # Internal modules
+from .system import symlink
+from .chunking import ChunkingPolicy
+from .encoding import get_var_encoding
+from .handle_cache import HANDLE_CACHE, open_netcdf4, open_dataset
+
+
+FICLONE = 0x40049409
+NETCDF_LOCK = threading.Lock()
+COPY_CHUNK_SIZE = 16 * 1024 ** 2
+OVERLAY_ATTR = 'py_bacy_overlay_base'
+WRITE_STRATEGIES = ('copy', 'reflink', 'sparse', 'overlay')
+ZARR_CACHE_MAX_AGE = 3 * 24 * 3600
+ZARR_CACHE_MAX_SIZE = 100 * 1024 ** 3
+GRID_CHUNKS = {
+    'rlat': 64,
+    'rlon': 64,
+    'srlat': 64,
+    'srlon': 64,
+    'column': 4096,
+}
+
+
+__all__ = [
+    'get_drop_variables',
+    'load_single_member',
+    'load_members_serial',
+    'load_members_parallel',
+    'load_ens_data',
+    'get_cache_key',
+    'get_cache_dir',
+    'convert_to_zarr',
+    'clean_zarr_cache',
+    'load_ens_data_cached',
+    'copy_reflink',
+    'copy_sparse',
+    'copy_file',
+    'write_overlay',
+    'get_overlay_base',
+    'merge_overlay',
+    'link_or_merge',
+    'write_single_ens_mem',
+    'write_ens_member',
+    'write_ens_data',
+    'process_ens_member',
+    'stream_ens_data'
+]
+
+
+def _get_first_path(
+        file_paths: Union[str, List[str], List[List[str]]]
+) -> str:
+    first_path = file_paths
+    while not isinstance(first_path, str):
+        first_path = first_path[0]
+    if os.path.isfile(first_path):
+        return first_path
+    found_paths = list(sorted(glob.glob(first_path)))
+    if not found_paths:
+        raise OSError('Couldn\'t find any file for {0:s}'.format(first_path))
+    return found_paths[0]
+
+
+def get_drop_variables(
+        file_path: str,
+        variables: List[str],
+        keep_variables: Union[None, List[str]] = None
+) -> Tuple[List[str], int]:
+    """
+    Get the variables within given file that are not needed to load the
+    given variables.
+    Only the metadata of the file is read.
+    The needed variables are the given variables, their dimension
+    variables, and the variables within their `coordinates`, `bounds`,
+    and `grid_mapping` attributes. Auxiliary variables, which are needed
+    by the preprocessing but are not referenced by the variables, have to
+    be explicitly kept.
+
+    Parameters
+    ----------
+    file_path : str
+        The metadata of this NetCDF-file is inspected.
+    variables : List[str]
+        These variables should be loaded from the file.
+    keep_variables : None or List[str], optional
+        These auxiliary variables are additionally kept together with their
+        dimension variables if they are available within the file, e.g.
+        `vcoord` for COSMO. Default is None, where no auxiliary variable is
+        kept.
+
+    Returns
+    -------
+    drop_vars : List[str]
+        These variables can be dropped during opening of the file.
+    skipped_bytes : int
+        The number of bytes within the file, which are skipped if the drop
+        variables are not loaded.
+
+    Raises
+    ------
+    KeyError
+        A KeyError is raised if a given variable is not available within
+        the file.
+    """
+    nc_ds = open_netcdf4(file_path)
+    keep_vars = set(variables)
+    for var_name in variables:
+        try:
+            nc_var = nc_ds.variables[var_name]
+        except KeyError:
+            raise KeyError(
+                'Variable {0:s} not found within {1:s}'.format(
+                    var_name, file_path
+                )
+            )
+        keep_vars.update(nc_var.dimensions)
+        for attr_name in ('coordinates', 'bounds', 'grid_mapping'):
+            keep_vars.update(getattr(nc_var, attr_name, '').split())
+    for var_name in keep_variables or []:
+        if var_name in nc_ds.variables:
+            keep_vars.add(var_name)
+            keep_vars.update(nc_ds.variables[var_name].dimensions)
+    drop_vars = [
+        var_name for var_name in nc_ds.variables
+        if var_name not in keep_vars
+    ]
+    skipped_bytes = int(sum(
+        nc_ds.variables[var_name].size * getattr(
+            nc_ds.variables[var_name].dtype, 'itemsize', 0
+        ) for var_name in drop_vars
+    ))
+    return drop_vars, skipped_bytes
 
 
 def load_single_member(
-        file_paths: List[str]
+        file_paths: List[str],
+        parallel: bool = True,
+        drop_variables: Union[None, List[str]] = None,
+        chunks: Union[None, Dict[str, int]] = None
 ) -> xr.Dataset:
     """
     Load data from given file paths in NetCDF-4 format.
+    The files are opened lazily through the process-wide handle cache, see
+    :py:func:`py_bacy.tasks.handle_cache.open_dataset`, such that repeated
+    opens of the same background files reuse their handles.
 
     Parameters
     ----------
     file_paths : List[str]
+    parallel : bool, optional
+        If the files of this member should be opened in parallel with
+        dask.delayed. This should be deactivated if this function is already
+        executed on a dask worker. Default is True.
+    drop_variables : None or List[str], optional
+        These variables are dropped during opening and are never decoded.
+        Default is None, where no variable is dropped.
+    chunks : None or Dict[str, int], optional
+        The dask chunks of the opened dataset. Default is None, where a
+        single chunk per file and variable is used.
 
     Returns
     -------
     loaded_ds : xr.Dataset
     """
-    loaded_ds = xr.open_mfdataset(
-        file_paths, parallel=True, combine='nested',
-        concat_dim='time', decode_cf=True, decode_times=True,
-        data_vars='minimal', coords='minimal', compat='override'
+    if isinstance(file_paths, str):
+        file_paths = _expand_paths(file_paths)
+    open_kwargs = dict(
+        decode_cf=True, decode_times=True, drop_variables=drop_variables,
+        chunks=chunks or {}
+    )
+    if parallel:
+        opened_datasets = dask.compute(*[
+            dask.delayed(open_dataset)(path, **open_kwargs)
+            for path in file_paths
+        ])
+    else:
+        opened_datasets = [
+            open_dataset(path, **open_kwargs) for path in file_paths
+        ]
+    loaded_ds = xr.combine_nested(
+        list(opened_datasets), concat_dim='time', data_vars='minimal',
+        coords='minimal', compat='override', combine_attrs='override'
     )
     return loaded_ds
 
 
+def load_members_serial(
+        file_paths: Union[List[str], List[List[str]]],
+        drop_variables: Union[None, List[str]] = None,
+        chunks: Union[None, Dict[str, int]] = None
+) -> List[xr.Dataset]:
+    """
+    Open the ensemble members one after another within the calling process.
+
+    Parameters
+    ----------
+    file_paths : List[str] or List[List[str]]
+        Every item of this list is opened as single ensemble member.
+    drop_variables : None or List[str], optional
+        These variables are dropped during opening of every member.
+    chunks : None or Dict[str, int], optional
+        The dask chunks of every opened member.
+
+    Returns
+    -------
+    ds_ens_list : List[xr.Dataset]
+        The opened datasets in the same order as the given file paths.
+    """
+    ds_ens_list = []
+    pbar_paths = tqdm(file_paths)
+    for mem_paths in pbar_paths:
+        ds_mem = load_single_member(
+            file_paths=mem_paths, drop_variables=drop_variables,
+            chunks=chunks
+        )
+        ds_ens_list.append(ds_mem)
+    return ds_ens_list
+
+
+def load_members_parallel(
+        file_paths: Union[List[str], List[List[str]]],
+        client: Union[None, Client] = None,
+        drop_variables: Union[None, List[str]] = None,
+        chunks: Union[None, Dict[str, int]] = None
+) -> List[xr.Dataset]:
+    """
+    Open the ensemble members in parallel.
+    If a client is given, the members are opened on the workers of this
+    client and only the lazily opened datasets are transferred back.
+    The HDF5 library is not thread-safe and concurrent opens within one
+    process can fail, such that the members are opened serially with
+    :py:func:`load_members_serial` if no client is given.
+
+    Parameters
+    ----------
+    file_paths : List[str] or List[List[str]]
+        Every item of this list is opened as single ensemble member.
+    client : None or distributed.Client, optional
+        The members are distributed over the workers of this client.
+        If no client is given (default), the members are opened serially.
+    drop_variables : None or List[str], optional
+        These variables are dropped during opening of every member.
+    chunks : None or Dict[str, int], optional
+        The dask chunks of every opened member.
+
+    Returns
+    -------
+    ds_ens_list : List[xr.Dataset]
+        The opened datasets in the same order as the given file paths.
+    """
+    if client is not None:
+        ens_futures = client.map(
+            load_single_member, file_paths, parallel=False,
+            drop_variables=drop_variables, chunks=chunks, pure=False
+        )
+        ds_ens_list = client.gather(ens_futures)
+    else:
+        ds_ens_list = load_members_serial(
+            file_paths=file_paths, drop_variables=drop_variables,
+            chunks=chunks
+        )
+    return ds_ens_list
+
+
 @task
 def load_ens_data(
         file_paths: Union[List[str], List[List[str]]],
-        client: Client
+        client: Union[None, Client] = None,
+        parallel: bool = True,
+        variables: Union[None, List[str]] = None,
+        chunking: Union[None, ChunkingPolicy] = None,
+        keep_variables: Union[None, List[str]] = None
 ) -> xr.Dataset:
     """
     Load ensemble data with xarray and dask from given file paths.
@@ -66,7 +316,23 @@ def load_ens_data(
         All ensemble members have to result to the same ensemble structure.
     client : None or distributed.Client, optional
         This client is used to load the data for each ensemble member in
-        paralllel.
+        paralllel. If no client is given, the members are opened serially,
+        see :py:func:`load_members_parallel`.
+    parallel : bool, optional
+        If the ensemble members should be opened in parallel (default) or
+        serially one after another.
+    variables : None or List[str], optional
+        If given, only these variables and their coordinates are opened,
+        whereas all other variables are dropped before they are decoded.
+        The structure of the first file is used to determine the dropped
+        variables. Default is None, where all variables are opened.
+    chunking : None or ChunkingPolicy, optional
+        This policy is used to derive the chunks of the opened members and
+        to rechunk the concatenated ensemble. Default is None, where a
+        single chunk per file, variable and member is used.
+    keep_variables : None or List[str], optional
+        These auxiliary variables are additionally opened if `variables`
+        is given, see :py:func:`get_drop_variables`.
 
     Returns
     -------
@@ -76,21 +342,656 @@ def load_ens_data(
     """
     logger = prefect.context.get('logger')
     logger.debug('Source file paths: {0}'.format(file_paths))
-    ds_ens_list = []
-    pbar_paths = tqdm(file_paths)
-    for mem_paths in pbar_paths:
-        ds_mem = load_single_member(file_paths=mem_paths)
-        ds_ens_list.append(ds_mem)
+    if variables is not None:
+        drop_variables, skipped_bytes = get_drop_variables(
+            _get_first_path(file_paths), variables,
+            keep_variables=keep_variables
+        )
+        n_files = sum(
+            1 if isinstance(mem_paths, str) else len(mem_paths)
+            for mem_paths in file_paths
+        )
+        logger.info(
+            'Skip {0:d} variables, approximately {1:.2f} MB are not '
+            'loaded'.format(
+                len(drop_variables), skipped_bytes * n_files / 1024**2
+            )
+        )
+    else:
+        drop_variables = None
+    if chunking is not None:
+        chunks = chunking.get_chunks(
+            _get_first_path(file_paths), variables=variables,
+            ens_size=len(file_paths)
+        )
+        logger.info('Open ensemble members with chunks {0}'.format(chunks))
+    else:
+        chunks = None
+    if parallel:
+        ds_ens_list = load_members_parallel(
+            file_paths=file_paths, client=client,
+            drop_variables=drop_variables, chunks=chunks
+        )
+    else:
+        ds_ens_list = load_members_serial(
+            file_paths=file_paths, drop_variables=drop_variables,
+            chunks=chunks
+        )
     logger.info('Starting to concat ensemble')
     ds_ens = xr.concat(ds_ens_list, dim='ensemble')
+    if chunking is not None:
+        ds_ens = chunking.apply(ds_ens)
+    HANDLE_CACHE.log_stats(logger)
+    return ds_ens
+
+
+def _expand_paths(
+        file_paths: Union[str, List[str], List[List[str]]]
+) -> List[str]:
+    if isinstance(file_paths, str):
+        found_paths = list(sorted(glob.glob(file_paths)))
+        return found_paths or [file_paths]
+    return [
+        path for curr_paths in file_paths
+        for path in _expand_paths(curr_paths)
+    ]
+
+
+def get_cache_key(
+        file_paths: Union[List[str], List[List[str]]],
+        variables: Union[None, List[str]] = None
+) -> str:
+    """
+    Get a cache key for given file paths.
+    The key is based on the real paths and modification times of the files
+    such that the key changes if one of the files is rewritten.
+
+    Parameters
+    ----------
+    file_paths : List[str] or List[List[str]]
+        The key is created for these file paths.
+    variables : None or List[str], optional
+        The loaded variables, which are additionally used to create the key.
+
+    Returns
+    -------
+    cache_key : str
+        The created cache key as hexadecimal digest.
+    """
+    hasher = hashlib.sha1()
+    for path in _expand_paths(file_paths):
+        real_path = os.path.realpath(path)
+        hasher.update('{0:s}:{1:d};'.format(
+            real_path, os.stat(real_path).st_mtime_ns
+        ).encode('utf-8'))
+    if variables is not None:
+        hasher.update(','.join(sorted(variables)).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def get_cache_dir(
+        file_paths: Union[List[str], List[List[str]]]
+) -> str:
+    """
+    Get the cache directory for given file paths.
+    The cache directory is the `zarr_cache` folder within the common
+    directory of the given file paths, e.g. the input folder of a run
+    directory.
+
+    Parameters
+    ----------
+    file_paths : List[str] or List[List[str]]
+        The cache directory is constructed for these file paths.
+
+    Returns
+    -------
+    cache_dir : str
+        The path to the cache directory.
+    """
+    file_dirs = [
+        os.path.dirname(os.path.abspath(path))
+        for path in _expand_paths(file_paths)
+    ]
+    return os.path.join(os.path.commonpath(file_dirs), 'zarr_cache')
+
+
+def convert_to_zarr(
+        ds_ens: xr.Dataset,
+        store_path: str,
+        grid_chunks: Union[None, Dict[str, int]] = None
+) -> str:
+    """
+    Write a given ensemble dataset into a chunked Zarr store.
+    The ensemble dimension is stacked into every chunk, whereas the
+    horizontal grid dimensions are split into blocks, such that a grid block
+    can be read for all ensemble members at once.
+    The store is written into a temporary directory and moved afterwards to
+    the store path. If the store already exists or is concurrently created
+    by another process, the temporary directory is discarded and the
+    existing store is reused.
+
+    Parameters
+    ----------
+    ds_ens : xr.Dataset
+        This dataset with ensemble dimension is written.
+    store_path : str
+        The Zarr store is created under this path.
+    grid_chunks : None or Dict[str, int], optional
+        The chunk sizes of the grid dimensions. All other dimensions are not
+        chunked. If None (default), :py:data:`GRID_CHUNKS` is used.
+
+    Returns
+    -------
+    store_path : str
+        The path to the written Zarr store.
+    """
+    if grid_chunks is None:
+        grid_chunks = GRID_CHUNKS
+    chunks = {
+        dim: grid_chunks.get(dim, -1) for dim in ds_ens.dims
+    }
+    if os.path.isdir(store_path):
+        return store_path
+    ds_ens = ds_ens.chunk(chunks)
+    for var in ds_ens.variables.values():
+        var.encoding = {}
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    tmp_path = tempfile.mkdtemp(
+        prefix='{0:s}.'.format(os.path.basename(store_path)),
+        dir=os.path.dirname(store_path)
+    )
+    try:
+        ds_ens.to_zarr(tmp_path, mode='w', consolidated=True)
+        os.replace(tmp_path, store_path)
+    except OSError:
+        if not os.path.isdir(store_path):
+            raise
+    finally:
+        rmtree(tmp_path, ignore_errors=True)
+    return store_path
+
+
+def _get_dir_size(dir_path: str) -> int:
+    dir_size = 0
+    for curr_dir, _, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            try:
+                dir_size += os.path.getsize(os.path.join(curr_dir, file_name))
+            except OSError:
+                pass
+    return dir_size
+
+
+def clean_zarr_cache(
+        cache_dir: str,
+        max_age: Union[None, float] = ZARR_CACHE_MAX_AGE,
+        max_size: Union[None, int] = ZARR_CACHE_MAX_SIZE,
+        keep: Union[None, List[str]] = None
+) -> List[str]:
+    """
+    Evict Zarr stores from a cache directory.
+    Stores that were not used for longer than the maximum age are removed.
+    Afterwards, the least recently used stores are removed until the cache
+    is smaller than the maximum size. Left-over temporary stores of
+    aborted conversions are only removed by their age.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The Zarr stores within this directory are cleaned.
+    max_age : None or float, optional
+        The maximum age in seconds since the last use of a store. If None,
+        no store is removed by its age. Default is
+        :py:data:`ZARR_CACHE_MAX_AGE` (three days).
+    max_size : None or int, optional
+        The maximum size of the cache directory in bytes. If None, no store
+        is removed by its size. Default is :py:data:`ZARR_CACHE_MAX_SIZE`
+        (100 GiB).
+    keep : None or List[str], optional
+        These store paths are never removed, e.g. the currently used store.
+
+    Returns
+    -------
+    removed_paths : List[str]
+        The paths of the removed stores.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+    keep = [os.path.abspath(path) for path in (keep or [])]
+    curr_time = time.time()
+    cache_entries = []
+    for entry_name in os.listdir(cache_dir):
+        entry_path = os.path.abspath(os.path.join(cache_dir, entry_name))
+        try:
+            last_used = os.stat(entry_path).st_mtime
+        except FileNotFoundError:
+            continue
+        cache_entries.append(
+            (last_used, _get_dir_size(entry_path), entry_path)
+        )
+    cache_entries = sorted(cache_entries)
+    total_size = sum(entry[1] for entry in cache_entries)
+    removed_paths = []
+    for last_used, entry_size, entry_path in cache_entries:
+        if entry_path in keep:
+            continue
+        too_old = max_age is not None and curr_time - last_used > max_age
+        too_large = (
+            max_size is not None and total_size > max_size
+            and entry_path.endswith('.zarr')
+        )
+        if too_old or too_large:
+            rmtree(entry_path, ignore_errors=True)
+            total_size -= entry_size
+            removed_paths.append(entry_path)
+    return removed_paths
+
+
+@task
+def load_ens_data_cached(
+        file_paths: Union[List[str], List[List[str]]],
+        cache_dir: Union[None, str] = None,
+        client: Union[None, Client] = None,
+        variables: Union[None, List[str]] = None,
+        grid_chunks: Union[None, Dict[str, int]] = None,
+        chunking: Union[None, ChunkingPolicy] = None,
+        max_age: Union[None, float] = ZARR_CACHE_MAX_AGE,
+        max_size: Union[None, int] = ZARR_CACHE_MAX_SIZE,
+        keep_variables: Union[None, List[str]] = None
+) -> xr.Dataset:
+    """
+    Load ensemble data through a Zarr cache.
+    If no Zarr store exists for the given file paths, the ensemble is loaded
+    with :py:func:`load_ens_data` and converted with
+    :py:func:`convert_to_zarr`.
+    The store is keyed by the real paths and modification times of the
+    files, such that rewritten files are read again.
+    Stale stores within the cache directory are evicted with
+    :py:func:`clean_zarr_cache`.
+
+    Parameters
+    ----------
+    file_paths : List[str] or List[List[str]]
+        The ensemble is loaded from these files,
+        see :py:func:`load_ens_data`.
+    cache_dir : None or str, optional
+        The Zarr stores are stored in this directory. If None (default),
+        the directory is inferred with :py:func:`get_cache_dir`.
+    client : None or distributed.Client, optional
+        This client is used to load the data if the store has to be created.
+    variables : None or List[str], optional
+        Only these variables are loaded and cached. If None (default), all
+        variables are loaded.
+    grid_chunks : None or Dict[str, int], optional
+        The chunk sizes of the grid dimensions within the store,
+        see :py:func:`convert_to_zarr`.
+    chunking : None or ChunkingPolicy, optional
+        This policy is used to load the data if the store has to be created,
+        see :py:func:`load_ens_data`.
+    max_age : None or float, optional
+        Stores that were not used for this number of seconds are evicted,
+        see :py:func:`clean_zarr_cache`.
+    max_size : None or int, optional
+        The least recently used stores are evicted until the cache directory
+        is smaller than this number of bytes, see
+        :py:func:`clean_zarr_cache`.
+    keep_variables : None or List[str], optional
+        These auxiliary variables are additionally loaded and cached, see
+        :py:func:`load_ens_data`.
+
+    Returns
+    -------
+    ds_ens : xr.Dataset
+        The ensemble dataset, lazily opened from the Zarr store.
+    """
+    logger = prefect.context.get('logger')
+    if cache_dir is None:
+        cache_dir = get_cache_dir(file_paths)
+    key_variables = variables
+    if variables is not None and keep_variables:
+        key_variables = list(variables) + list(keep_variables)
+    cache_key = get_cache_key(file_paths, variables=key_variables)
+    store_path = os.path.join(cache_dir, '{0:s}.zarr'.format(cache_key))
+    if os.path.isdir(store_path):
+        logger.info('Load ensemble data from cache {0:s}'.format(store_path))
+        os.utime(store_path)
+    else:
+        ds_ens = load_ens_data.run(
+            file_paths=file_paths, client=client, variables=variables,
+            chunking=chunking, keep_variables=keep_variables
+        )
+        convert_to_zarr(ds_ens, store_path, grid_chunks=grid_chunks)
+        logger.info('Cached ensemble data to {0:s}'.format(store_path))
+    removed_paths = clean_zarr_cache(
+        cache_dir, max_age=max_age, max_size=max_size, keep=[store_path]
+    )
+    if removed_paths:
+        logger.info('Evicted {0:d} stores from cache {1:s}'.format(
+            len(removed_paths), cache_dir
+        ))
+    ds_ens = xr.open_zarr(store_path, consolidated=True)
     return ds_ens
 
 
+def copy_reflink(
+        source_path: str,
+        target_path: str
+) -> str:
+    """
+    Clone the source file into the target path with a copy-on-write
+    reflink.
+    The data blocks are shared between both files until one of them is
+    modified, such that no data is copied.
+
+    Parameters
+    ----------
+    source_path : str
+        This file is cloned.
+    target_path : str
+        The clone is created under this path.
+
+    Returns
+    -------
+    target_path : str
+        The path to the cloned file.
+
+    Raises
+    ------
+    OSError
+        An OSError is raised if the file system does not support reflinks.
+    """
+    with open(source_path, 'rb') as source_file, \
+            open(target_path, 'wb') as target_file:
+        fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+    return target_path
+
+
+def copy_sparse(
+        source_path: str,
+        target_path: str,
+        chunk_size: int = COPY_CHUNK_SIZE
+) -> str:
+    """
+    Copy the source file chunk-wise into the target path.
+    Chunks that only contain zeros are not written but skipped such that
+    the target file is created as sparse file.
+
+    Parameters
+    ----------
+    source_path : str
+        This file is copied.
+    target_path : str
+        The copy is created under this path.
+    chunk_size : int, optional
+        The file is copied in chunks with this number of bytes.
+        Default is 16 MiB.
+
+    Returns
+    -------
+    target_path : str
+        The path to the copied file.
+    """
+    zero_chunk = bytes(chunk_size)
+    with open(source_path, 'rb') as source_file, \
+            open(target_path, 'wb') as target_file:
+        while True:
+            chunk = source_file.read(chunk_size)
+            if not chunk:
+                break
+            if chunk == zero_chunk[:len(chunk)]:
+                target_file.seek(len(chunk), os.SEEK_CUR)
+            else:
+                target_file.write(chunk)
+        target_file.truncate()
+    return target_path
+
+
+def copy_file(
+        source_path: str,
+        target_path: str,
+        strategy: str = 'reflink'
+) -> str:
+    """
+    Copy the source file to the target path with given copy strategy.
+
+    Parameters
+    ----------
+    source_path : str
+        This file is copied.
+    target_path : str
+        The copy is created under this path.
+    strategy : str, optional
+        The copy strategy. `copy` is a full copy with
+        :py:func:`shutil.copyfile`, `sparse` is a chunk-wise copy that skips
+        zero chunks, and `reflink` (default) tries to create a copy-on-write
+        reflink and falls back to the full copy if the file system does not
+        support reflinks. The full copy is chunked within the kernel and is
+        faster than the sparse copy for dense files.
+
+    Returns
+    -------
+    used_strategy : str
+        The copy strategy that was finally used.
+    """
+    if strategy == 'reflink':
+        try:
+            copy_reflink(source_path, target_path)
+            return 'reflink'
+        except OSError:
+            strategy = 'copy'
+    if strategy == 'sparse':
+        copy_sparse(source_path, target_path)
+    elif strategy == 'copy':
+        copyfile(source_path, target_path)
+    else:
+        raise ValueError(
+            'Given copy strategy {0:s} is not available'.format(strategy)
+        )
+    return strategy
+
+
+def _get_values(
+        dataset: Union[xr.Dataset, nc4.Dataset],
+        var_name: str
+) -> np.ndarray:
+    values = dataset[var_name][:]
+    return getattr(values, 'values', values)
+
+
+def _patch_variables(
+        target_path: str,
+        analysis_dataset: Union[xr.Dataset, nc4.Dataset],
+        assim_vars: List[str]
+):
+    var_values = {
+        var_name: _get_values(analysis_dataset, var_name)
+        for var_name in assim_vars
+    }
+    HANDLE_CACHE.invalidate(target_path)
+    with NETCDF_LOCK, nc4.Dataset(target_path, mode='r+') as loaded_ds:
+        for var_name, values in var_values.items():
+            loaded_ds[var_name][:] = values
+
+
+def write_overlay(
+        source_path: str,
+        target_path: str,
+        analysis_dataset: xr.Dataset,
+        assim_vars: List[str],
+        encoding_profile: str = 'fast'
+) -> str:
+    """
+    Write only the assimilation variables into a small overlay file.
+    The overlay has the same variable definitions as the source file and
+    references the real path of the source file as base file within its
+    global attributes.
+    The overlay can be merged with its base file with
+    :py:func:`merge_overlay`.
+
+    Parameters
+    ----------
+    source_path : str
+        This netCDF-file is used as base file for the overlay.
+    target_path : str
+        The overlay is created under this path.
+    analysis_dataset : xr.Dataset
+        The assimilation variables are written from this dataset.
+    assim_vars : List[str]
+        Only these variables are written to the overlay.
+    encoding_profile : str, optional
+        The variables of the overlay are encoded with this profile, see
+        :py:data:`py_bacy.tasks.encoding.ENCODING_PROFILES`. Default is
+        `fast`, where the variables are not compressed.
+
+    Returns
+    -------
+    target_path : str
+        The path to the written overlay.
+    """
+    base_path = os.path.realpath(source_path)
+    source_ds = open_netcdf4(base_path)
+    var_values = {
+        var_name: _get_values(analysis_dataset, var_name)
+        for var_name in assim_vars
+    }
+    HANDLE_CACHE.invalidate(target_path)
+    with NETCDF_LOCK, nc4.Dataset(target_path, mode='w',
+                                  format=source_ds.data_model) as overlay_ds:
+        overlay_ds.setncattr(OVERLAY_ATTR, base_path)
+        for var_name in assim_vars:
+            source_var = source_ds[var_name]
+            for dim_name in source_var.dimensions:
+                if dim_name not in overlay_ds.dimensions:
+                    source_dim = source_ds.dimensions[dim_name]
+                    overlay_ds.createDimension(
+                        dim_name,
+                        None if source_dim.isunlimited() else len(source_dim)
+                    )
+            var_attrs = source_var.__dict__.copy()
+            fill_value = var_attrs.pop('_FillValue', None)
+            overlay_var = overlay_ds.createVariable(
+                var_name, source_var.dtype, source_var.dimensions,
+                fill_value=fill_value,
+                **get_var_encoding(source_var.dtype, encoding_profile)
+            )
+            overlay_var.setncatts(var_attrs)
+            overlay_var[:] = var_values[var_name]
+    return target_path
+
+
+def get_overlay_base(file_path: str) -> Union[None, str]:
+    """
+    Get the base file of a given overlay file.
+
+    Parameters
+    ----------
+    file_path : str
+        This file is checked.
+
+    Returns
+    -------
+    base_path : None or str
+        The path to the base file. If the given file is no overlay, None is
+        returned.
+    """
+    try:
+        base_path = getattr(open_netcdf4(file_path), OVERLAY_ATTR, None)
+    except OSError:
+        base_path = None
+    return base_path
+
+
+def merge_overlay(
+        overlay_path: str,
+        target_path: str,
+        strategy: str = 'reflink'
+) -> str:
+    """
+    Merge an overlay with its base file into a full file.
+    The base file is copied to a temporary file, the variables of the overlay
+    are patched into this copy, and the copy is atomically moved to the
+    target path.
+
+    Parameters
+    ----------
+    overlay_path : str
+        This overlay is merged.
+    target_path : str
+        The merged file is created under this path.
+    strategy : str, optional
+        The copy strategy to copy the base file, see :py:func:`copy_file`.
+        Default is `reflink`.
+
+    Returns
+    -------
+    target_path : str
+        The path to the merged file.
+
+    Raises
+    ------
+    ValueError
+        A ValueError is raised if the given path is no overlay.
+    """
+    base_path = get_overlay_base(overlay_path)
+    if base_path is None:
+        raise ValueError(
+            'Given path {0:s} is no overlay!'.format(overlay_path)
+        )
+    tmp_fd, tmp_file = tempfile.mkstemp(
+        suffix='.nc', dir=os.path.dirname(os.path.abspath(target_path))
+    )
+    os.close(tmp_fd)
+    try:
+        _ = copy_file(base_path, tmp_file, strategy=strategy)
+        copymode(base_path, tmp_file)
+        overlay_ds = open_netcdf4(overlay_path)
+        _patch_variables(tmp_file, overlay_ds, list(overlay_ds.variables))
+        HANDLE_CACHE.invalidate(target_path)
+        os.replace(tmp_file, target_path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return target_path
+
+
+def link_or_merge(
+        source_path: str,
+        target_path: str
+) -> str:
+    """
+    Link the source path to the target path.
+    If the source path is an overlay, the overlay is merged with its base
+    file into the target path instead.
+
+    Parameters
+    ----------
+    source_path : str
+        This path is linked or merged.
+    target_path : str
+        This is the target path, which will be overwritten if it already
+        exists.
+
+    Returns
+    -------
+    target_path : str
+        The linked or merged target path.
+    """
+    logger = prefect.context.get('logger')
+    if get_overlay_base(source_path) is None:
+        return symlink.run(source=source_path, target=target_path)
+    logger.debug(
+        'Merge overlay: {0:s} -> {1:s}'.format(source_path, target_path)
+    )
+    return merge_overlay(source_path, target_path)
+
+
 def write_single_ens_mem(
         source_path: str,
         target_path: str,
         analysis_dataset: xr.Dataset,
-        assim_vars: List[str]
+        assim_vars: List[str],
+        strategy: str = 'reflink',
+        encoding_profile: str = 'fast'
 ) -> str:
     """
     Write a single ensemble member where the source and target path are
@@ -111,31 +1012,99 @@ def write_single_ens_mem(
     assim_vars : List[str]
         These list of assimilation variables specifies which variables were
         changed during the assimilation process.
+    strategy : str, optional
+        The write strategy, one of `copy`, `sparse`, `reflink` (default), or
+        `overlay`.
+        The first three strategies copy the source file with
+        :py:func:`copy_file` and patch the assimilation variables in place,
+        whereas `overlay` only writes the assimilation variables into a small
+        overlay file with :py:func:`write_overlay`.
+    encoding_profile : str, optional
+        The encoding profile of the written variables, default is `fast`.
+        The profile is only used for newly created variables in the
+        `overlay` strategy, whereas all other strategies keep the encoding of
+        the source file.
 
     Returns
     -------
     target_path : str
         The target path with the written data.
     """
-    copyfile(source_path, target_path)
-    with nc4.Dataset(target_path, mode='r+') as loaded_ds:
-        for var_name in assim_vars:
-            loaded_ds[var_name][:] = analysis_dataset[var_name]
+    HANDLE_CACHE.invalidate(target_path)
+    if strategy == 'overlay':
+        return write_overlay(
+            source_path, target_path, analysis_dataset, assim_vars,
+            encoding_profile=encoding_profile
+        )
+    _ = copy_file(source_path, target_path, strategy=strategy)
+    _patch_variables(target_path, analysis_dataset, assim_vars)
     return target_path
 
 
+def write_ens_member(
+        source_path: str,
+        target_path: str,
+        ens_dataset: xr.Dataset,
+        member_num: int,
+        assim_vars: List[str],
+        strategy: str = 'reflink',
+        encoding_profile: str = 'fast'
+) -> str:
+    """
+    Slice a single ensemble member out of given ensemble dataset and write
+    it with :py:func:`write_single_ens_mem`.
+    This function is meant to be executed on a dask worker, which holds the
+    ensemble dataset, such that only the ensemble member is sliced on the
+    worker.
+
+    Parameters
+    ----------
+    source_path : str
+        This netCDF4-file will be used as base file.
+    target_path : str
+        The ensemble member will be written to this target path.
+    ens_dataset : xr.Dataset
+        The ensemble member is sliced out of this dataset with an ensemble
+        dimension.
+    member_num : int
+        The position of the ensemble member within the ensemble dimension.
+    assim_vars : List[str]
+        These variables are written to the target path.
+    strategy : str, optional
+        The write strategy, see :py:func:`write_single_ens_mem`.
+        Default is `reflink`.
+    encoding_profile : str, optional
+        The encoding profile, see :py:func:`write_single_ens_mem`.
+        Default is `fast`.
+
+    Returns
+    -------
+    target_path : str
+        The target path with the written data.
+    """
+    analysis_dataset = ens_dataset.isel(ensemble=member_num)
+    return write_single_ens_mem(
+        source_path, target_path, analysis_dataset, assim_vars,
+        strategy=strategy, encoding_profile=encoding_profile
+    )
+
+
 @task
 def write_ens_data(
         dataset_to_write: xr.Dataset,
         source_paths: List[str],
         target_paths: List[str],
         assim_vars: List[str],
-        client: Union[None, Client] = None
+        client: Union[None, Client] = None,
+        strategy: str = 'reflink',
+        encoding_profile: str = 'fast'
 ) -> str:
     """
     Write a given dataset with ensemble members to given target paths.
     The source path is used as base netCDF4-file and will be copied to the
     target paths.
+    The assimilation variables of the dataset are scattered only once to the
+    cluster and every write task slices its ensemble member on the worker.
 
     Parameters
     ----------
@@ -161,6 +1130,12 @@ def write_ens_data(
     client : None or distributed.Client, optional
         This client is used to write the analysis for each ensemble member in
         paralllel.
+    strategy : str, optional
+        The write strategy for every ensemble member, see
+        :py:func:`write_single_ens_mem`. Default is `reflink`.
+    encoding_profile : str, optional
+        The encoding profile for every ensemble member, see
+        :py:func:`write_single_ens_mem`. Default is `fast`.
 
     Returns
     -------
@@ -171,18 +1146,186 @@ def write_ens_data(
     if client is None:
         logger.warning('No client was given, I try to infer the client')
         client = get_client(timeout=10)
-    ens_delayed_list = []
-    for member_num, source_path in enumerate(source_paths):
-        dataset_scattered = client.scatter(
-            dataset_to_write.isel(ensemble=member_num)
-        )
-        tmp_delayed = dask.delayed(write_single_ens_mem)(
-            source_path, target_paths[member_num], dataset_scattered, assim_vars
+    ens_future = client.scatter(
+        dataset_to_write[assim_vars], broadcast=False, hash=False
+    )
+    write_futures = [
+        client.submit(
+            write_ens_member, source_path, target_paths[member_num],
+            ens_future, member_num, assim_vars, strategy=strategy,
+            encoding_profile=encoding_profile, pure=False
         )
-        ens_delayed_list.append(tmp_delayed)
-    ens_delayed_list = client.compute(ens_delayed_list)
-    _ = client.gather(ens_delayed_list)
+        for member_num, source_path in enumerate(source_paths)
+    ]
+    _ = client.gather(write_futures)
     logger.debug(
         'Finished writing of ensemble data to {0}'.format(target_paths)
     )
+    HANDLE_CACHE.log_stats(logger)
     return target_paths
+
+
+def process_ens_member(
+        source_path: str,
+        target_path: str,
+        analysis: xr.DataArray,
+        model_dataset: xr.Dataset,
+        assim_vars: List[str],
+        post_process_func: Callable,
+        strategy: str = 'reflink',
+        encoding_profile: str = 'fast'
+) -> str:
+    """
+    Post-process and write a single ensemble member.
+    The ensemble member is post-processed with given function and written
+    with :py:func:`write_ens_member`.
+    This function is meant to be executed on a dask worker, which holds the
+    analysis and model dataset of this ensemble member.
+
+    Parameters
+    ----------
+    source_path : str
+        This netCDF4-file will be used as base file.
+    target_path : str
+        The ensemble member will be written to this target path.
+    analysis : xr.DataArray
+        The analysis of this ensemble member with an ensemble dimension of
+        length one.
+    model_dataset : xr.Dataset
+        The model dataset of this ensemble member with an ensemble dimension
+        of length one, which is passed to the post-processing function.
+    assim_vars : List[str]
+        These variables are written to the target path.
+    post_process_func : Callable
+        This function is called with the sliced analysis and model dataset
+        and has to return the analysis as dataset.
+    strategy : str, optional
+        The write strategy, see :py:func:`write_single_ens_mem`.
+        Default is `reflink`.
+    encoding_profile : str, optional
+        The encoding profile, see :py:func:`write_single_ens_mem`.
+        Default is `fast`.
+
+    Returns
+    -------
+    target_path : str
+        The target path with the written data.
+    """
+    analysis_dataset = post_process_func(analysis, model_dataset)
+    return write_ens_member(
+        source_path, target_path, analysis_dataset, 0, assim_vars,
+        strategy=strategy, encoding_profile=encoding_profile
+    )
+
+
+def _get_member_future(
+        client: Client,
+        data: Union[xr.Dataset, xr.DataArray],
+        member_num: int
+) -> Future:
+    member_data = data.isel(ensemble=[member_num])
+    if member_data.chunks:
+        return client.compute(member_data)
+    return client.scatter(member_data, hash=False)
+
+
+@task
+def stream_ens_data(
+        analysis: xr.DataArray,
+        model_dataset: xr.Dataset,
+        post_process_func: Callable,
+        source_paths: List[str],
+        target_paths: List[str],
+        assim_vars: List[str],
+        link_dirs: Union[None, List[str]] = None,
+        client: Union[None, Client] = None,
+        strategy: str = 'reflink',
+        encoding_profile: str = 'fast'
+) -> Tuple[List[str], List[str]]:
+    """
+    Post-process, write and link the analysis member by member.
+    The analysis and model dataset are sliced into ensemble members without
+    loading them. The slices of lazy data are computed on the cluster,
+    whereas the slices of loaded data are scattered. Afterwards, the
+    post-processing and write of every ensemble member is submitted as
+    independent future, see :py:func:`process_ens_member`. There is thus no
+    global compute of the whole ensemble.
+    An ensemble member is linked into its link directory as soon as its
+    analysis is written.
+
+    Parameters
+    ----------
+    analysis : xr.DataArray
+        The analysis with an ensemble dimension as returned by the
+        assimilation.
+    model_dataset : xr.Dataset
+        The model dataset with an ensemble dimension, which is used to
+        post-process the analysis.
+    post_process_func : Callable
+        This function post-processes a single ensemble member. It is called
+        with the analysis and model dataset of this member and has to return
+        the analysis as dataset.
+    source_paths : List[str]
+        Each item of this source path list is used as base file for the
+        corresponding ensemble member.
+    target_paths : List[str]
+        For each ensemble member, the analysis is written to these paths.
+    assim_vars : List[str]
+        These variables are written to the target paths.
+    link_dirs : None or List[str], optional
+        Every written analysis is linked into the corresponding directory.
+        If None (default), the written analyses are not linked.
+    client : None or distributed.Client, optional
+        This client is used to process the ensemble members in parallel.
+        If no client is given, the client is inferred.
+    strategy : str, optional
+        The write strategy for every ensemble member, see
+        :py:func:`write_single_ens_mem`. Default is `reflink`.
+    encoding_profile : str, optional
+        The encoding profile for every ensemble member, see
+        :py:func:`write_single_ens_mem`. Default is `fast`.
+
+    Returns
+    -------
+    target_paths : List[str]
+        The target paths with the written analyses.
+    linked_paths : List[str]
+        The paths of the linked analyses. This list is empty if no link
+        directories are given.
+    """
+    logger = prefect.context.get('logger')
+    if client is None:
+        logger.warning('No client was given, I try to infer the client')
+        client = get_client(timeout=10)
+    process_futures = [
+        client.submit(
+            process_ens_member, source_path, target_paths[member_num],
+            _get_member_future(client, analysis, member_num),
+            _get_member_future(client, model_dataset, member_num),
+            assim_vars, post_process_func, strategy=strategy,
+            encoding_profile=encoding_profile, pure=False
+        )
+        for member_num, source_path in enumerate(source_paths)
+    ]
+    future_members = {
+        future.key: member_num
+        for member_num, future in enumerate(process_futures)
+    }
+    linked_paths = [None] * len(target_paths)
+    for future in as_completed(process_futures):
+        target_path = future.result()
+        member_num = future_members[future.key]
+        logger.debug('Written analysis to {0:s}'.format(target_path))
+        if link_dirs is not None:
+            linked_paths[member_num] = symlink.run(
+                source=target_path,
+                target=os.path.join(
+                    link_dirs[member_num], os.path.basename(target_path)
+                )
+            )
+    if link_dirs is None:
+        linked_paths = []
+    logger.debug(
+        'Finished streaming of ensemble data to {0}'.format(target_paths)
+    )
+    return target_paths, linked_paths
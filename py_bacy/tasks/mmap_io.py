@@ -0,0 +1,311 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import List, Union, Tuple, Dict, Any, Callable
+from functools import partial
+import logging
+import mmap
+
+# External modules
+import numpy as np
+import xarray as xr
+from scipy.io import netcdf_file
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'get_file_format',
+    'read_netcdf3_variables',
+    'read_hdf5_variables',
+    'read_contiguous_variables',
+    'load_ens_mmap'
+]
+
+
+NETCDF3_MAGIC = (b'CDF\x01', b'CDF\x02')
+HDF5_MAGIC = b'\x89HDF\r\n\x1a\n'
+NC4_NON_COORD = '_nc4_non_coord_'
+HDF5_INTERNAL_ATTRS = (
+    'DIMENSION_LIST', 'REFERENCE_LIST', 'CLASS', 'NAME', '_Netcdf4Dimid',
+    '_Netcdf4Coordinates', '_nc3_strict'
+)
+_UNSUPPORTED_ATTRS = ('scale_factor', 'add_offset')
+
+StoreFunc = Callable[[str, np.ndarray, Tuple[str], Dict[str, Any]], bool]
+
+
+def get_file_format(file_path: str) -> Union[None, str]:
+    """
+    Get the storage format of a given file based on its magic bytes.
+
+    Parameters
+    ----------
+    file_path : str
+        The format of this file is determined.
+
+    Returns
+    -------
+    file_format : None or str
+        `netcdf3` for classic and 64-bit offset netCDF files, `hdf5` for
+        netCDF4 files and None for unknown formats.
+    """
+    with open(file_path, 'rb') as opened_file:
+        magic_bytes = opened_file.read(8)
+    if magic_bytes[:4] in NETCDF3_MAGIC:
+        return 'netcdf3'
+    elif magic_bytes == HDF5_MAGIC:
+        return 'hdf5'
+    return None
+
+
+def _decode_attrs(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: val.decode('utf-8') if isinstance(val, bytes) else val
+        for key, val in attrs.items()
+    }
+
+
+def read_netcdf3_variables(
+        file_path: str,
+        variables: List[str],
+        store_func: StoreFunc
+) -> bool:
+    """
+    Memory-map variables of a netCDF3-file and pass them to a store
+    function. The file is opened only once for all variables.
+
+    Parameters
+    ----------
+    file_path : str
+        The variables are read from this netCDF3-file.
+    variables : List[str]
+        The names of the variables.
+    store_func : Callable
+        This function is called for every variable with its name, its
+        memory-mapped and not decoded data, its dimension names and its
+        attributes. The data is only valid during the call, such that the
+        function has to copy the data. If the function returns False, the
+        reading is stopped.
+
+    Returns
+    -------
+    success : bool
+        If all variables were found and stored.
+    """
+    with netcdf_file(
+            file_path, mode='r', mmap=True, maskandscale=False
+    ) as nc_file:
+        for var_name in variables:
+            if var_name not in nc_file.variables:
+                return False
+            nc_var = nc_file.variables[var_name]
+            stored = store_func(
+                var_name, nc_var.data, tuple(nc_var.dimensions),
+                _decode_attrs(nc_var._attributes)
+            )
+            del nc_var
+            if not stored:
+                return False
+    return True
+
+
+def read_hdf5_variables(
+        file_path: str,
+        variables: List[str],
+        store_func: StoreFunc
+) -> bool:
+    """
+    Memory-map variables of a netCDF4-file, which are stored contiguously
+    and uncompressed in the underlying HDF5-file, and pass them to a store
+    function.
+    h5py is only used to find the offsets of the variables within the file,
+    which is afterwards memory-mapped only once.
+
+    Parameters
+    ----------
+    file_path : str
+        The variables are read from this netCDF4-file.
+    variables : List[str]
+        The names of the variables.
+    store_func : Callable
+        This function is called for every variable, see
+        :py:func:`read_netcdf3_variables`.
+
+    Returns
+    -------
+    success : bool
+        If all variables were found and stored. False is also returned if
+        h5py is not available or if a variable is chunked or compressed.
+    """
+    if h5py is None:
+        return False
+    var_layouts = []
+    with h5py.File(file_path, mode='r') as h5_file:
+        for var_name in variables:
+            if var_name not in h5_file:
+                return False
+            h5_var = h5_file[var_name]
+            if h5_var.chunks is not None or h5_var.compression is not None:
+                return False
+            var_dims = tuple(
+                dim_scale[0].name.split('/')[-1].replace(NC4_NON_COORD, '')
+                if len(dim_scale) else None
+                for dim_scale in h5_var.dims
+            )
+            var_attrs = {
+                key: val for key, val in _decode_attrs(h5_var.attrs).items()
+                if key not in HDF5_INTERNAL_ATTRS
+            }
+            var_offset = h5_var.id.get_offset()
+            if var_offset is None or None in var_dims:
+                return False
+            var_layouts.append((
+                var_name, var_offset, h5_var.shape, h5_var.dtype, var_dims,
+                var_attrs
+            ))
+    with open(file_path, 'rb') as opened_file, mmap.mmap(
+            opened_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as file_map:
+        for var_name, var_offset, var_shape, var_dtype, var_dims, \
+                var_attrs in var_layouts:
+            var_data = np.ndarray(
+                var_shape, dtype=var_dtype, buffer=file_map,
+                offset=var_offset
+            )
+            stored = store_func(var_name, var_data, var_dims, var_attrs)
+            del var_data
+            if not stored:
+                return False
+    return True
+
+
+def read_contiguous_variables(
+        file_path: str,
+        variables: List[str],
+        store_func: StoreFunc
+) -> bool:
+    """
+    Memory-map variables from a netCDF3-file or from a contiguous,
+    uncompressed netCDF4-file and pass them to a store function.
+
+    Parameters
+    ----------
+    file_path : str
+        The variables are read from this file.
+    variables : List[str]
+        The names of the variables.
+    store_func : Callable
+        This function is called for every variable, see
+        :py:func:`read_netcdf3_variables`.
+
+    Returns
+    -------
+    success : bool
+        If all variables were memory-mapped and stored.
+    """
+    file_format = get_file_format(file_path)
+    if file_format == 'netcdf3':
+        return read_netcdf3_variables(file_path, variables, store_func)
+    elif file_format == 'hdf5':
+        return read_hdf5_variables(file_path, variables, store_func)
+    return False
+
+
+def _get_fill_value(var_attrs: Dict[str, Any]) -> Union[None, Any]:
+    fill_value = var_attrs.get(
+        '_FillValue', var_attrs.get('missing_value', None)
+    )
+    if fill_value is not None:
+        fill_value = np.asarray(fill_value).ravel()[0]
+    return fill_value
+
+
+def load_ens_mmap(
+        file_paths: List[str],
+        variables: List[str]
+) -> Union[None, xr.Dataset]:
+    """
+    Load given variables of single-file ensemble members by memory-mapping
+    the files.
+    Every file is opened once and all variables are copied from the
+    memory map straight into preallocated arrays with a leading ensemble
+    dimension, whereas fill values are replaced by NaN as in the xarray
+    path.
+    If one of the variables is chunked, compressed or scaled, or if one of
+    the files is no netCDF3 or netCDF4-file, None is returned and the caller
+    should fall back to :py:func:`py_bacy.tasks.io.load_ens_data`.
+
+    Parameters
+    ----------
+    file_paths : List[str]
+        Every file in this list is one ensemble member.
+    variables : List[str]
+        These variables are loaded.
+
+    Returns
+    -------
+    ds_ens : None or xr.Dataset
+        The loaded dataset with an unnumbered ensemble dimension. If None,
+        the files cannot be memory-mapped.
+    """
+    ens_size = len(file_paths)
+    ens_vars = {}
+
+    def store_member(member_num, var_name, var_data, var_dims, var_attrs):
+        if any(attr in var_attrs for attr in _UNSUPPORTED_ATTRS):
+            return False
+        fill_value = _get_fill_value(var_attrs)
+        if fill_value is not None and var_data.dtype.kind != 'f':
+            return False
+        if var_name not in ens_vars:
+            ens_vars[var_name] = xr.Variable(
+                ('ensemble', ) + var_dims,
+                np.empty(
+                    (ens_size, ) + var_data.shape,
+                    dtype=var_data.dtype.newbyteorder('=')
+                ),
+                attrs={
+                    key: val for key, val in var_attrs.items()
+                    if key not in ('_FillValue', 'missing_value')
+                }
+            )
+        ens_data = ens_vars[var_name].values
+        ens_data[member_num] = var_data
+        if fill_value is not None:
+            member_data = ens_data[member_num]
+            member_data[member_data == fill_value] = np.nan
+        return True
+
+    for member_num, file_path in enumerate(file_paths):
+        success = read_contiguous_variables(
+            file_path, variables, partial(store_member, member_num)
+        )
+        if not success:
+            logger.debug(
+                'Cannot memory-map {0} from {1:s}'.format(
+                    variables, file_path
+                )
+            )
+            return None
+    data_vars = {var_name: ens_vars[var_name] for var_name in variables}
+    ds_ens = xr.Dataset(data_vars)
+    return ds_ens
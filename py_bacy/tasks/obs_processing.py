@@ -0,0 +1,429 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Any, Dict, Tuple, Union
+import logging
+
+# External modules
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import xarray as xr
+
+# Internal modules
+from .static_cache import STATIC_CACHE
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'get_station_coords',
+    'superob_observations',
+    'background_check',
+    'TemporalLocalization',
+    'load_temporal_localization'
+]
+
+
+def _one_hot(codes: np.ndarray, n_groups: int) -> scipy.sparse.csr_matrix:
+    return scipy.sparse.csr_matrix(
+        (np.ones(len(codes)), (np.arange(len(codes)), codes)),
+        shape=(len(codes), n_groups)
+    )
+
+
+def _get_obs_variance(ds_obs: xr.Dataset) -> np.ndarray:
+    covariance = ds_obs['covariance']
+    if 'obs_grid_2' in covariance.dims:
+        raise ValueError(
+            'Observations can be only thinned for uncorrelated observations!'
+        )
+    covariance = covariance.broadcast_like(ds_obs['observations'])
+    return covariance.transpose('time', 'obs_grid_1').values
+
+
+def get_station_coords(
+        ds_obs: xr.Dataset,
+        lat_name: str = 'lat',
+        lon_name: str = 'lon'
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the latitude and longitude of the observation sites. The coordinates
+    are searched as level of the `obs_grid_1` multiindex and as variable or
+    coordinate along `obs_grid_1` otherwise.
+
+    Parameters
+    ----------
+    ds_obs : xr.Dataset
+        The coordinates are searched within this observation dataset.
+    lat_name : str, optional
+        The name of the latitude, default is `lat`.
+    lon_name : str, optional
+        The name of the longitude, default is `lon`.
+
+    Returns
+    -------
+    lat : np.ndarray
+        The latitude of every observation site.
+    lon : np.ndarray
+        The longitude of every observation site.
+    """
+    obs_index = ds_obs.indexes['obs_grid_1']
+    coords = []
+    for name in (lat_name, lon_name):
+        if isinstance(obs_index, pd.MultiIndex) and name in obs_index.names:
+            coords.append(np.asarray(obs_index.get_level_values(name)))
+        else:
+            coords.append(ds_obs[name].values)
+    return coords[0], coords[1]
+
+
+def superob_observations(
+        ds_obs: xr.Dataset,
+        box_size: Union[None, float] = None,
+        time_bin: Union[None, str] = None,
+        lat_name: str = 'lat',
+        lon_name: str = 'lon'
+) -> xr.Dataset:
+    """
+    Thin observations by averaging them into super-observations per grid box
+    and time bin.
+    Every grid box is represented by the site nearest to the mean position
+    of its sites, such that the `obs_grid_1` index of the super-observations
+    is a subset of the original index.
+    Every time bin is labelled by the latest observation time within the
+    bin. The observation error variance of a super-observation is the mean
+    variance of the averaged observations divided by their number, which
+    assumes uncorrelated observation errors.
+    The averaging is done by sparse group sums over all sites and times at
+    once, where missing observations are ignored.
+
+    Parameters
+    ----------
+    ds_obs : xr.Dataset
+        These observations are thinned. The dataset needs `observations` with
+        `time` and `obs_grid_1` dimension and a `covariance` without
+        `obs_grid_2` dimension.
+    box_size : None or float, optional
+        The edge length of a grid box in degrees. If None (default), the
+        observations are not thinned spatially.
+    time_bin : None or str, optional
+        The length of a time bin as pandas frequency string. If None
+        (default), the observations are not thinned temporally.
+    lat_name : str, optional
+        The name of the site latitude, default is `lat`.
+    lon_name : str, optional
+        The name of the site longitude, default is `lon`.
+
+    Returns
+    -------
+    ds_superob : xr.Dataset
+        The super-observations with the reduced covariance.
+    """
+    obs_values = ds_obs['observations'].transpose('time', 'obs_grid_1').values
+    obs_variance = _get_obs_variance(ds_obs)
+    obs_valid = np.isfinite(obs_values)
+
+    if box_size is None:
+        site_codes = np.arange(obs_values.shape[1])
+    else:
+        site_lat, site_lon = get_station_coords(ds_obs, lat_name, lon_name)
+        box_index = pd.MultiIndex.from_arrays([
+            np.floor(site_lat / box_size), np.floor(site_lon / box_size)
+        ])
+        site_codes, _ = box_index.factorize()
+    n_boxes = site_codes.max() + 1
+
+    obs_times = ds_obs.indexes['time']
+    if time_bin is None:
+        time_codes = np.arange(len(obs_times))
+    else:
+        time_codes, _ = pd.factorize(obs_times.ceil(time_bin))
+    n_bins = time_codes.max() + 1
+
+    time_one_hot = _one_hot(time_codes, n_bins).T
+    site_one_hot = _one_hot(site_codes, n_boxes).T
+
+    def group_sum(values):
+        return (site_one_hot @ (time_one_hot @ values).T).T
+
+    n_obs = group_sum(obs_valid.astype(float))
+    sum_obs = group_sum(np.where(obs_valid, obs_values, 0.))
+    sum_variance = group_sum(np.where(obs_valid, obs_variance, 0.))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        superob_values = sum_obs / n_obs
+        superob_variance = sum_variance / n_obs ** 2
+
+    if box_size is None:
+        repr_sites = np.arange(obs_values.shape[1])
+    else:
+        box_n_sites = np.bincount(site_codes, minlength=n_boxes)
+        box_lat = np.bincount(site_codes, site_lat) / box_n_sites
+        box_lon = np.bincount(site_codes, site_lon) / box_n_sites
+        site_dist = (
+            (site_lat - box_lat[site_codes]) ** 2
+            + (site_lon - box_lon[site_codes]) ** 2
+        )
+        sorted_sites = np.lexsort((site_dist, site_codes))
+        _, first_pos = np.unique(site_codes[sorted_sites], return_index=True)
+        repr_sites = sorted_sites[first_pos]
+    repr_times = pd.Series(obs_times).groupby(time_codes).idxmax().values
+
+    ds_superob = ds_obs[['observations']].isel(
+        time=repr_times, obs_grid_1=repr_sites
+    )
+    ds_superob['observations'] = (('time', 'obs_grid_1'), superob_values)
+    ds_superob['covariance'] = (('time', 'obs_grid_1'), superob_variance)
+    ds_superob = ds_superob.isel(obs_grid_1=(n_obs > 0).any(axis=0))
+    superob_variance = ds_superob['covariance'].values
+    if superob_variance.size:
+        max_variance = np.nanmax(superob_variance, axis=0)
+        time_constant = np.all(
+            np.isnan(superob_variance)
+            | np.isclose(superob_variance, max_variance)
+        )
+        if time_constant:
+            ds_superob['covariance'] = (('obs_grid_1', ), max_variance)
+    logger.debug(
+        'Thinned {0:d} to {1:d} observations'.format(
+            int(obs_valid.sum()), int(np.isfinite(superob_values).sum())
+        )
+    )
+    return ds_superob
+
+
+def background_check(
+        ds_obs: xr.Dataset,
+        obs_equivalent: xr.DataArray,
+        threshold: float = 5.,
+        max_reject_fraction: float = 0.5
+) -> Tuple[xr.Dataset, pd.DataFrame]:
+    """
+    Gross-error check of observations against the first-guess equivalent.
+    An observation is rejected, if its innovation exceeds
+    `threshold` times sqrt(sigma_o^2 + sigma_b^2), where the
+    background variance is the ensemble variance of the first-guess
+    equivalent.
+    Sites without remaining observations or with a larger rejected fraction
+    than given and times without remaining observations are dropped.
+    The other rejected observations are set to NaN, which are skipped by
+    the :py:class:`~py_bacy.tasks.block_letkf.BlockLETKF`.
+    The check should be applied before the temporal localization, which
+    scales the observation error variance.
+    All checks are evaluated at once over times and sites.
+
+    Parameters
+    ----------
+    ds_obs : xr.Dataset
+        These observations are checked. The dataset needs `observations`
+        with `time` and `obs_grid_1` dimension and a `covariance` without
+        `obs_grid_2` dimension.
+    obs_equivalent : xr.DataArray
+        The first-guess equivalent with `ensemble`, `time` and `obs_grid_1`
+        dimension, aligned to the observations.
+    threshold : float, optional
+        The normalized innovation threshold, default is 5.
+    max_reject_fraction : float, optional
+        Sites with a larger fraction of rejected observations are dropped
+        completely, default is 0.5.
+
+    Returns
+    -------
+    ds_checked : xr.Dataset
+        The checked observations.
+    summary : pd.DataFrame
+        A single-row summary of the check with the number of checked and
+        rejected observations and dropped sites and times.
+    """
+    obs_values = ds_obs['observations'].transpose('time', 'obs_grid_1').values
+    obs_variance = _get_obs_variance(ds_obs)
+    if 'time' in obs_equivalent.coords:
+        obs_equivalent = obs_equivalent.sel(time=ds_obs['time'].values)
+    fg_values = obs_equivalent.transpose(
+        'ensemble', 'time', 'obs_grid_1'
+    ).values
+    fg_mean = fg_values.mean(axis=0)
+    fg_variance = fg_values.var(axis=0, ddof=1)
+    obs_valid = np.isfinite(obs_values)
+    with np.errstate(invalid='ignore'):
+        norm_innov = np.abs(obs_values - fg_mean) / np.sqrt(
+            obs_variance + fg_variance
+        )
+        rejected = obs_valid & ~(norm_innov <= threshold)
+    n_valid = obs_valid.sum(axis=0)
+    n_rejected = rejected.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        reject_fraction = n_rejected / n_valid
+    keep_sites = (n_valid > n_rejected) & ~(
+        reject_fraction > max_reject_fraction
+    )
+    keep_times = (obs_valid & ~rejected)[:, keep_sites].any(axis=1)
+
+    ds_checked = ds_obs.copy()
+    ds_checked['observations'] = ds_obs['observations'].where(
+        xr.DataArray(~rejected, dims=('time', 'obs_grid_1'))
+    ).variable
+    ds_checked = ds_checked.isel(obs_grid_1=keep_sites, time=keep_times)
+    summary = pd.DataFrame({
+        'n_obs': [int(obs_valid.sum())],
+        'n_rejected': [int(rejected.sum())],
+        'n_sites': [int((n_valid > 0).sum())],
+        'n_sites_dropped': [int(((n_valid > 0) & ~keep_sites).sum())],
+        'n_times_dropped': [int((~keep_times).sum())],
+        'n_obs_kept': [int(ds_checked['observations'].count())],
+        'max_norm_innov': [float(np.nanmax(norm_innov, initial=0.))],
+    })
+    logger.debug(
+        'Rejected {0:d} of {1:d} observations'.format(
+            summary.loc[0, 'n_rejected'], summary.loc[0, 'n_obs']
+        )
+    )
+    return ds_checked, summary
+
+
+class TemporalLocalization(object):
+    """
+    Temporal localization of observations by inflating their covariance
+    with time-dependent weights.
+    The weights are kept as table, which maps every analysis time to the
+    non-zero weights indexed by the time offset to the analysis time, such
+    that a single cycle only needs a lookup and a vectorized division.
+
+    Parameters
+    ----------
+    weights : Dict[pd.Timestamp, pd.Series]
+        The non-zero weights for every analysis time, indexed by time
+        offsets.
+    """
+    def __init__(self, weights: Dict[pd.Timestamp, pd.Series]):
+        self.weights = weights
+
+    def __repr__(self) -> str:
+        return '{0:s}(n_analysis_times={1:d})'.format(
+            self.__class__.__name__, len(self.weights)
+        )
+
+    @classmethod
+    def from_file(
+            cls,
+            file_path: str,
+            var_name: str = 'localization'
+    ) -> 'TemporalLocalization':
+        """
+        Load the localization weights from a netCDF-file with `analysis_time`
+        and `timedelta` dimension.
+
+        Parameters
+        ----------
+        file_path : str
+            The weights are loaded from this file.
+        var_name : str, optional
+            The name of the weight variable, default is `localization`.
+
+        Returns
+        -------
+        localization : TemporalLocalization
+            The initialized temporal localization.
+        """
+        with xr.open_dataset(file_path) as ds_loc:
+            loc_weights = ds_loc[var_name].transpose(
+                'analysis_time', 'timedelta'
+            ).load()
+        timedelta = loc_weights.indexes['timedelta']
+        weights = {}
+        for analysis_time, time_weights in zip(
+                loc_weights.indexes['analysis_time'], loc_weights.values
+        ):
+            non_zero = np.isfinite(time_weights) & (time_weights != 0)
+            weights[analysis_time] = pd.Series(
+                time_weights[non_zero], index=timedelta[non_zero]
+            )
+        return cls(weights)
+
+    def get_weights(self, analysis_time: Any) -> pd.Series:
+        """
+        Get the non-zero weights for a given analysis time.
+
+        Parameters
+        ----------
+        analysis_time : Any
+            The weights are returned for this analysis time.
+
+        Returns
+        -------
+        weights : pd.Series
+            The non-zero weights indexed by absolute times.
+
+        Raises
+        ------
+        KeyError
+            No weights are defined for given analysis time.
+        """
+        analysis_time = pd.Timestamp(analysis_time)
+        weights = self.weights[analysis_time]
+        return pd.Series(weights.values, index=weights.index + analysis_time)
+
+    def localize(
+            self,
+            ds_obs: xr.Dataset,
+            analysis_time: Any
+    ) -> xr.Dataset:
+        """
+        Localize observations in time. Observations at times without a
+        non-zero weight are dropped before the dataset is copied and the
+        covariance is divided by the weights.
+
+        Parameters
+        ----------
+        ds_obs : xr.Dataset
+            These observations are localized.
+        analysis_time : Any
+            The observations are localized for this analysis time.
+
+        Returns
+        -------
+        ds_localized : xr.Dataset
+            The localized observations with a time-dependent covariance.
+        """
+        weights = self.get_weights(analysis_time)
+        time_pos = ds_obs.indexes['time'].get_indexer(weights.index)
+        available = time_pos >= 0
+        sort_idx = np.argsort(time_pos[available])
+        time_pos = time_pos[available][sort_idx]
+        weights = weights.values[available][sort_idx]
+        ds_localized = ds_obs.isel(time=time_pos)
+        weights = xr.DataArray(
+            weights, coords={'time': ds_localized['time']}, dims=('time', )
+        )
+        covariance = ds_localized['covariance'] / weights
+        ds_localized['covariance'] = covariance.transpose('time', ...).variable
+        return ds_localized
+
+
+def load_temporal_localization(file_path: str) -> TemporalLocalization:
+    """
+    Load the temporal localization from a file through the process-wide
+    static data cache, such that the file is only read once per process.
+
+    Parameters
+    ----------
+    file_path : str
+        The localization weights are loaded from this file.
+
+    Returns
+    -------
+    localization : TemporalLocalization
+        The cached temporal localization.
+    """
+    return STATIC_CACHE.get(file_path, TemporalLocalization.from_file)
@@ -0,0 +1,270 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Dict, Any, List, Union
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'get_store_dir',
+    'build_obs_store',
+    'get_obs_store',
+    'load_obs_window'
+]
+
+
+INDEX_NAME = 'index.json'
+STATIC_NAME = 'static.nc'
+STATION_INDEX_NAME = 'station_index.pkl'
+PARTITION_FMT = 'obs_%Y%m%d%H%M.nc'
+OBS_DIM = 'obs_grid_1'
+
+
+def get_store_dir(file_path_obs: str) -> str:
+    """
+    Get the directory of the observation store for a given observation
+    file. The store is placed next to the observation file.
+
+    Parameters
+    ----------
+    file_path_obs : str
+        The path to the observation file.
+
+    Returns
+    -------
+    store_dir : str
+        The path to the store directory.
+    """
+    return '{0:s}.store'.format(os.path.realpath(file_path_obs))
+
+
+def _read_index(store_dir: str) -> Union[None, Dict[str, Any]]:
+    try:
+        index_path = os.path.join(store_dir, INDEX_NAME)
+        with open(index_path, mode='r') as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return None
+
+
+def build_obs_store(
+        file_path_obs: str,
+        store_dir: Union[None, str] = None,
+        freq: str = '1h'
+) -> str:
+    """
+    Partition an observation file by time into a store.
+    Every partition contains all time-dependent variables for one time
+    interval of given frequency.
+    Variables without time dimension are written once into a static file,
+    whereas the observation multiindex is persisted as pickled
+    :py:class:`pandas.MultiIndex`.
+    The partitions and the modification time of the source file are stored
+    in an index file.
+    The store is created within a temporary directory and moved afterwards
+    to the store directory.
+
+    Parameters
+    ----------
+    file_path_obs : str
+        This observation file is partitioned. The names of the multiindex
+        variables are given in its `multiindex` attribute.
+    store_dir : None or str, optional
+        The store is created within this directory. If None (default), the
+        directory is inferred by :py:func:`get_store_dir`.
+    freq : str, optional
+        The time interval of a single partition as pandas frequency string,
+        default is `1h`.
+
+    Returns
+    -------
+    store_dir : str
+        The path to the created store.
+    """
+    if store_dir is None:
+        store_dir = get_store_dir(file_path_obs)
+    source_mtime = os.stat(file_path_obs).st_mtime_ns
+    tmp_dir = tempfile.mkdtemp(
+        prefix='.tmp_', dir=os.path.dirname(os.path.abspath(store_dir))
+    )
+    with xr.open_dataset(file_path_obs) as ds_obs_raw:
+        multiindex_vars = np.atleast_1d(
+            ds_obs_raw.attrs['multiindex']
+        ).tolist()
+        station_index = pd.MultiIndex.from_frame(
+            ds_obs_raw[multiindex_vars].to_dataframe()[multiindex_vars]
+        )
+        pd.to_pickle(
+            station_index, os.path.join(tmp_dir, STATION_INDEX_NAME)
+        )
+        time_vars = [
+            var_name for var_name, var in ds_obs_raw.data_vars.items()
+            if 'time' in var.dims
+        ]
+        ds_static = ds_obs_raw.drop_vars(time_vars + multiindex_vars)
+        ds_static = ds_static.drop_dims('time', errors='ignore')
+        ds_static.attrs = {}
+        ds_static.to_netcdf(os.path.join(tmp_dir, STATIC_NAME))
+        ds_time = ds_obs_raw[time_vars]
+        ds_time = ds_time.drop_vars(multiindex_vars, errors='ignore')
+        partition_starts = ds_time.indexes['time'].floor(freq)
+        partitions = []
+        for part_start in partition_starts.unique():
+            part_name = part_start.strftime(PARTITION_FMT)
+            ds_part = ds_time.isel(time=partition_starts == part_start)
+            ds_part.attrs = {}
+            ds_part.to_netcdf(os.path.join(tmp_dir, part_name))
+            partitions.append({
+                'start': part_start.isoformat(),
+                'end': (part_start + pd.Timedelta(freq)).isoformat(),
+                'file': part_name
+            })
+    index = {
+        'source': os.path.realpath(file_path_obs),
+        'source_mtime': source_mtime,
+        'freq': freq,
+        'partitions': partitions
+    }
+    with open(os.path.join(tmp_dir, INDEX_NAME), mode='w') as index_file:
+        json.dump(index, index_file)
+    if os.path.isdir(store_dir):
+        shutil.rmtree(store_dir, ignore_errors=True)
+    try:
+        os.rename(tmp_dir, store_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(
+        'Partitioned {0:s} into {1:d} partitions under {2:s}'.format(
+            file_path_obs, len(partitions), store_dir
+        )
+    )
+    return store_dir
+
+
+def get_obs_store(
+        file_path_obs: str,
+        store_dir: Union[None, str] = None,
+        freq: str = '1h'
+) -> str:
+    """
+    Get the observation store for a given observation file.
+    The store is rebuilt with :py:func:`build_obs_store` if it does not
+    exist, if the observation file was modified or if the frequency has
+    changed.
+
+    Parameters
+    ----------
+    file_path_obs : str
+        The store is returned for this observation file.
+    store_dir : None or str, optional
+        The store is searched within this directory. If None (default), the
+        directory is inferred by :py:func:`get_store_dir`.
+    freq : str, optional
+        The time interval of a single partition, default is `1h`.
+
+    Returns
+    -------
+    store_dir : str
+        The path to the up-to-date store.
+    """
+    if store_dir is None:
+        store_dir = get_store_dir(file_path_obs)
+    index = _read_index(store_dir)
+    is_valid = (
+        index is not None
+        and index['source_mtime'] == os.stat(file_path_obs).st_mtime_ns
+        and index['freq'] == freq
+    )
+    if not is_valid:
+        store_dir = build_obs_store(file_path_obs, store_dir, freq=freq)
+    return store_dir
+
+
+def _get_window_files(
+        index: Dict[str, Any],
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp
+) -> List[str]:
+    return [
+        partition['file'] for partition in index['partitions']
+        if pd.Timestamp(partition['start']) <= end_time
+        and pd.Timestamp(partition['end']) > start_time
+    ]
+
+
+def load_obs_window(
+        store_dir: str,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp
+) -> xr.Dataset:
+    """
+    Load the observations within a time window from an observation store.
+    Only the partitions that overlap the window are read.
+    The returned dataset has the same structure as the observation file,
+    where the multiindex variables are replaced by the `obs_grid_1`
+    multiindex.
+
+    Parameters
+    ----------
+    store_dir : str
+        The observations are loaded from this store.
+    start_time : pd.Timestamp
+        The start of the window, inclusive.
+    end_time : pd.Timestamp
+        The end of the window, inclusive.
+
+    Returns
+    -------
+    ds_obs : xr.Dataset
+        The loaded observations within the time window.
+    """
+    index = _read_index(store_dir)
+    if index is None:
+        raise OSError('No observation store found in {0:s}'.format(store_dir))
+    window_files = _get_window_files(index, start_time, end_time)
+    logger.debug(
+        'Read {0:d} of {1:d} partitions for {2} - {3}'.format(
+            len(window_files), len(index['partitions']), start_time, end_time
+        )
+    )
+    with xr.open_dataset(os.path.join(store_dir, STATIC_NAME)) as ds_static:
+        ds_obs = ds_static.load()
+    if not window_files:
+        window_files = [index['partitions'][0]['file']]
+    ds_time = [
+        xr.open_dataset(os.path.join(store_dir, file_name)).load()
+        for file_name in window_files
+    ]
+    ds_time = xr.concat(ds_time, dim='time', data_vars='minimal')
+    ds_time = ds_time.sel(time=slice(start_time, end_time))
+    ds_obs = xr.merge([ds_time, ds_obs], compat='override')
+    station_index = pd.read_pickle(
+        os.path.join(store_dir, STATION_INDEX_NAME)
+    )
+    ds_obs[OBS_DIM] = station_index
+    ds_obs.attrs = {}
+    return ds_obs
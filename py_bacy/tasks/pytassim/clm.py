@@ -11,7 +11,7 @@
 
 
 # System modules
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Union
 import os.path
 import glob
 
@@ -28,9 +28,16 @@ import numpy as np
 from pytassim.model.terrsysmp.clm import preprocess_clm, postprocess_clm
 
 # Internal modules
-from .cosmo import DEG_TO_M
 from ..clm import get_clm_bg_fname
-from ..io import load_ens_data, write_ens_data
+from ..io import load_ens_data, load_ens_data_cached, write_ens_data, \
+    stream_ens_data
+from ..chunking import ChunkingPolicy
+from ..distance import ClmDistance
+from ..weight_interp import apply_interpolated_weights
+from ..encoding import get_profile_name
+from ..mmap_io import load_ens_mmap
+from ..handle_cache import open_dataset
+from ..static_cache import STATIC_CACHE
 from ..system import symlink
 from ..xarray import constrain_var
 
@@ -40,6 +47,7 @@ plate_carree = ccrs.PlateCarree()
 
 ANA_FNAME = 'clm_ana%Y%m%d%H%M%S.nc'
 DENSITY = 1000
+WATER_VARS = ['WA', 'H2OSOI_LIQ', 'H2OCAN']
 
 
 __all__ = [
@@ -47,18 +55,30 @@ __all__ = [
     'link_output',
     'load_background',
     'post_process_analysis',
-    'write_analysis'
+    'write_analysis',
+    'stream_analysis',
+    'apply_cosmo_weights'
 ]
 
 
-def distance_func(x, y):
-    grid_hori = rotated_pole.transform_point(x[2], x[1], plate_carree)[::-1]
-    diff_obs_clm_deg = y.values[:, 1:-1] - grid_hori
-    diff_obs_clm_m = diff_obs_clm_deg * DEG_TO_M
-    dist_obs_clm_2d = np.sqrt(np.sum(diff_obs_clm_m**2, axis=-1))
+def transform_to_rotated(
+        lon: np.ndarray,
+        lat: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    rotated_points = rotated_pole.transform_points(
+        plate_carree, np.asarray(lon), np.asarray(lat)
+    )
+    return rotated_points[..., 0], rotated_points[..., 1]
+
+
+distance_func = ClmDistance(transform_to_rotated, horiz_start=1)
 
-    dist_obs_clm_vert = np.abs(y.values[:, -1]-x[-1])
-    return dist_obs_clm_2d, dist_obs_clm_vert
+
+def columns_to_rotated(column_coords: np.ndarray) -> np.ndarray:
+    rot_lon, rot_lat = transform_to_rotated(
+        column_coords[:, 1], column_coords[:, 0]
+    )
+    return np.stack((rot_lat, rot_lon), axis=-1)
 
 
 @task
@@ -86,24 +106,58 @@ def link_background(
 def load_clm_restart_files(
         bg_files: List[str],
         ens_members: List[int],
-        client: Client
+        client: Client,
+        variables: Union[None, List[str]] = None,
+        cache: bool = False,
+        chunking: Union[None, ChunkingPolicy] = None,
+        mmap: bool = True,
+        keep_variables: Union[None, List[str]] = None
 ) -> xr.Dataset:
-    ds_clm = load_ens_data.run(
-        file_paths=bg_files, client=client
-    )
+    logger = prefect.context.get('logger')
+    ds_clm = None
+    if mmap and variables is not None:
+        single_files = all(
+            isinstance(mem_files, str) or len(mem_files) == 1
+            for mem_files in bg_files
+        )
+        if single_files:
+            restart_files = [
+                mem_files if isinstance(mem_files, str) else mem_files[0]
+                for mem_files in bg_files
+            ]
+            ds_clm = load_ens_mmap(restart_files, variables)
+        if ds_clm is None:
+            logger.info(
+                'Cannot memory-map the restart files, fall back to xarray'
+            )
+    if ds_clm is None:
+        load_task = load_ens_data_cached if cache else load_ens_data
+        ds_clm = load_task.run(
+            file_paths=bg_files, client=client, variables=variables,
+            chunking=chunking, keep_variables=keep_variables
+        )
     ds_clm['ensemble'] = ens_members
     return ds_clm
 
 
+def _read_clm_grid(file_path_const: str) -> pd.MultiIndex:
+    ds_clm_const = open_dataset(file_path_const)
+    grid_index = pd.MultiIndex.from_product(
+        [ds_clm_const['lat'].values, ds_clm_const['lon'].values,
+         ds_clm_const['levels'].values], names=['lat', 'lon', 'vgrid']
+    )
+    return grid_index
+
+
 @task
 def load_clm_grid(
     utils_path: str
 ) -> xr.Dataset:
     file_path_const = os.path.join(utils_path, 'clm_const.nc')
-    ds_clm_const = xr.open_dataset(file_path_const).load()
-    grid_index = pd.MultiIndex.from_product(
-        [ds_clm_const['lat'].values, ds_clm_const['lon'].values,
-         ds_clm_const['levels'].values], names=['lat', 'lon', 'vgrid']
+    grid_index = STATIC_CACHE.get(file_path_const, _read_clm_grid)
+    distance_func.set_grid(
+        grid_index.get_level_values('lat'),
+        grid_index.get_level_values('lon')
     )
     return grid_index
 
@@ -131,10 +185,19 @@ def load_background(
         ens_members: List[int],
         client: Client,
 ) -> Tuple[xr.Dataset, xr.DataArray]:
+    load_vars = list(assim_config['assim_vars']) + [
+        var_name for var_name in WATER_VARS
+        if var_name not in assim_config['assim_vars']
+    ]
     ds_clm = load_clm_restart_files.run(
         bg_files=bg_files,
         ens_members=ens_members,
-        client=client
+        client=client,
+        variables=load_vars,
+        cache=assim_config.get('zarr_cache', False),
+        chunking=ChunkingPolicy.from_config(cycle_config, assim_config),
+        mmap=assim_config.get('mmap_restart', True),
+        keep_variables=assim_config.get('keep_vars', None)
     )
     grid_index = load_clm_grid.run(
         utils_path=assim_config['obs']['utils_path']
@@ -186,11 +249,44 @@ def write_analysis(
         background_files,
         analysis_files,
         assim_config['assim_vars'],
-        client=client
+        client=client,
+        strategy=assim_config.get('write_strategy', 'reflink'),
+        encoding_profile=get_profile_name(assim_config, 'analysis')
     )
     return analysis_files, analysis
 
 
+@task
+def stream_analysis(
+        analysis: xr.DataArray,
+        model_dataset: xr.Dataset,
+        background_files: List[str],
+        output_dirs: List[str],
+        analysis_dirs: List[str],
+        analysis_time: pd.Timestamp,
+        assim_config: Dict[str, Any],
+        cycle_config: Dict[str, Any],
+        client: Client,
+) -> Tuple[List[str], List[str]]:
+    analysis_fname = analysis_time.strftime(ANA_FNAME)
+    analysis_files = [
+        os.path.join(output_dir, analysis_fname) for output_dir in output_dirs
+    ]
+    analysis_files, linked_files = stream_ens_data.run(
+        analysis=analysis,
+        model_dataset=model_dataset,
+        post_process_func=post_process_analysis.run,
+        source_paths=background_files,
+        target_paths=analysis_files,
+        assim_vars=assim_config['assim_vars'],
+        link_dirs=analysis_dirs,
+        client=client,
+        strategy=assim_config.get('write_strategy', 'reflink'),
+        encoding_profile=get_profile_name(assim_config, 'analysis')
+    )
+    return analysis_files, linked_files
+
+
 @task
 def link_output(
         background_file: str,
@@ -206,3 +302,55 @@ def link_output(
         source=background_file, target=output_file
     )
     return output_file
+
+
+@task
+def apply_cosmo_weights(
+        background: xr.DataArray,
+        coarse_weights: np.ndarray,
+        coarse_coords: np.ndarray,
+        assim_config: Dict[str, Any]
+) -> xr.DataArray:
+    """
+    Apply ensemble weights generated on the rotated COSMO grid to the CLM
+    background. The CLM columns are transformed into rotated coordinates,
+    before the weights are interpolated to them. As the COSMO levels do
+    not match the CLM layers, the weights of the COSMO level
+    `cosmo_weight_level` in the CLM assimilation configuration are applied
+    to all CLM layers. The COSMO levels are sorted ascending by their
+    height, such that the default of 0 takes the lowest COSMO level.
+
+    Parameters
+    ----------
+    background : xr.DataArray
+        The CLM background with latitude and longitude as grid levels.
+    coarse_weights : np.ndarray
+        The ensemble weights with shape
+        (level, coarse, ensemble, ensemble) for the COSMO levels.
+    coarse_coords : np.ndarray
+        The rotated latitude and longitude of the coarse COSMO columns with
+        shape (coarse, 2).
+    assim_config : Dict[str, Any]
+        The CLM assimilation configuration.
+
+    Returns
+    -------
+    analysis : xr.DataArray
+        The CLM analysis with the same structure as the background.
+    """
+    logger = prefect.context.get('logger')
+    interp_config = assim_config.get('weight_interp', None) or {}
+    cosmo_level = assim_config.get('cosmo_weight_level', 0)
+    logger.info(
+        'Apply the weights of COSMO level {0:d} to all CLM layers'.format(
+            cosmo_level
+        )
+    )
+    analysis = apply_interpolated_weights(
+        background, coarse_weights, coarse_coords,
+        horiz_coords=interp_config.get('horiz_coords', ('lat', 'lon')),
+        cache_dir=interp_config.get('cache_dir', None),
+        coords_transform=columns_to_rotated,
+        level=cosmo_level
+    )
+    return analysis
@@ -28,14 +28,16 @@ from pytassim.model.terrsysmp.cosmo import preprocess_cosmo, postprocess_cosmo
 
 # Internal modules
 from py_bacy.tasks.cosmo import get_cos_bg_fname
-from py_bacy.tasks.io import load_ens_data, write_ens_data
+from py_bacy.tasks.io import load_ens_data, load_ens_data_cached, \
+    write_ens_data, stream_ens_data
+from py_bacy.tasks.chunking import ChunkingPolicy
+from py_bacy.tasks.distance import CosmoDistance, press_int, EARTH_RADIUS, \
+    DEG_TO_M
+from py_bacy.tasks.encoding import get_profile_name
 from py_bacy.tasks.system import symlink
 from py_bacy.tasks.xarray import constrain_var
 
 
-EARTH_RADIUS = 6371000
-DEG_TO_M = 2 * np.pi / 360 * EARTH_RADIUS
-
 ANA_FNAME = 'laf%Y%m%d%H%M%S.nc'
 
 
@@ -44,25 +46,12 @@ __all__ = [
     'load_background',
     'post_process_analysis',
     'write_analysis',
+    'stream_analysis',
     'link_output'
 ]
 
 
-def distance_func(x, y):
-    diff_obs_cos_deg = y.values[:, 1:-1] - x[1:-1]
-    diff_obs_cos_m = diff_obs_cos_deg * DEG_TO_M
-    dist_obs_cos_2d = np.sqrt(np.sum(diff_obs_cos_m**2, axis=-1))
-
-    cos_press = press_int(x[-1])
-    obs_press = press_int(y.values[:, -1])
-    obs_lnp = np.log(obs_press)
-    cos_lnp = np.log(cos_press)
-    dist_obs_cos_vert = np.abs(cos_lnp - obs_lnp)
-    return dist_obs_cos_2d, dist_obs_cos_vert
-
-
-def press_int(level_height):
-    return 1013.25 * np.power(1 - (0.0065 * level_height / 288.15), 5.255)
+distance_func = CosmoDistance(horiz_start=1)
 
 
 @task
@@ -95,8 +84,15 @@ def load_background(
         ens_members: List[int],
         client: Client,
 ) -> Tuple[xr.Dataset, xr.DataArray]:
-    ds_cosmo = load_ens_data.run(
-        file_paths=bg_files, client=client
+    if assim_config.get('zarr_cache', False):
+        load_task = load_ens_data_cached
+    else:
+        load_task = load_ens_data
+    ds_cosmo = load_task.run(
+        file_paths=bg_files, client=client,
+        variables=assim_config['assim_vars'],
+        chunking=ChunkingPolicy.from_config(cycle_config, assim_config),
+        keep_variables=assim_config.get('keep_vars', ['vcoord'])
     )
     ds_cosmo['ensemble'] = ens_members
     background = preprocess_cosmo(ds_cosmo, assim_config['assim_vars'])
@@ -145,11 +141,44 @@ def write_analysis(
         source_paths=background_files,
         target_paths=analysis_files,
         assim_vars=assim_config['assim_vars'],
-        client=client
+        client=client,
+        strategy=assim_config.get('write_strategy', 'reflink'),
+        encoding_profile=get_profile_name(assim_config, 'analysis')
     )
     return analysis_files, analysis
 
 
+@task
+def stream_analysis(
+        analysis: xr.DataArray,
+        model_dataset: xr.Dataset,
+        background_files: List[str],
+        output_dirs: List[str],
+        analysis_dirs: List[str],
+        analysis_time: pd.Timestamp,
+        assim_config: Dict[str, Any],
+        cycle_config: Dict[str, Any],
+        client: Client,
+) -> Tuple[List[str], List[str]]:
+    analysis_fname = analysis_time.strftime(ANA_FNAME)
+    analysis_files = [
+        os.path.join(output_dir, analysis_fname) for output_dir in output_dirs
+    ]
+    analysis_files, linked_files = stream_ens_data.run(
+        analysis=analysis,
+        model_dataset=model_dataset,
+        post_process_func=post_process_analysis.run,
+        source_paths=background_files,
+        target_paths=analysis_files,
+        assim_vars=assim_config['assim_vars'],
+        link_dirs=analysis_dirs,
+        client=client,
+        strategy=assim_config.get('write_strategy', 'reflink'),
+        encoding_profile=get_profile_name(assim_config, 'analysis')
+    )
+    return analysis_files, linked_files
+
+
 @task
 def link_output(
         background_file: str,
@@ -29,11 +29,13 @@ from distributed import Client
 
 
 # Internal modules
+from py_bacy.tasks.obs_processing import background_check
 
 
 __all__ = [
     'info_observations',
-    'info_assimilation'
+    'info_assimilation',
+    'background_check_obs'
 ]
 
 
@@ -60,6 +62,82 @@ def info_observations(
         )
 
 
+@task
+def background_check_obs(
+        observations: Union[xr.Dataset, List[xr.Dataset]],
+        first_guess: Union[None, xr.DataArray],
+        assim_config: Dict[str, Any],
+        run_dir: str,
+        analysis_time: pd.Timestamp
+) -> Union[xr.Dataset, List[xr.Dataset]]:
+    """
+    Quality control of the observations by a background check with
+    :py:func:`~py_bacy.tasks.obs_processing.background_check`.
+    The first-guess equivalent is computed once per observation dataset
+    with its observation operator.
+    The check is configured within the `obs: qc` section of the
+    assimilation configuration with `threshold` and `max_reject_fraction`.
+    A summary of the check is appended to `info_qc.txt` in the output
+    directory.
+
+    Parameters
+    ----------
+    observations : xr.Dataset or List[xr.Dataset]
+        These observations are checked.
+    first_guess : None or xr.DataArray
+        The observation equivalents are estimated based on this first guess.
+        If None, the observations are passed through.
+    assim_config : Dict[str, Any]
+        The assimilation configuration with the `obs: qc` section. If no
+        section is specified, the observations are passed through.
+    run_dir : str
+        The summary is written into the output directory of this run.
+    analysis_time : pd.Timestamp
+        The summary is indexed by this analysis time.
+
+    Returns
+    -------
+    observations : xr.Dataset or List[xr.Dataset]
+        The checked observations.
+    """
+    logger = prefect.context.get('logger')
+    qc_config = assim_config.get('obs', {}).get('qc', None)
+    if not qc_config or first_guess is None:
+        return observations
+    qc_config = {} if qc_config is True else qc_config
+    is_single = isinstance(observations, xr.Dataset)
+    if is_single:
+        observations = [observations]
+    checked_observations = []
+    summaries = []
+    for obs in observations:
+        try:
+            obs_equivalent = obs.obs.operator(obs, first_guess)
+        except NotImplementedError:
+            checked_observations.append(obs)
+            continue
+        checked_obs, summary = background_check(
+            obs, obs_equivalent,
+            threshold=qc_config.get('threshold', 5.),
+            max_reject_fraction=qc_config.get('max_reject_fraction', 0.5)
+        )
+        checked_obs.obs.operator = obs.obs.operator
+        checked_observations.append(checked_obs)
+        summaries.append(summary)
+    if summaries:
+        summary = pd.concat(summaries, ignore_index=True)
+        summary.index = [analysis_time] * len(summary)
+        write_df(summary, run_dir=run_dir, filename='info_qc.txt')
+        logger.info(
+            'Rejected {0:d} of {1:d} observations by background check'.format(
+                summary['n_rejected'].sum(), summary['n_obs'].sum()
+            )
+        )
+    if is_single:
+        checked_observations = checked_observations[0]
+    return checked_observations
+
+
 @task
 def info_assimilation(
         analysis: xr.Dataset,
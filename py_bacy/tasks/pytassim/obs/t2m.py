@@ -26,21 +26,138 @@ import numpy as np
 
 from pytassim.model.terrsysmp.cosmo import preprocess_cosmo, postprocess_cosmo
 from pytassim.obs_ops.terrsysmp import CosmoT2mOperator
+from pytassim.obs_ops.base_ops import BaseOperator
 
 # Internal modules
 from py_bacy.tasks.cosmo import get_cos_bg_fname
 from py_bacy.tasks.general import check_output_files
-from py_bacy.tasks.io import load_ens_data
+from py_bacy.tasks.io import load_ens_data, load_ens_data_cached
+from py_bacy.tasks.chunking import ChunkingPolicy
+from py_bacy.tasks.handle_cache import open_dataset
+from py_bacy.tasks.obs_store import get_obs_store, load_obs_window
+from py_bacy.tasks.static_cache import STATIC_CACHE, load_static_dataset
+from py_bacy.tasks.stencil import LAPSE_RATE, T2mStencil, get_t2m_stencil
 from py_bacy.tasks.system import symlink
 
 
+FG_VARS = ['T', 'T_2M']
+STATION_COLS = {'lat': 'lat', 'lon': 'lon', 'height': 'height'}
+
+
 __all__ = [
+    'StencilT2mOperator',
+    'get_stencil_operator',
     'link_first_guess',
     'load_obs',
     'load_first_guess'
 ]
 
 
+class StencilT2mOperator(BaseOperator):
+    """
+    2-metre temperature operator based on a precomputed
+    :py:class:`~py_bacy.tasks.stencil.T2mStencil`.
+    The neighbour search and the height differences are not recomputed,
+    such that the observation equivalent is a single sparse
+    matrix-vector product per ensemble member and time step with a
+    subsequent lapse-rate height correction.
+
+    Parameters
+    ----------
+    stencil : T2mStencil
+        The precomputed stencil for the stations and the COSMO grid.
+    station_index : pd.Index
+        The index of the stations, which is used as `obs_grid_1`
+        coordinate of the observation equivalent.
+    lapse_rate : float, optional
+        The lapse rate in K/m for the height correction, default is 0.0065.
+    """
+    def __init__(
+            self,
+            stencil: T2mStencil,
+            station_index: pd.Index,
+            lapse_rate: float = LAPSE_RATE
+    ):
+        super().__init__()
+        self.stencil = stencil
+        self.station_index = station_index
+        self.lapse_rate = lapse_rate
+
+    @staticmethod
+    def _select_t2m(in_array: xr.DataArray) -> xr.DataArray:
+        t2m_array = in_array.sel(var_name='T_2M').unstack('grid')
+        for dim in t2m_array.dims:
+            if dim not in ('time', 'ensemble', 'rlat', 'rlon'):
+                t2m_array = t2m_array.dropna(dim, how='all').isel({dim: 0})
+        return t2m_array.transpose('time', 'ensemble', 'rlat', 'rlon')
+
+    def obs_op(self, in_array: xr.DataArray, *args, **kwargs) -> xr.DataArray:
+        t2m_array = self._select_t2m(in_array)
+        t2m_values = t2m_array.values.reshape(
+            t2m_array.shape[:2] + (-1, )
+        )
+        obs_equivalent = self.stencil.apply(
+            t2m_values, lapse_rate=self.lapse_rate
+        )
+        obs_equivalent = xr.DataArray(
+            obs_equivalent,
+            coords={
+                'time': t2m_array['time'],
+                'ensemble': t2m_array['ensemble'],
+                'obs_grid_1': self.station_index
+            },
+            dims=('time', 'ensemble', 'obs_grid_1')
+        )
+        return obs_equivalent
+
+
+def get_stencil_operator(
+        df_stations: pd.DataFrame,
+        ds_const_data: xr.Dataset,
+        n_neighbors: int = 1,
+        cache_dir: Union[None, str] = None,
+        station_cols: Union[None, Dict[str, str]] = None
+) -> StencilT2mOperator:
+    """
+    Get a stencil-based 2-metre temperature operator for given stations and
+    COSMO constant data. The stencil is cached per process and persisted
+    within the cache directory if given.
+
+    Parameters
+    ----------
+    df_stations : pd.DataFrame
+        The station information with latitude, longitude and height.
+    ds_const_data : xr.Dataset
+        The COSMO constant data with `lat`, `lon` and `HSURF`.
+    n_neighbors : int, optional
+        The number of grid neighbours per station, default is 1.
+    cache_dir : None or str, optional
+        The stencil is persisted within this directory. If None (default),
+        the stencil is only cached in memory.
+    station_cols : None or Dict[str, str], optional
+        The names of the `lat`, `lon` and `height` columns in the station
+        information. Default is :py:data:`STATION_COLS`.
+
+    Returns
+    -------
+    obs_operator : StencilT2mOperator
+        The initialized observation operator.
+    """
+    station_cols = {**STATION_COLS, **(station_cols or {})}
+    grid_height = ds_const_data['HSURF'].squeeze(drop=True)
+    stencil = get_t2m_stencil(
+        station_lat=df_stations[station_cols['lat']].values,
+        station_lon=df_stations[station_cols['lon']].values,
+        station_height=df_stations[station_cols['height']].values,
+        grid_lat=ds_const_data['lat'].values,
+        grid_lon=ds_const_data['lon'].values,
+        grid_height=grid_height.values,
+        n_neighbors=n_neighbors,
+        cache_dir=cache_dir
+    )
+    return StencilT2mOperator(stencil, df_stations.index)
+
+
 @task
 def link_first_guess(
         parent_model_output: str,
@@ -79,8 +196,14 @@ def load_first_guess(
             fg_files
         )
     )
-    ds_first_guess = load_ens_data.run(
-        file_paths=fg_files, client=client
+    if assim_config.get('zarr_cache', False):
+        load_task = load_ens_data_cached
+    else:
+        load_task = load_ens_data
+    ds_first_guess = load_task.run(
+        file_paths=fg_files, client=client, variables=FG_VARS,
+        chunking=ChunkingPolicy.from_config(cycle_config, assim_config),
+        keep_variables=assim_config.get('keep_vars', ['vcoord'])
     )
     logger.debug('Loaded first guess dataset {0}'.format(ds_first_guess))
     ds_first_guess['ensemble'] = ens_members
@@ -92,7 +215,7 @@ def load_first_guess(
             ds_first_guess
         )
     )
-    ds_first_guess = preprocess_cosmo(ds_first_guess, ['T', 'T_2M']).load()
+    ds_first_guess = preprocess_cosmo(ds_first_guess, FG_VARS).load()
     logger.debug(
         'Preprocessed first guess: {0}'.format(
             ds_first_guess
@@ -103,10 +226,21 @@ def load_first_guess(
 
 @task
 def load_obs_file(
-        file_path_obs: str
+        file_path_obs: str,
+        obs_window: Union[None, Tuple[pd.Timestamp, pd.Timestamp]] = None,
+        store_freq: Union[None, str] = None
 ) -> xr.Dataset:
     logger = prefect.context.get('logger')
-    ds_obs_raw = xr.open_dataset(file_path_obs).load()
+    if obs_window is not None and store_freq is not None:
+        store_dir = get_obs_store(file_path_obs, freq=store_freq)
+        ds_obs = load_obs_window(store_dir, obs_window[0], obs_window[1])
+        logger.info(
+            'Loaded observations for {0} - {1} from {2:s}'.format(
+                obs_window[0], obs_window[1], store_dir
+            )
+        )
+        return ds_obs
+    ds_obs_raw = open_dataset(file_path_obs).load()
     ds_obs = ds_obs_raw.drop_vars(ds_obs_raw.attrs['multiindex'])
     ds_obs['obs_grid_1'] = pd.MultiIndex.from_frame(
         ds_obs_raw[ds_obs_raw.attrs['multiindex']].to_dataframe()[
@@ -116,12 +250,16 @@ def load_obs_file(
     return ds_obs
 
 
+def _read_stations(file_path_station: str) -> pd.DataFrame:
+    return pd.read_hdf(file_path_station, 'stations')
+
+
 @task
 def load_stations(
         utils_dir: str
 ) -> pd.DataFrame:
     file_path_station = os.path.join(utils_dir, 'stations.hd5')
-    df_stations = pd.read_hdf(file_path_station, 'stations')
+    df_stations = STATIC_CACHE.get(file_path_station, _read_stations)
     return df_stations
 
 
@@ -141,7 +279,7 @@ def load_constant_data(
         utils_dir: str
 ) -> xr.Dataset:
     file_path_const = os.path.join(utils_dir, 'cosmo_const.nc')
-    ds_cos_const = xr.open_dataset(file_path_const).load()
+    ds_cos_const = load_static_dataset(file_path_const)
     return ds_cos_const
 
 
@@ -153,7 +291,9 @@ def load_obs(
         client: Client,
 ) -> List[xr.Dataset]:
     ds_obs = load_obs_file.run(
-        file_path_obs=assim_config['obs']['path']
+        file_path_obs=assim_config['obs']['path'],
+        obs_window=obs_window,
+        store_freq=assim_config['obs'].get('store_freq', None)
     )
     ds_obs = ds_obs.sel(time=slice(obs_window[0], obs_window[1]))
     df_stations = load_stations.run(
@@ -162,11 +302,23 @@ def load_obs(
     ds_const_data = load_constant_data.run(
         utils_dir=assim_config['obs']['utils_path']
     )
-    coords_array = load_coords.run(
-        ds_with_coords=ds_const_data
-    )
-    obs_operator = CosmoT2mOperator(
-        df_stations, coords_array, ds_const_data
-    )
+    stencil_config = assim_config['obs'].get('stencil', None)
+    if stencil_config:
+        stencil_config = {} if stencil_config is True else stencil_config
+        obs_operator = get_stencil_operator(
+            df_stations, ds_const_data,
+            n_neighbors=stencil_config.get('n_neighbors', 1),
+            cache_dir=stencil_config.get(
+                'cache_dir', assim_config['obs']['utils_path']
+            ),
+            station_cols=stencil_config.get('station_cols', None)
+        )
+    else:
+        coords_array = load_coords.run(
+            ds_with_coords=ds_const_data
+        )
+        obs_operator = CosmoT2mOperator(
+            df_stations, coords_array, ds_const_data
+        )
     ds_obs.obs.operator = obs_operator
     return ds_obs
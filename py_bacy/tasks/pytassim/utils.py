@@ -15,6 +15,7 @@ import logging
 from typing import Dict, Any, Tuple, List, Iterable, Union
 import os.path
 import glob
+import time
 
 # External modules
 import prefect
@@ -22,11 +23,18 @@ from prefect import task
 
 import xarray as xr
 import pandas as pd
+import numpy as np
+import torch
 from distributed import Client
 
 from pytassim.interface.base import BaseAssimilation
 
 # Internal modules
+from py_bacy.tasks.block_letkf import BlockLETKF
+from py_bacy.tasks.obs_processing import superob_observations, \
+    load_temporal_localization
+from py_bacy.tasks.weight_interp import get_columns, get_coarse_points, \
+    apply_interpolated_weights
 from py_bacy.tasks.system import symlink
 
 
@@ -39,10 +47,23 @@ __all__ = [
     'assimilate',
     'align_obs_first_guess',
     'link_analysis',
-    'default_post_process_obs'
+    'default_post_process_obs',
+    'superob_obs',
+    'temporal_localize_obs',
+    'uses_weight_interp',
+    'generate_coarse_weights',
+    'apply_coarse_weights'
 ]
 
 
+def _count_obs(observations: Union[xr.Dataset, Iterable[xr.Dataset]]) -> int:
+    if isinstance(observations, xr.Dataset):
+        observations = (observations, )
+    return int(sum(
+        ds_obs['observations'].count() for ds_obs in observations
+    ))
+
+
 @task(name='get_observation_window')
 def get_observation_window(
         analysis_time: pd.Timestamp,
@@ -141,6 +162,8 @@ def assimilate(
         first_guess: xr.DataArray,
         analysis_time: Any,
 ) -> xr.DataArray:
+    logger = prefect.context.get('logger')
+    start_time = time.perf_counter()
     analysis = assimilation.assimilate(
         state=background,
         observations=observations,
@@ -148,6 +171,11 @@ def assimilate(
         analysis_time=analysis_time
     )
     analysis = analysis.compute()
+    logger.info(
+        'Assimilated {0:d} observations in {1:.2f} s'.format(
+            _count_obs(observations), time.perf_counter() - start_time
+        )
+    )
     return analysis
 
 
@@ -184,3 +212,251 @@ def default_post_process_obs(
         first_guess: Union[None, xr.DataArray] = None
 ) -> Tuple[List[xr.Dataset], Union[None, xr.DataArray]]:
     return observations, first_guess
+
+
+@task
+def superob_obs(
+        observations: Union[xr.Dataset, List[xr.Dataset]],
+        assim_config: Dict[str, Any]
+) -> Union[xr.Dataset, List[xr.Dataset]]:
+    """
+    Thin the observations into super-observations per grid box and time bin
+    with :py:func:`~py_bacy.tasks.obs_processing.superob_observations`.
+    The thinning is configured within the `obs: superob` section of the
+    assimilation configuration with `box_size` in degrees, `time_bin` as
+    pandas frequency string and the names `lat` and `lon` of the site
+    coordinates. The observation operator of every dataset is kept and
+    has to return the observation equivalent for the representative sites.
+
+    Parameters
+    ----------
+    observations : xr.Dataset or List[xr.Dataset]
+        These observations are thinned.
+    assim_config : Dict[str, Any]
+        The assimilation configuration. If no `obs: superob` section is
+        specified, the observations are passed through.
+
+    Returns
+    -------
+    observations : xr.Dataset or List[xr.Dataset]
+        The thinned observations.
+    """
+    logger = prefect.context.get('logger')
+    superob_config = assim_config.get('obs', {}).get('superob', None)
+    if not superob_config:
+        return observations
+    is_single = isinstance(observations, xr.Dataset)
+    if is_single:
+        observations = [observations]
+    n_obs_raw = _count_obs(observations)
+    thinned_observations = []
+    for ds_obs in observations:
+        ds_superob = superob_observations(
+            ds_obs,
+            box_size=superob_config.get('box_size', None),
+            time_bin=superob_config.get('time_bin', None),
+            lat_name=superob_config.get('lat', 'lat'),
+            lon_name=superob_config.get('lon', 'lon')
+        )
+        ds_superob.obs.operator = ds_obs.obs.operator
+        thinned_observations.append(ds_superob)
+    logger.info(
+        'Thinned observations from {0:d} to {1:d}'.format(
+            n_obs_raw, _count_obs(thinned_observations)
+        )
+    )
+    if is_single:
+        thinned_observations = thinned_observations[0]
+    return thinned_observations
+
+
+@task
+def temporal_localize_obs(
+        observations: Union[xr.Dataset, List[xr.Dataset]],
+        assim_config: Dict[str, Any],
+        analysis_time: pd.Timestamp
+) -> Union[xr.Dataset, List[xr.Dataset]]:
+    """
+    Localize the observations in time with the weights from the file given
+    in `obs: path_loc_mat` of the assimilation configuration.
+    The weights are read once per process and the observations are passed
+    through if no file is specified.
+
+    Parameters
+    ----------
+    observations : xr.Dataset or List[xr.Dataset]
+        These observations are localized.
+    assim_config : Dict[str, Any]
+        The assimilation configuration.
+    analysis_time : pd.Timestamp
+        The observations are localized for this analysis time.
+
+    Returns
+    -------
+    observations : xr.Dataset or List[xr.Dataset]
+        The localized observations.
+    """
+    logger = prefect.context.get('logger')
+    path_loc_mat = assim_config.get('obs', {}).get('path_loc_mat', None)
+    if path_loc_mat is None:
+        return observations
+    localization = load_temporal_localization(path_loc_mat)
+    is_single = isinstance(observations, xr.Dataset)
+    if is_single:
+        observations = [observations]
+    localized_observations = []
+    for ds_obs in observations:
+        ds_localized = localization.localize(ds_obs, analysis_time)
+        ds_localized.obs.operator = ds_obs.obs.operator
+        localized_observations.append(ds_localized)
+    logger.info('Observations are temporal localized')
+    if is_single:
+        localized_observations = localized_observations[0]
+    return localized_observations
+
+
+@task
+def uses_weight_interp(assim_config: Dict[str, Any]) -> bool:
+    return bool(assim_config.get('weight_interp', None))
+
+
+@task
+def generate_coarse_weights(
+        assimilation: BaseAssimilation,
+        background: xr.DataArray,
+        observations: Union[xr.Dataset, Iterable[xr.Dataset]],
+        first_guess: Union[None, xr.DataArray],
+        assim_config: Dict[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate the ensemble weights of the LETKF on a coarsened grid, which
+    keeps every n-th value of both horizontal coordinates as specified in
+    `weight_interp: stride` of the assimilation configuration. Without
+    this section, the weights are generated for every column.
+    The innovations and the localization are taken from the given
+    assimilation. The weights are generated for every level of the coarse
+    columns, such that the vertical localization is kept and only the
+    horizontal dimensions are coarsened.
+    The weights are solved with the batched
+    :py:class:`~py_bacy.tasks.block_letkf.BlockLETKF`, which reduces the
+    cost of the LETKF by roughly the squared stride, whereas the memory of
+    the weights scales with the number of levels.
+
+    Parameters
+    ----------
+    assimilation : BaseAssimilation
+        The innovations, the background precision and the localization are
+        taken from this assimilation.
+    background : xr.DataArray
+        The background with the state grid.
+    observations : xr.Dataset or Iterable[xr.Dataset]
+        These observations are assimilated.
+    first_guess : None or xr.DataArray
+        The first guess to estimate the observation equivalents. If None,
+        the background is used.
+    assim_config : Dict[str, Any]
+        The assimilation configuration.
+
+    Returns
+    -------
+    coarse_weights : np.ndarray
+        The ensemble weights with shape
+        (level, coarse, ensemble, ensemble), where the levels are sorted as
+        in :py:func:`~py_bacy.tasks.weight_interp.get_levels`.
+    coarse_coords : np.ndarray
+        The horizontal coordinates of the coarse columns with shape
+        (coarse, 2).
+    """
+    logger = prefect.context.get('logger')
+    interp_config = assim_config.get('weight_interp', None) or {}
+    if isinstance(observations, xr.Dataset):
+        observations = (observations, )
+    pseudo_state = background if first_guess is None else first_guess
+    innov, hx_perts, obs_cov, obs_grid = assimilation._prepare(
+        pseudo_state, observations
+    )
+    innov, hx_perts, obs_cov = (
+        torch.as_tensor(np.asarray(arr), dtype=torch.float64)
+        for arr in (innov, hx_perts, obs_cov)
+    )
+    grid_index = background.indexes['grid']
+    coarse_points, coarse_coords = get_coarse_points(
+        grid_index, stride=interp_config.get('stride', 1),
+        horiz_coords=interp_config.get('horiz_coords', ('rlat', 'rlon'))
+    )
+    n_levels, n_coarse = coarse_points.shape
+    coarse_points = grid_index[coarse_points.ravel()]
+
+    def localize(grid_slice: slice) -> np.ndarray:
+        obs_weights = []
+        for grid_point in coarse_points[grid_slice]:
+            use_obs, point_weights = assimilation.localization.localize_obs(
+                grid_point, obs_grid
+            )
+            obs_weights.append(np.where(use_obs, point_weights, 0))
+        return np.stack(obs_weights, axis=0)
+
+    n_ens = len(background['ensemble'])
+    block_letkf = BlockLETKF(
+        assimilation._get_back_prec(n_ens),
+        block_size=interp_config.get('block_size', 250),
+        group_tol=interp_config.get('group_tol', None)
+    )
+    coarse_weights = block_letkf.gen_weights(
+        innov, hx_perts, obs_cov, localize, n_grid=len(coarse_points)
+    )
+    coarse_weights = coarse_weights.reshape(
+        n_levels, n_coarse, n_ens, n_ens
+    )
+    n_columns = len(get_columns(
+        grid_index, interp_config.get('horiz_coords', ('rlat', 'rlon'))
+    )[1])
+    logger.info(
+        'Generated weights for {0:d} of {1:d} columns on {2:d} levels '
+        '({3:.1f}x fewer local analyses)'.format(
+            n_coarse, n_columns, n_levels, n_columns / max(n_coarse, 1)
+        )
+    )
+    return coarse_weights, coarse_coords
+
+
+@task
+def apply_coarse_weights(
+        background: xr.DataArray,
+        coarse_weights: np.ndarray,
+        coarse_coords: np.ndarray,
+        assim_config: Dict[str, Any]
+) -> xr.DataArray:
+    """
+    Interpolate the ensemble weights from the coarse columns to all columns
+    of the background and apply them as linear combination of the
+    background perturbations.
+    The interpolation matrix is persisted within `weight_interp:
+    cache_dir` of the assimilation configuration, if specified.
+
+    Parameters
+    ----------
+    background : xr.DataArray
+        The weights are applied to this background.
+    coarse_weights : np.ndarray
+        The ensemble weights with shape
+        (level, coarse, ensemble, ensemble) for the levels of the
+        background.
+    coarse_coords : np.ndarray
+        The horizontal coordinates of the coarse columns with shape
+        (coarse, 2).
+    assim_config : Dict[str, Any]
+        The assimilation configuration.
+
+    Returns
+    -------
+    analysis : xr.DataArray
+        The analysis with the same structure as the background.
+    """
+    interp_config = assim_config.get('weight_interp', None) or {}
+    analysis = apply_interpolated_weights(
+        background, coarse_weights, coarse_coords,
+        horiz_coords=interp_config.get('horiz_coords', ('rlat', 'rlon')),
+        cache_dir=interp_config.get('cache_dir', None)
+    )
+    return analysis
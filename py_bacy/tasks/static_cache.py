@@ -0,0 +1,224 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Any, Callable, Dict, Tuple, Union
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'StaticDataCache',
+    'STATIC_CACHE',
+    'load_static_dataset'
+]
+
+
+def _shallow_copy(obj: Any) -> Any:
+    if isinstance(obj, (xr.Dataset, xr.DataArray, pd.DataFrame)):
+        return obj.copy(deep=False)
+    return obj
+
+
+class StaticDataCache(object):
+    """
+    A cache for decoded static data like station lists, constant fields
+    and grid definitions, which do not change during an experiment.
+    The decoded objects are keyed by the real path and modification time of
+    the source file and the name of the loader, such that a modified source
+    file is loaded again.
+    The cache lives as long as the process, e.g. the
+    :py:class:`~py_bacy.engine.CyclingEngine`, such that later cycles get
+    the decoded objects without reading the source again.
+    If a persistence directory is set, decoded objects are additionally
+    stored as `.npy` for arrays and as pickle otherwise, which can be
+    shared between concurrent processes.
+
+    Parameters
+    ----------
+    persist_dir : None or str, optional
+        The decoded objects are persisted within this directory. If None
+        (default), the objects are only kept in memory.
+    """
+    def __init__(self, persist_dir: Union[None, str] = None):
+        self.persist_dir = persist_dir
+        self.hits = 0
+        self.misses = 0
+        self._objects = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __repr__(self) -> str:
+        return '{0:s}(size={1:d}, hits={2:d}, misses={3:d})'.format(
+            self.__class__.__name__, len(self), self.hits, self.misses
+        )
+
+    @staticmethod
+    def get_key(file_path: str, loader_name: str) -> Tuple[str, int, str]:
+        real_path = os.path.realpath(file_path)
+        mtime = os.stat(real_path).st_mtime_ns
+        return real_path, mtime, loader_name
+
+    def _get_persist_path(self, key: Tuple[str, int, str]) -> str:
+        key_hash = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.persist_dir, key_hash[:16])
+
+    def _load_persisted(self, key: Tuple[str, int, str]) -> Any:
+        persist_path = self._get_persist_path(key)
+        if os.path.isfile(persist_path + '.npy'):
+            return np.load(persist_path + '.npy', allow_pickle=False)
+        with open(persist_path + '.pkl', mode='rb') as pk_file:
+            return pickle.load(pk_file)
+
+    def _persist(self, key: Tuple[str, int, str], obj: Any):
+        os.makedirs(self.persist_dir, exist_ok=True)
+        persist_path = self._get_persist_path(key)
+        tmp_file, tmp_path = tempfile.mkstemp(dir=self.persist_dir)
+        with os.fdopen(tmp_file, mode='wb') as persist_file:
+            if isinstance(obj, np.ndarray) and obj.dtype != object:
+                np.save(persist_file, obj, allow_pickle=False)
+                persist_path += '.npy'
+            else:
+                pickle.dump(
+                    obj, persist_file, protocol=pickle.HIGHEST_PROTOCOL
+                )
+                persist_path += '.pkl'
+        os.replace(tmp_path, persist_path)
+
+    def get(
+            self,
+            file_path: str,
+            loader: Callable[[str], Any]
+    ) -> Any:
+        """
+        Get the cached object or decode the file with given loader.
+        Datasets and data frames are returned as shallow copies such that
+        the cached object is not changed by the caller.
+
+        Parameters
+        ----------
+        file_path : str
+            The object is decoded from this file.
+        loader : Callable[[str], Any]
+            This callable is called with the real path of the file, if the
+            object is neither cached in memory nor persisted.
+
+        Returns
+        -------
+        obj : Any
+            The decoded object.
+        """
+        key = self.get_key(file_path, loader.__qualname__)
+        with self._lock:
+            try:
+                obj = self._objects[key]
+                self.hits += 1
+                logger.debug('Static cache hit for {0:s}'.format(key[0]))
+                return _shallow_copy(obj)
+            except KeyError:
+                self.misses += 1
+            start_time = time.perf_counter()
+            obj = None
+            if self.persist_dir is not None:
+                try:
+                    obj = self._load_persisted(key)
+                    source = 'persisted cache'
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    obj = None
+            if obj is None:
+                obj = loader(key[0])
+                source = 'source'
+                if self.persist_dir is not None:
+                    self._persist(key, obj)
+            self._objects[key] = obj
+        logger.info(
+            'Loaded static data {0:s} from {1:s} in {2:.3f} s'.format(
+                key[0], source, time.perf_counter() - start_time
+            )
+        )
+        return _shallow_copy(obj)
+
+    def clear(self):
+        """
+        Remove all objects from memory and reset the counters.
+        Persisted objects are kept.
+        """
+        with self._lock:
+            self._objects = {}
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of this cache.
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            The number of hits, misses and cached objects.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def log_stats(self, cache_logger: logging.Logger = logger):
+        """
+        Log the statistics of this cache as info.
+
+        Parameters
+        ----------
+        cache_logger : logging.Logger, optional
+            The statistics are logged with this logger, default is the
+            logger of this module.
+        """
+        cache_logger.info('Static data cache: {0}'.format(repr(self)))
+
+
+STATIC_CACHE = StaticDataCache()
+
+
+def _read_dataset(file_path: str) -> xr.Dataset:
+    with xr.open_dataset(file_path) as ds:
+        return ds.load()
+
+
+def load_static_dataset(file_path: str) -> xr.Dataset:
+    """
+    Load a static netCDF-file into memory through the process-wide static
+    data cache.
+
+    Parameters
+    ----------
+    file_path : str
+        This file is loaded.
+
+    Returns
+    -------
+    ds : xr.Dataset
+        The loaded dataset.
+    """
+    return STATIC_CACHE.get(file_path, _read_dataset)
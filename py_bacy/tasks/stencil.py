@@ -0,0 +1,484 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Dict, Union
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+# External modules
+import numpy as np
+import scipy.sparse
+from scipy.spatial import cKDTree
+
+# Internal modules
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'latlon_to_cartesian',
+    'T2mStencil',
+    'get_t2m_stencil',
+    'build_idw_matrix',
+    'save_sparse_matrix',
+    'load_sparse_matrix',
+    'get_idw_matrix'
+]
+
+
+LAPSE_RATE = 0.0065
+
+_STENCILS: Dict[str, 'T2mStencil'] = {}
+_IDW_MATRICES: Dict[str, scipy.sparse.csr_matrix] = {}
+_STENCIL_LOCK = threading.Lock()
+
+
+def latlon_to_cartesian(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Convert latitudes and longitudes in degrees into cartesian coordinates
+    on the unit sphere.
+
+    Parameters
+    ----------
+    lat : np.ndarray
+        The latitudes in degrees.
+    lon : np.ndarray
+        The longitudes in degrees, same shape as the latitudes.
+
+    Returns
+    -------
+    coords : np.ndarray
+        The cartesian coordinates with an additional last axis of length 3.
+    """
+    lat_rad = np.deg2rad(lat)
+    lon_rad = np.deg2rad(lon)
+    coords = np.stack((
+        np.cos(lat_rad) * np.cos(lon_rad),
+        np.cos(lat_rad) * np.sin(lon_rad),
+        np.sin(lat_rad)
+    ), axis=-1)
+    return coords
+
+
+class T2mStencil(object):
+    """
+    The interpolation stencil of a 2-metre temperature operator for a fixed
+    set of stations and a fixed model grid.
+    The horizontal interpolation is stored as sparse matrix with one row per
+    station and one column per horizontal grid point, while the difference
+    between the interpolated model height and the station height is stored
+    per station.
+    The observation equivalent is then given by a single sparse
+    matrix-vector product per ensemble member and time step, followed by a
+    lapse-rate height correction.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        The interpolation weights with shape (station, grid).
+    height_diff : np.ndarray
+        The interpolated model height minus the station height in metres,
+        with shape (station, ).
+    """
+    def __init__(
+            self,
+            matrix: scipy.sparse.csr_matrix,
+            height_diff: np.ndarray
+    ):
+        self.matrix = scipy.sparse.csr_matrix(matrix)
+        self.height_diff = np.asarray(height_diff)
+
+    def __repr__(self) -> str:
+        return '{0:s}(n_stations={1:d}, n_grid={2:d}, nnz={3:d})'.format(
+            self.__class__.__name__, *self.matrix.shape, self.matrix.nnz
+        )
+
+    @classmethod
+    def from_coords(
+            cls,
+            station_lat: np.ndarray,
+            station_lon: np.ndarray,
+            station_height: np.ndarray,
+            grid_lat: np.ndarray,
+            grid_lon: np.ndarray,
+            grid_height: np.ndarray,
+            n_neighbors: int = 1
+    ) -> 'T2mStencil':
+        """
+        Build the stencil by a neighbour search on the unit sphere.
+        For more than one neighbour, the neighbours are weighted by their
+        inverse chordal distance.
+
+        Parameters
+        ----------
+        station_lat, station_lon, station_height : np.ndarray
+            The latitude and longitude in degrees and the height in metres
+            of the stations.
+        grid_lat, grid_lon, grid_height : np.ndarray
+            The latitude and longitude in degrees and the surface height in
+            metres of the model grid. The grid is flattened in C-order.
+        n_neighbors : int, optional
+            The number of neighbours per station, default is 1.
+
+        Returns
+        -------
+        stencil : T2mStencil
+            The built stencil.
+        """
+        grid_coords = latlon_to_cartesian(
+            np.ravel(grid_lat), np.ravel(grid_lon)
+        )
+        station_coords = latlon_to_cartesian(
+            np.asarray(station_lat), np.asarray(station_lon)
+        )
+        distances, indices = cKDTree(grid_coords).query(
+            station_coords, k=n_neighbors
+        )
+        distances = distances.reshape(len(station_coords), n_neighbors)
+        indices = indices.reshape(len(station_coords), n_neighbors)
+        if n_neighbors > 1:
+            weights = 1 / np.maximum(distances, 1E-12)
+            weights = weights / weights.sum(axis=1, keepdims=True)
+        else:
+            weights = np.ones_like(distances)
+        matrix = scipy.sparse.csr_matrix(
+            (
+                weights.ravel(),
+                indices.ravel(),
+                np.arange(0, indices.size+1, n_neighbors)
+            ),
+            shape=(len(station_coords), grid_coords.shape[0])
+        )
+        model_height = matrix @ np.ravel(grid_height)
+        height_diff = model_height - np.asarray(station_height)
+        return cls(matrix, height_diff)
+
+    def save(self, file_path: str):
+        """
+        Store the stencil as uncompressed npz-file. The file is written to
+        a temporary file first and moved afterwards such that concurrent
+        readers never see a partial file.
+
+        Parameters
+        ----------
+        file_path : str
+            The stencil is stored under this path.
+        """
+        tmp_file, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(file_path)), suffix='.npz'
+        )
+        with os.fdopen(tmp_file, mode='wb') as stencil_file:
+            np.savez(
+                stencil_file, data=self.matrix.data,
+                indices=self.matrix.indices, indptr=self.matrix.indptr,
+                shape=self.matrix.shape, height_diff=self.height_diff
+            )
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'T2mStencil':
+        """
+        Load a stencil from a npz-file written by :py:meth:`save`.
+
+        Parameters
+        ----------
+        file_path : str
+            The stencil is loaded from this path.
+
+        Returns
+        -------
+        stencil : T2mStencil
+            The loaded stencil.
+        """
+        with np.load(file_path) as stencil_file:
+            matrix = scipy.sparse.csr_matrix(
+                (stencil_file['data'], stencil_file['indices'],
+                 stencil_file['indptr']),
+                shape=tuple(stencil_file['shape'])
+            )
+            height_diff = stencil_file['height_diff']
+        return cls(matrix, height_diff)
+
+    def apply(
+            self,
+            t2m_values: np.ndarray,
+            lapse_rate: float = LAPSE_RATE
+    ) -> np.ndarray:
+        """
+        Apply the stencil to 2-metre temperature fields.
+
+        Parameters
+        ----------
+        t2m_values : np.ndarray
+            The 2-metre temperature with the flattened horizontal grid as
+            last axis.
+        lapse_rate : float, optional
+            The temperature is corrected with this lapse rate in K/m from
+            the model height to the station height, default is 0.0065.
+
+        Returns
+        -------
+        obs_equivalent : np.ndarray
+            The interpolated and corrected temperature with the stations as
+            last axis.
+        """
+        lead_shape = t2m_values.shape[:-1]
+        flat_values = t2m_values.reshape(-1, t2m_values.shape[-1])
+        obs_equivalent = (self.matrix @ flat_values.T).T
+        obs_equivalent = obs_equivalent + lapse_rate * self.height_diff
+        return obs_equivalent.reshape(lead_shape + (self.matrix.shape[0], ))
+
+
+def _hash_arrays(*arrays: np.ndarray) -> str:
+    hasher = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        hasher.update(str(array.shape).encode('utf-8'))
+        hasher.update(array.tobytes())
+    return hasher.hexdigest()[:16]
+
+
+def get_t2m_stencil(
+        station_lat: np.ndarray,
+        station_lon: np.ndarray,
+        station_height: np.ndarray,
+        grid_lat: np.ndarray,
+        grid_lon: np.ndarray,
+        grid_height: np.ndarray,
+        n_neighbors: int = 1,
+        cache_dir: Union[None, str] = None
+) -> T2mStencil:
+    """
+    Get the stencil for a pair of station set and model grid.
+    The stencils are keyed by a hash of the coordinates and cached for the
+    lifetime of the process. If a cache directory is given, the stencils
+    are additionally persisted as `t2m_stencil_<hash>.npz` within this
+    directory and reused by later processes.
+
+    Parameters
+    ----------
+    station_lat, station_lon, station_height : np.ndarray
+        The latitude and longitude in degrees and the height in metres of
+        the stations.
+    grid_lat, grid_lon, grid_height : np.ndarray
+        The latitude and longitude in degrees and the surface height in
+        metres of the model grid.
+    n_neighbors : int, optional
+        The number of neighbours per station, default is 1.
+    cache_dir : None or str, optional
+        The stencil is persisted within this directory. If None (default),
+        the stencil is only cached in memory.
+
+    Returns
+    -------
+    stencil : T2mStencil
+        The cached or newly built stencil.
+    """
+    stencil_hash = _hash_arrays(
+        station_lat, station_lon, station_height, grid_lat, grid_lon,
+        grid_height, np.array(n_neighbors)
+    )
+    with _STENCIL_LOCK:
+        try:
+            return _STENCILS[stencil_hash]
+        except KeyError:
+            pass
+        stencil_path = None
+        if cache_dir is not None:
+            stencil_path = os.path.join(
+                cache_dir, 't2m_stencil_{0:s}.npz'.format(stencil_hash)
+            )
+        if stencil_path is not None and os.path.isfile(stencil_path):
+            stencil = T2mStencil.load(stencil_path)
+            logger.info('Loaded T2m stencil from {0:s}'.format(stencil_path))
+        else:
+            stencil = T2mStencil.from_coords(
+                station_lat, station_lon, station_height, grid_lat,
+                grid_lon, grid_height, n_neighbors=n_neighbors
+            )
+            logger.info('Built T2m stencil {0}'.format(stencil))
+            if stencil_path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                stencil.save(stencil_path)
+        _STENCILS[stencil_hash] = stencil
+    return stencil
+
+
+def build_idw_matrix(
+        lat_lon_src: np.ndarray,
+        lat_lon_trg: np.ndarray,
+        n_neighbors: int = 4,
+        earth_radius: float = 6371000
+) -> scipy.sparse.csr_matrix:
+    """
+    Build a sparse inverse squared distance interpolation matrix from a
+    source grid to a target grid.
+    The neighbours are searched in cartesian coordinates on a sphere with
+    given radius.
+
+    Parameters
+    ----------
+    lat_lon_src : np.ndarray
+        The latitude and longitude in degrees of the source grid as last
+        axis. The grid is flattened in C-order.
+    lat_lon_trg : np.ndarray
+        The latitude and longitude in degrees of the target grid as last
+        axis. The grid is flattened in C-order.
+    n_neighbors : int, optional
+        The number of source neighbours per target point, default is 4.
+    earth_radius : float, optional
+        The radius of the sphere in metres, default is 6371000.
+
+    Returns
+    -------
+    matrix : scipy.sparse.csr_matrix
+        The interpolation weights with shape (target, source).
+    """
+    lat_lon_src = np.asarray(lat_lon_src).reshape(-1, 2)
+    lat_lon_trg = np.asarray(lat_lon_trg).reshape(-1, 2)
+    cart_src = earth_radius * latlon_to_cartesian(
+        lat_lon_src[:, 0], lat_lon_src[:, 1]
+    )
+    cart_trg = earth_radius * latlon_to_cartesian(
+        lat_lon_trg[:, 0], lat_lon_trg[:, 1]
+    )
+    distances, indices = cKDTree(cart_src).query(cart_trg, k=n_neighbors)
+    distances = distances.reshape(len(cart_trg), n_neighbors)
+    indices = indices.reshape(len(cart_trg), n_neighbors)
+    inv_dist_squared = 1 / np.power(np.maximum(distances, 1E-12), 2)
+    weights = inv_dist_squared / inv_dist_squared.sum(axis=1, keepdims=True)
+    matrix = scipy.sparse.csr_matrix(
+        (
+            weights.ravel(),
+            indices.ravel(),
+            np.arange(0, indices.size+1, n_neighbors)
+        ),
+        shape=(len(cart_trg), len(cart_src))
+    )
+    return matrix
+
+
+def save_sparse_matrix(file_path: str, matrix: scipy.sparse.csr_matrix):
+    """
+    Store a sparse matrix as uncompressed npz-file, written to a temporary
+    file first and moved afterwards.
+
+    Parameters
+    ----------
+    file_path : str
+        The matrix is stored under this path.
+    matrix : scipy.sparse.csr_matrix
+        This matrix is stored.
+    """
+    tmp_file, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_path)), suffix='.npz'
+    )
+    with os.fdopen(tmp_file, mode='wb') as matrix_file:
+        np.savez(
+            matrix_file, data=matrix.data, indices=matrix.indices,
+            indptr=matrix.indptr, shape=matrix.shape
+        )
+    os.replace(tmp_path, file_path)
+
+
+def load_sparse_matrix(file_path: str) -> scipy.sparse.csr_matrix:
+    """
+    Load a sparse matrix from a npz-file written by
+    :py:func:`save_sparse_matrix`.
+
+    Parameters
+    ----------
+    file_path : str
+        The matrix is loaded from this path.
+
+    Returns
+    -------
+    matrix : scipy.sparse.csr_matrix
+        The loaded matrix.
+    """
+    with np.load(file_path) as matrix_file:
+        matrix = scipy.sparse.csr_matrix(
+            (matrix_file['data'], matrix_file['indices'],
+             matrix_file['indptr']),
+            shape=tuple(matrix_file['shape'])
+        )
+    return matrix
+
+
+def get_idw_matrix(
+        lat_lon_src: np.ndarray,
+        lat_lon_trg: np.ndarray,
+        n_neighbors: int = 4,
+        cache_dir: Union[None, str] = None
+) -> scipy.sparse.csr_matrix:
+    """
+    Get the inverse distance interpolation matrix between two grids.
+    The matrices are keyed by a hash of the coordinates and cached for the
+    lifetime of the process. If a cache directory is given, the matrices
+    are additionally persisted as `idw_matrix_<hash>.npz` within this
+    directory and reused by later processes.
+
+    Parameters
+    ----------
+    lat_lon_src : np.ndarray
+        The latitude and longitude in degrees of the source grid as last
+        axis.
+    lat_lon_trg : np.ndarray
+        The latitude and longitude in degrees of the target grid as last
+        axis.
+    n_neighbors : int, optional
+        The number of source neighbours per target point, default is 4.
+    cache_dir : None or str, optional
+        The matrix is persisted within this directory. If None (default),
+        the matrix is only cached in memory.
+
+    Returns
+    -------
+    matrix : scipy.sparse.csr_matrix
+        The cached or newly built interpolation matrix with shape
+        (target, source).
+    """
+    matrix_hash = _hash_arrays(
+        lat_lon_src, lat_lon_trg, np.array(n_neighbors)
+    )
+    with _STENCIL_LOCK:
+        try:
+            return _IDW_MATRICES[matrix_hash]
+        except KeyError:
+            pass
+        matrix_path = None
+        if cache_dir is not None:
+            matrix_path = os.path.join(
+                cache_dir, 'idw_matrix_{0:s}.npz'.format(matrix_hash)
+            )
+        if matrix_path is not None and os.path.isfile(matrix_path):
+            matrix = load_sparse_matrix(matrix_path)
+            logger.info(
+                'Loaded interpolation matrix from {0:s}'.format(matrix_path)
+            )
+        else:
+            matrix = build_idw_matrix(
+                lat_lon_src, lat_lon_trg, n_neighbors=n_neighbors
+            )
+            logger.info('Built interpolation matrix with shape {0}'.format(
+                matrix.shape
+            ))
+            if matrix_path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                save_sparse_matrix(matrix_path, matrix)
+        _IDW_MATRICES[matrix_hash] = matrix
+    return matrix
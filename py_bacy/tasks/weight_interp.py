@@ -0,0 +1,368 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+from typing import Callable, Iterable, Tuple, Union
+import logging
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+from .stencil import get_idw_matrix
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'get_columns',
+    'get_levels',
+    'coarsen_columns',
+    'get_coarse_points',
+    'interpolate_ens_weights',
+    'apply_ens_weights',
+    'apply_interpolated_weights'
+]
+
+
+def get_columns(
+        grid_index: pd.MultiIndex,
+        horiz_coords: Iterable[str] = ('rlat', 'rlon')
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split a state grid into its horizontal columns.
+
+    Parameters
+    ----------
+    grid_index : pd.MultiIndex
+        The multiindex of the state grid.
+    horiz_coords : Iterable[str], optional
+        The names of the latitude-like and longitude-like levels of the
+        multiindex, default is `('rlat', 'rlon')`.
+
+    Returns
+    -------
+    column_of_grid : np.ndarray
+        The column index of every grid point with shape (grid, ).
+    column_coords : np.ndarray
+        The horizontal coordinates of every column with shape (column, 2).
+    column_first : np.ndarray
+        The index of the first grid point of every column with shape
+        (column, ).
+    """
+    horiz_values = np.stack([
+        grid_index.get_level_values(coord).values.astype(float)
+        for coord in horiz_coords
+    ], axis=-1)
+    column_coords, column_first, column_of_grid = np.unique(
+        horiz_values, axis=0, return_index=True, return_inverse=True
+    )
+    return column_of_grid.ravel(), column_coords, column_first
+
+
+def get_levels(
+        grid_index: pd.MultiIndex,
+        horiz_coords: Iterable[str] = ('rlat', 'rlon')
+) -> Tuple[np.ndarray, int]:
+    """
+    Split a state grid into its vertical levels, given by the levels of
+    the multiindex that are not horizontal.
+
+    Parameters
+    ----------
+    grid_index : pd.MultiIndex
+        The multiindex of the state grid.
+    horiz_coords : Iterable[str], optional
+        The names of the latitude-like and longitude-like levels of the
+        multiindex, default is `('rlat', 'rlon')`.
+
+    Returns
+    -------
+    level_of_grid : np.ndarray
+        The level index of every grid point with shape (grid, ), where the
+        levels are sorted ascending by their values.
+    n_levels : int
+        The number of levels. A grid without non-horizontal levels has a
+        single level.
+    """
+    vert_coords = [
+        coord for coord in grid_index.names if coord not in horiz_coords
+    ]
+    if not vert_coords:
+        return np.zeros(len(grid_index), dtype=int), 1
+    vert_values = np.stack([
+        grid_index.get_level_values(coord).values.astype(float)
+        for coord in vert_coords
+    ], axis=-1)
+    level_values, level_of_grid = np.unique(
+        vert_values, axis=0, return_inverse=True
+    )
+    return level_of_grid.ravel(), len(level_values)
+
+
+def coarsen_columns(column_coords: np.ndarray, stride: int) -> np.ndarray:
+    """
+    Select the columns of a coarsened grid, which keeps every n-th value of
+    both horizontal coordinates.
+
+    Parameters
+    ----------
+    column_coords : np.ndarray
+        The horizontal coordinates of the columns with shape (column, 2).
+    stride : int
+        Every n-th value of both coordinates is kept.
+
+    Returns
+    -------
+    coarse_columns : np.ndarray
+        The indices of the columns on the coarsened grid.
+    """
+    is_coarse = np.ones(len(column_coords), dtype=bool)
+    for coord_values in column_coords.T:
+        kept_values = np.unique(coord_values)[::stride]
+        is_coarse &= np.isin(coord_values, kept_values)
+    return np.flatnonzero(is_coarse)
+
+
+def get_coarse_points(
+        grid_index: pd.MultiIndex,
+        stride: int,
+        horiz_coords: Iterable[str] = ('rlat', 'rlon')
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the grid points of every level within the columns of a coarsened
+    grid, see :py:func:`coarsen_columns`.
+
+    Parameters
+    ----------
+    grid_index : pd.MultiIndex
+        The multiindex of the state grid.
+    stride : int
+        Every n-th value of both horizontal coordinates is kept.
+    horiz_coords : Iterable[str], optional
+        The names of the latitude-like and longitude-like levels of the
+        multiindex, default is `('rlat', 'rlon')`.
+
+    Returns
+    -------
+    coarse_points : np.ndarray
+        The positions of the coarse grid points within the grid with shape
+        (level, coarse).
+    coarse_coords : np.ndarray
+        The horizontal coordinates of the coarse columns with shape
+        (coarse, 2).
+
+    Raises
+    ------
+    ValueError
+        A coarse column does not have a grid point on every level.
+    """
+    column_of_grid, column_coords, _ = get_columns(grid_index, horiz_coords)
+    level_of_grid, n_levels = get_levels(grid_index, horiz_coords)
+    coarse_columns = coarsen_columns(column_coords, stride)
+    point_matrix = np.full((n_levels, len(column_coords)), -1, dtype=int)
+    point_matrix[level_of_grid, column_of_grid] = np.arange(len(grid_index))
+    coarse_points = point_matrix[:, coarse_columns]
+    if np.any(coarse_points < 0):
+        raise ValueError(
+            'Every coarse column needs a grid point on each of the '
+            '{0:d} levels'.format(n_levels)
+        )
+    return coarse_points, column_coords[coarse_columns]
+
+
+def interpolate_ens_weights(
+        weights: np.ndarray,
+        coarse_coords: np.ndarray,
+        target_coords: np.ndarray,
+        cache_dir: Union[None, str] = None
+) -> np.ndarray:
+    """
+    Interpolate ensemble weights from coarse columns to target columns with
+    inverse squared distance weighting of the four nearest coarse columns.
+    Target columns that coincide with a coarse column get its weights.
+
+    Parameters
+    ----------
+    weights : np.ndarray
+        The ensemble weights of the coarse columns with shape
+        (coarse, ensemble, ensemble).
+    coarse_coords : np.ndarray
+        The latitude and longitude in degrees of the coarse columns with
+        shape (coarse, 2).
+    target_coords : np.ndarray
+        The latitude and longitude in degrees of the target columns with
+        shape (target, 2).
+    cache_dir : None or str, optional
+        The interpolation matrix is persisted within this directory, see
+        :py:func:`~py_bacy.tasks.stencil.get_idw_matrix`.
+
+    Returns
+    -------
+    target_weights : np.ndarray
+        The interpolated weights with shape (target, ensemble, ensemble).
+    """
+    n_neighbors = min(4, len(coarse_coords))
+    interp_matrix = get_idw_matrix(
+        coarse_coords, target_coords, n_neighbors=n_neighbors,
+        cache_dir=cache_dir
+    )
+    target_weights = interp_matrix @ weights.reshape(len(weights), -1)
+    return target_weights.reshape((len(target_coords), ) + weights.shape[1:])
+
+
+def apply_ens_weights(
+        background: xr.DataArray,
+        weights: np.ndarray,
+        column_of_grid: np.ndarray,
+        chunk_size: int = 10000
+) -> xr.DataArray:
+    """
+    Apply column-wise ensemble weights to a background as linear
+    combination of its ensemble perturbations,
+    analysis = mean + perturbations @ weights.
+
+    Parameters
+    ----------
+    background : xr.DataArray
+        The background with an `ensemble` and a `grid` dimension.
+    weights : np.ndarray
+        The ensemble weights of every column with shape
+        (column, ensemble, ensemble).
+    column_of_grid : np.ndarray
+        The column index of every grid point with shape (grid, ).
+    chunk_size : int, optional
+        This number of grid points is processed at once to bound the
+        memory of the gathered weights, default is 10000.
+
+    Returns
+    -------
+    analysis : xr.DataArray
+        The analysis with the same dimensions and coordinates as the
+        background.
+    """
+    other_dims = [
+        dim for dim in background.dims if dim not in ('grid', 'ensemble')
+    ]
+    bg_values = background.transpose(*other_dims, 'grid', 'ensemble').values
+    bg_mean = bg_values.mean(axis=-1, keepdims=True)
+    bg_perts = bg_values - bg_mean
+    ana_values = np.empty_like(bg_values)
+    for chunk_start in range(0, len(column_of_grid), chunk_size):
+        chunk = slice(chunk_start, chunk_start+chunk_size)
+        chunk_weights = weights[column_of_grid[chunk]]
+        ana_values[..., chunk, :] = bg_mean[..., chunk, :] + np.einsum(
+            '...gk,gkj->...gj', bg_perts[..., chunk, :], chunk_weights
+        )
+    analysis = background.transpose(*other_dims, 'grid', 'ensemble').copy(
+        data=ana_values
+    )
+    return analysis.transpose(*background.dims)
+
+
+def apply_interpolated_weights(
+        background: xr.DataArray,
+        coarse_weights: np.ndarray,
+        coarse_coords: np.ndarray,
+        horiz_coords: Iterable[str] = ('rlat', 'rlon'),
+        cache_dir: Union[None, str] = None,
+        coords_transform: Union[
+            None, Callable[[np.ndarray], np.ndarray]
+        ] = None,
+        level: Union[None, int] = None
+) -> xr.DataArray:
+    """
+    Interpolate ensemble weights from coarse columns to the columns of a
+    background and apply them as linear combination of its perturbations.
+    Level-wise weights are horizontally interpolated and applied level by
+    level, such that the vertical localization is kept.
+
+    Parameters
+    ----------
+    background : xr.DataArray
+        The weights are applied to this background with an `ensemble` and
+        a `grid` dimension.
+    coarse_weights : np.ndarray
+        The ensemble weights with shape (coarse, ensemble, ensemble), which
+        are applied to every level, or with shape
+        (level, coarse, ensemble, ensemble) for the levels of the
+        background, see :py:func:`get_levels`.
+    coarse_coords : np.ndarray
+        The horizontal coordinates of the coarse columns with shape
+        (coarse, 2).
+    horiz_coords : Iterable[str], optional
+        The names of the horizontal levels of the background grid, default
+        is `('rlat', 'rlon')`.
+    cache_dir : None or str, optional
+        The interpolation matrix is persisted within this directory.
+    coords_transform : None or Callable[[np.ndarray], np.ndarray], optional
+        This callable transforms the column coordinates of the background
+        with shape (column, 2) into the coordinate system of the coarse
+        columns. If None (default), both grids share the same system.
+    level : None or int, optional
+        If given, the weights of this level index are applied to every
+        level of the background, e.g. to transfer the weights to the layers
+        of another model. The levels are sorted ascending by their values,
+        see :py:func:`get_levels`. If None (default), the weights are
+        applied to their corresponding levels.
+
+    Returns
+    -------
+    analysis : xr.DataArray
+        The analysis with the same structure as the background.
+
+    Raises
+    ------
+    ValueError
+        The number of weight levels does not match the background.
+    """
+    grid_index = background.indexes['grid']
+    column_of_grid, column_coords, _ = get_columns(grid_index, horiz_coords)
+    if coords_transform is not None:
+        column_coords = coords_transform(column_coords)
+    if coarse_weights.ndim == 3:
+        coarse_weights = coarse_weights[None, ...]
+    if level is not None:
+        coarse_weights = coarse_weights[[level]]
+    if len(coarse_weights) == 1:
+        level_of_grid = np.zeros(len(grid_index), dtype=int)
+    else:
+        level_of_grid, n_levels = get_levels(grid_index, horiz_coords)
+        if n_levels != len(coarse_weights):
+            raise ValueError(
+                'Got weights for {0:d} levels, but the background has {1:d} '
+                'levels'.format(len(coarse_weights), n_levels)
+            )
+    grid_axis = background.get_axis_num('grid')
+    ana_values = np.empty(background.shape, dtype=background.dtype)
+    for level, level_weights in enumerate(coarse_weights):
+        level_points = np.flatnonzero(level_of_grid == level)
+        column_weights = interpolate_ens_weights(
+            level_weights, coarse_coords, column_coords, cache_dir=cache_dir
+        )
+        level_analysis = apply_ens_weights(
+            background.isel(grid=level_points), column_weights,
+            column_of_grid[level_points]
+        )
+        level_slice = [slice(None)] * background.ndim
+        level_slice[grid_axis] = level_points
+        ana_values[tuple(level_slice)] = level_analysis.values
+    logger.info(
+        'Interpolated weights of {0:d} levels from {1:d} to {2:d} '
+        'columns'.format(
+            len(coarse_weights), len(coarse_coords), len(column_coords)
+        )
+    )
+    return background.copy(data=ana_values)
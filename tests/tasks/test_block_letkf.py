@@ -0,0 +1,207 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+
+# External modules
+import numpy as np
+import torch
+
+# Internal modules
+from py_bacy.tasks.block_letkf import BlockLETKF, gather_local_obs, \
+    group_local_obs
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def reference_weights(innov, hx_perts, obs_var, obs_weights, back_prec):
+    use_obs = obs_weights > 0
+    obs_prec = obs_weights[use_obs] / obs_var[use_obs]
+    local_perts = hx_perts[use_obs]
+    prec_ana = local_perts.T @ (obs_prec[:, None] * local_perts) + back_prec
+    evals, evects = np.linalg.eigh(prec_ana)
+    cov_ana = evects @ np.diag(1 / evals) @ evects.T
+    w_mean = cov_ana @ local_perts.T @ (obs_prec * innov[use_obs])
+    w_perts = evects @ np.diag(
+        np.sqrt((len(back_prec)-1) / evals)
+    ) @ evects.T
+    return w_mean[:, None] + w_perts
+
+
+class TestBlockLETKF(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.n_obs, self.n_grid, self.ens_mems = 30, 12, 8
+        self.innov = rnd.normal(size=self.n_obs)
+        self.hx_perts = rnd.normal(size=(self.n_obs, self.ens_mems))
+        self.hx_perts -= self.hx_perts.mean(axis=1, keepdims=True)
+        self.obs_var = rnd.uniform(0.5, 2, size=self.n_obs)
+        self.obs_weights = rnd.uniform(size=(self.n_grid, self.n_obs))
+        self.obs_weights[self.obs_weights < 0.6] = 0
+        self.obs_weights[0] = 0
+        self.back_prec = np.eye(self.ens_mems) * (self.ens_mems-1) / 1.2
+        self.letkf = BlockLETKF(torch.from_numpy(self.back_prec))
+
+    def localize(self, grid_slice):
+        return self.obs_weights[grid_slice]
+
+    def test_gather_local_obs_pads_indices(self):
+        obs_weights = np.array([[0, 1, 0, 2], [0, 0, 0, 0], [3, 0, 0, 0]])
+        obs_index, obs_mask = gather_local_obs(obs_weights)
+        np.testing.assert_equal(obs_index, [[1, 3], [0, 0], [0, 0]])
+        np.testing.assert_equal(
+            obs_mask, [[True, True], [False, False], [True, False]]
+        )
+
+    def test_solve_block_equals_reference(self):
+        returned_weights = self.letkf.solve_block(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), self.obs_weights
+        ).numpy()
+        self.assertTupleEqual(
+            returned_weights.shape,
+            (self.n_grid, self.ens_mems, self.ens_mems)
+        )
+        for k in range(self.n_grid):
+            right_weights = reference_weights(
+                self.innov, self.hx_perts, self.obs_var, self.obs_weights[k],
+                self.back_prec
+            )
+            np.testing.assert_allclose(
+                returned_weights[k], right_weights, atol=1E-10
+            )
+
+    def test_solve_block_without_obs_inflates(self):
+        returned_weights = self.letkf.solve_block(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), self.obs_weights[:1]
+        ).numpy()
+        np.testing.assert_allclose(
+            returned_weights[0], np.eye(self.ens_mems) * np.sqrt(1.2)
+        )
+
+    def test_gen_weights_independent_of_block_size(self):
+        right_weights = self.letkf.gen_weights(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), self.localize, self.n_grid
+        )
+        self.letkf.block_size = 5
+        out = np.zeros((self.n_grid, self.ens_mems, self.ens_mems))
+        returned_weights = self.letkf.gen_weights(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.diag(torch.from_numpy(self.obs_var)), self.localize,
+            self.n_grid, out=out
+        )
+        self.assertIs(returned_weights, out)
+        np.testing.assert_allclose(returned_weights, right_weights)
+
+    def test_solve_block_skips_non_finite_obs(self):
+        innov = self.innov.copy()
+        innov[[0, 5]] = np.nan
+        hx_perts = self.hx_perts.copy()
+        hx_perts[7] = np.nan
+        valid_weights = self.obs_weights.copy()
+        valid_weights[:, [0, 5, 7]] = 0
+        right_weights = self.letkf.solve_block(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), valid_weights
+        ).numpy()
+        returned_weights = self.letkf.solve_block(
+            torch.from_numpy(innov), torch.from_numpy(hx_perts),
+            torch.from_numpy(self.obs_var), self.obs_weights
+        ).numpy()
+        self.assertTrue(np.isfinite(returned_weights).all())
+        np.testing.assert_allclose(returned_weights, right_weights)
+
+    def test_gen_weights_skips_non_finite_obs(self):
+        innov = self.innov.copy()
+        innov[[0, 5]] = np.nan
+        valid_weights = self.obs_weights.copy()
+        valid_weights[:, [0, 5]] = 0
+        right_weights = self.letkf.gen_weights(
+            torch.from_numpy(self.innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), lambda sl: valid_weights[sl],
+            self.n_grid
+        )
+        self.letkf.group_tol = 1E-6
+        returned_weights = self.letkf.gen_weights(
+            torch.from_numpy(innov), torch.from_numpy(self.hx_perts),
+            torch.from_numpy(self.obs_var), self.localize, self.n_grid
+        )
+        np.testing.assert_allclose(
+            returned_weights, right_weights, atol=1E-5
+        )
+
+
+class TestGroupedBlockLETKF(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.n_obs, self.ens_mems = 30, 8
+        self.innov = torch.from_numpy(rnd.normal(size=self.n_obs))
+        hx_perts = rnd.normal(size=(self.n_obs, self.ens_mems))
+        self.hx_perts = torch.from_numpy(
+            hx_perts - hx_perts.mean(axis=1, keepdims=True)
+        )
+        self.obs_var = torch.from_numpy(rnd.uniform(0.5, 2, size=self.n_obs))
+        patch_weights = rnd.uniform(size=(3, self.n_obs))
+        patch_weights[patch_weights < 0.6] = 0
+        self.obs_weights = np.repeat(patch_weights, 4, axis=0)
+        self.obs_weights += rnd.uniform(-1E-5, 1E-5, self.obs_weights.shape)
+        self.obs_weights[self.obs_weights < 1E-4] = 0
+        self.back_prec = torch.eye(self.ens_mems, dtype=torch.float64) * 7
+
+    def localize(self, grid_slice):
+        return self.obs_weights[grid_slice]
+
+    def test_group_local_obs_groups_patches(self):
+        group_weights, group_inverse, group_keys = group_local_obs(
+            self.obs_weights, tol=1E-3
+        )
+        self.assertEqual(len(group_weights), 3)
+        self.assertEqual(len(set(group_keys)), 3)
+        np.testing.assert_equal(group_inverse[:4], group_inverse[0])
+        np.testing.assert_allclose(
+            group_weights[group_inverse], self.obs_weights, atol=1E-3
+        )
+
+    def test_grouped_close_to_ungrouped(self):
+        right_weights = BlockLETKF(self.back_prec).gen_weights(
+            self.innov, self.hx_perts, self.obs_var, self.localize,
+            len(self.obs_weights)
+        )
+        letkf = BlockLETKF(self.back_prec, block_size=5, group_tol=1E-3)
+        returned_weights = letkf.gen_weights(
+            self.innov, self.hx_perts, self.obs_var, self.localize,
+            len(self.obs_weights)
+        )
+        np.testing.assert_allclose(returned_weights, right_weights, atol=1E-3)
+        for returned_point_weights in returned_weights[1:4]:
+            np.testing.assert_equal(
+                returned_point_weights, returned_weights[0]
+            )
+
+    def test_grouped_reuses_groups_across_blocks(self):
+        letkf = BlockLETKF(self.back_prec, block_size=5, group_tol=1E-3)
+        _ = letkf.gen_weights(
+            self.innov, self.hx_perts, self.obs_var, self.localize,
+            len(self.obs_weights)
+        )
+        self.assertEqual(letkf.stats['n_solved'], 3)
+        self.assertAlmostEqual(letkf.stats['hit_rate'], 0.75)
+        self.assertAlmostEqual(letkf.stats['speedup'], 4.)
+
+
+if __name__ == '__main__':
+    unittest.main()
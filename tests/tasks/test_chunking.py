@@ -0,0 +1,83 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import tempfile
+import shutil
+
+# External modules
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.chunking import ChunkingPolicy
+from py_bacy.tasks.io import load_ens_data
+from .test_io import create_ens_files
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestChunkingPolicy(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_paths = create_ens_files(self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_from_config_derives_worker_memory(self):
+        cycle_config = {
+            'CLUSTER': {'n_workers': 4, 'slurm': False},
+            'EXPERIMENT': {'memory_per_node': '8 GB', 'cpus_per_node': 16}
+        }
+        assim_config = {'chunks': {'variables': {'T': {'level': 1}}}}
+        policy = ChunkingPolicy.from_config(cycle_config, assim_config)
+        self.assertEqual(policy.n_workers, 4)
+        self.assertEqual(policy.memory_per_worker, 2 * 10**9)
+        self.assertDictEqual(policy.var_chunks, {'T': {'level': 1}})
+        cycle_config['CLUSTER']['slurm'] = True
+        policy = ChunkingPolicy.from_config(cycle_config)
+        self.assertEqual(policy.memory_per_worker, 5 * 10**8)
+
+    def test_get_chunks_splits_outer_grid_dim_by_workers(self):
+        policy = ChunkingPolicy(n_workers=2)
+        chunks = policy.get_chunks(self.file_paths[0][0], ens_size=3)
+        self.assertEqual(chunks['rlon'], 5)
+        self.assertEqual(chunks['rlat'], 2)
+        self.assertEqual(chunks['level'], -1)
+
+    def test_get_chunks_limits_memory(self):
+        policy = ChunkingPolicy(
+            n_workers=1, memory_per_worker=3*8*3*3, memory_fraction=1.
+        )
+        chunks = policy.get_chunks(self.file_paths[0][0], ens_size=3)
+        self.assertEqual(chunks['rlon'], 3)
+        self.assertEqual(chunks['rlat'], 1)
+
+    def test_load_ens_data_applies_policy(self):
+        policy = ChunkingPolicy(n_workers=2, var_chunks={'T': {'level': 1}})
+        ds_ens = load_ens_data.run(
+            file_paths=self.file_paths, parallel=False, variables=['T', 'QV'],
+            chunking=policy
+        )
+        self.assertTupleEqual(ds_ens['QV'].data.chunksize, (3, 1, 3, 2, 5))
+        self.assertTupleEqual(ds_ens['T'].data.chunksize, (3, 1, 1, 2, 5))
+        ds_default = load_ens_data.run(
+            file_paths=self.file_paths, parallel=False, variables=['T', 'QV'],
+        )
+        xr.testing.assert_identical(ds_ens.load(), ds_default.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import pickle
+
+# External modules
+import numpy as np
+import pandas as pd
+
+# Internal modules
+from py_bacy.tasks.distance import CosmoDistance, ClmDistance, \
+    IndexedDistance, press_int, DEG_TO_M, coords_to_array, cart_dist_func, \
+    array_dist_func
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def reference_cosmo_dist(x, y):
+    diff_obs_cos_deg = y.values[:, 1:-1] - x[1:-1]
+    diff_obs_cos_m = diff_obs_cos_deg * DEG_TO_M
+    dist_obs_cos_2d = np.sqrt(np.sum(diff_obs_cos_m**2, axis=-1))
+    cos_lnp = np.log(press_int(x[-1]))
+    obs_lnp = np.log(press_int(y.values[:, -1]))
+    return dist_obs_cos_2d, np.abs(cos_lnp - obs_lnp)
+
+
+class ShiftTransform(object):
+    def __init__(self):
+        self.n_calls = 0
+
+    def __call__(self, lon, lat):
+        self.n_calls += 1
+        return np.asarray(lon) - 10., np.asarray(lat) - 40.
+
+
+def reference_clm_dist(x, y):
+    grid_hori = np.array([x[1] - 40., x[2] - 10.])
+    diff_obs_clm_m = (y.values[:, 1:-1] - grid_hori) * DEG_TO_M
+    dist_obs_clm_2d = np.sqrt(np.sum(diff_obs_clm_m**2, axis=-1))
+    return dist_obs_clm_2d, np.abs(y.values[:, -1]-x[-1])
+
+
+class TestCosmoDistance(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.obs_coords = pd.DataFrame({
+            'id': np.arange(20.),
+            'lat': rnd.uniform(50, 52, size=20),
+            'lon': rnd.uniform(6, 9, size=20),
+            'height': rnd.uniform(0, 500, size=20),
+        })
+        self.grid_coords = np.stack([
+            np.zeros(30), rnd.uniform(50, 52, size=30),
+            rnd.uniform(6, 9, size=30),
+            rnd.choice([10., 100., 500., 1500.], size=30)
+        ], axis=-1)
+        self.distance = CosmoDistance()
+
+    def test_call_equals_reference(self):
+        for grid_point in self.grid_coords:
+            returned_dist = self.distance(grid_point, self.obs_coords)
+            right_dist = reference_cosmo_dist(grid_point, self.obs_coords)
+            np.testing.assert_allclose(returned_dist[0], right_dist[0])
+            np.testing.assert_allclose(returned_dist[1], right_dist[1])
+        self.assertEqual(len(self.distance._lnp_table), 4)
+
+    def test_batch_equals_call(self):
+        returned_2d, returned_vert = self.distance.batch(
+            self.grid_coords, self.obs_coords
+        )
+        self.assertTupleEqual(returned_2d.shape, (30, 20))
+        for k, grid_point in enumerate(self.grid_coords):
+            right_2d, right_vert = self.distance(grid_point, self.obs_coords)
+            np.testing.assert_allclose(returned_2d[k], right_2d)
+            np.testing.assert_allclose(returned_vert[k], right_vert)
+
+    def test_obs_cache_updated_for_new_obs(self):
+        _ = self.distance(self.grid_coords[0], self.obs_coords)
+        new_obs = self.obs_coords.copy()
+        new_obs['height'] = 0.
+        returned_vert = self.distance(self.grid_coords[0], new_obs)[1]
+        right_vert = reference_cosmo_dist(self.grid_coords[0], new_obs)[1]
+        np.testing.assert_allclose(returned_vert, right_vert)
+
+    def test_pickle_drops_obs_cache(self):
+        _ = self.distance(self.grid_coords[0], self.obs_coords)
+        unpickled = pickle.loads(pickle.dumps(self.distance))
+        self.assertIsNone(unpickled._obs_cache[0])
+        self.assertDictEqual(unpickled._lnp_table, self.distance._lnp_table)
+
+
+class TestClmDistance(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.obs_coords = pd.DataFrame({
+            'id': np.arange(20.),
+            'rlat': rnd.uniform(10, 12, size=20),
+            'rlon': rnd.uniform(-4, -1, size=20),
+            'height': rnd.uniform(0, 2, size=20),
+        })
+        grid_lat, grid_lon, grid_level = np.meshgrid(
+            np.linspace(50, 52, 4), np.linspace(6, 9, 5), [0., 0.5, 1.5],
+            indexing='ij'
+        )
+        self.grid_coords = np.stack([
+            np.zeros(grid_lat.size), grid_lat.ravel(), grid_lon.ravel(),
+            grid_level.ravel()
+        ], axis=-1)
+        self.transform = ShiftTransform()
+        self.distance = ClmDistance(self.transform, horiz_start=1)
+
+    def test_set_grid_transforms_unique_points_once(self):
+        self.distance.set_grid(
+            self.grid_coords[:, 1], self.grid_coords[:, 2]
+        )
+        self.assertEqual(self.transform.n_calls, 1)
+        self.assertEqual(len(self.distance._rotated), 20)
+        self.distance.set_grid(
+            self.grid_coords[:, 1], self.grid_coords[:, 2]
+        )
+        self.assertEqual(self.transform.n_calls, 1)
+
+    def test_call_equals_reference(self):
+        self.distance.set_grid(
+            self.grid_coords[:, 1], self.grid_coords[:, 2]
+        )
+        for grid_point in self.grid_coords:
+            returned_dist = self.distance(grid_point, self.obs_coords)
+            right_dist = reference_clm_dist(grid_point, self.obs_coords)
+            np.testing.assert_allclose(returned_dist[0], right_dist[0])
+            np.testing.assert_allclose(returned_dist[1], right_dist[1])
+        self.assertEqual(self.transform.n_calls, 1)
+
+    def test_call_transforms_unknown_point(self):
+        grid_point = np.array([0., 51.1, 7.3, 0.])
+        returned_dist = self.distance(grid_point, self.obs_coords)
+        right_dist = reference_clm_dist(grid_point, self.obs_coords)
+        np.testing.assert_allclose(returned_dist[0], right_dist[0])
+        self.assertIn((51.1, 7.3), self.distance._rotated)
+
+    def test_batch_equals_call(self):
+        returned_2d, returned_vert = self.distance.batch(
+            self.grid_coords, self.obs_coords
+        )
+        self.assertTupleEqual(returned_2d.shape, (60, 20))
+        for k, grid_point in enumerate(self.grid_coords):
+            right_2d, right_vert = reference_clm_dist(
+                grid_point, self.obs_coords
+            )
+            np.testing.assert_allclose(returned_2d[k], right_2d)
+            np.testing.assert_allclose(returned_vert[k], right_vert)
+
+    def test_pickle_keeps_grid(self):
+        self.distance.set_grid(
+            self.grid_coords[:, 1], self.grid_coords[:, 2]
+        )
+        _ = self.distance(self.grid_coords[0], self.obs_coords)
+        unpickled = pickle.loads(pickle.dumps(self.distance))
+        self.assertIsNone(unpickled._obs_cache[0])
+        self.assertDictEqual(unpickled._rotated, self.distance._rotated)
+
+
+class TestIndexedDistance(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.obs_coords = pd.DataFrame({
+            'id': np.arange(200.),
+            'lat': rnd.uniform(48, 54, size=200),
+            'lon': rnd.uniform(4, 11, size=200),
+            'height': rnd.uniform(0, 500, size=200),
+        })
+        self.grid_coords = np.stack([
+            np.zeros(30), rnd.uniform(50, 52, size=30),
+            rnd.uniform(6, 9, size=30),
+            rnd.choice([10., 100., 500., 1500.], size=30)
+        ], axis=-1)
+        self.distance = IndexedDistance(CosmoDistance(), cutoff=100000.)
+
+    def test_from_radius_uses_horizontal_radius(self):
+        distance = IndexedDistance.from_radius(CosmoDistance(), [50000, 0.3])
+        self.assertEqual(distance.cutoff, 100000.)
+        self.assertEqual(distance.fill_value, 200000.)
+
+    def test_select_returns_obs_within_cutoff(self):
+        right_2d = CosmoDistance().batch(self.grid_coords, self.obs_coords)[0]
+        obs_indices = self.distance.select(self.grid_coords, self.obs_coords)
+        for k, obs_index in enumerate(obs_indices):
+            right_index = np.where(right_2d[k] <= 100000.)[0]
+            np.testing.assert_equal(obs_index, right_index)
+        self.assertLess(len(obs_indices[0]), 200)
+
+    def test_call_equals_wrapped_within_cutoff(self):
+        wrapped = CosmoDistance()
+        for grid_point in self.grid_coords:
+            returned_2d, returned_vert = self.distance(
+                grid_point, self.obs_coords
+            )
+            right_2d, right_vert = wrapped(grid_point, self.obs_coords)
+            in_cutoff = right_2d <= 100000.
+            np.testing.assert_allclose(
+                returned_2d[in_cutoff], right_2d[in_cutoff]
+            )
+            np.testing.assert_allclose(
+                returned_vert[in_cutoff], right_vert[in_cutoff]
+            )
+            np.testing.assert_equal(returned_2d[~in_cutoff], 200000.)
+
+    def test_batch_equals_call(self):
+        returned_2d, returned_vert = self.distance.batch(
+            self.grid_coords, self.obs_coords
+        )
+        self.assertTupleEqual(returned_2d.shape, (30, 200))
+        for k, grid_point in enumerate(self.grid_coords):
+            right_2d, right_vert = self.distance(grid_point, self.obs_coords)
+            in_cutoff = right_2d <= 100000.
+            np.testing.assert_allclose(
+                returned_2d[k, in_cutoff], right_2d[in_cutoff]
+            )
+            np.testing.assert_allclose(
+                returned_vert[k, in_cutoff], right_vert[in_cutoff]
+            )
+
+    def test_converts_obs_once(self):
+        _ = self.distance(self.grid_coords[0], self.obs_coords)
+        obs_horiz, obs_lnp = self.distance.distance.get_obs(self.obs_coords)
+        for grid_point in self.grid_coords[1:]:
+            _ = self.distance(grid_point, self.obs_coords)
+        _ = self.distance.batch(self.grid_coords, self.obs_coords)
+        self.assertIs(self.distance.distance._obs_cache[0], self.obs_coords)
+        self.assertIs(self.distance.distance._obs_cache[1], obs_horiz)
+        self.assertIs(self.distance.distance._obs_cache[2], obs_lnp)
+
+    def test_tree_cached_per_obs_grid(self):
+        tree = self.distance.get_tree(self.obs_coords)
+        _ = self.distance(self.grid_coords[0], self.obs_coords)
+        self.assertIs(self.distance.get_tree(self.obs_coords), tree)
+        unpickled = pickle.loads(pickle.dumps(self.distance))
+        self.assertIsNone(unpickled._tree_cache[0])
+
+
+class TestArrayDistFunc(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.state_grid = pd.MultiIndex.from_product(
+            [np.linspace(50, 52, 4), np.linspace(6, 9, 5)],
+            names=['rlat', 'rlon']
+        )
+        self.obs_grid = pd.MultiIndex.from_arrays(
+            [rnd.uniform(50, 52, size=20), rnd.uniform(6, 9, size=20),
+             rnd.uniform(0, 500, size=20)],
+            names=['lat', 'lon', 'height']
+        )
+
+    def test_coords_to_array_multiindex(self):
+        returned_array = coords_to_array(self.state_grid)
+        self.assertTupleEqual(returned_array.shape, (20, 2))
+        self.assertEqual(returned_array.dtype, np.float64)
+        self.assertTrue(returned_array.flags['C_CONTIGUOUS'])
+        np.testing.assert_equal(
+            returned_array, np.array(self.state_grid.tolist())
+        )
+
+    def test_coords_to_array_object_array(self):
+        returned_array = coords_to_array(self.obs_grid.values)
+        np.testing.assert_equal(returned_array, coords_to_array(self.obs_grid))
+
+    def test_array_dist_func_equals_cart_dist_func(self):
+        state_coords = coords_to_array(self.state_grid)
+        obs_coords = coords_to_array(self.obs_grid)
+        for k, grid_point in enumerate(self.state_grid.values):
+            right_dist = cart_dist_func(grid_point, self.obs_grid.values)
+            returned_dist = array_dist_func(state_coords[k], obs_coords)
+            np.testing.assert_allclose(returned_dist, right_dist)
+
+
+if __name__ == '__main__':
+    unittest.main()
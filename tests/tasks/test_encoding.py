@@ -0,0 +1,92 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+
+# External modules
+import numpy as np
+import xarray as xr
+import netCDF4 as nc4
+
+# Internal modules
+from py_bacy.tasks.encoding import *
+from py_bacy.tasks.io import write_single_ens_mem
+from .test_io import create_ens_files
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestEncoding(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_get_profile_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            _ = get_profile('unknown')
+
+    def test_get_profile_name_from_config(self):
+        self.assertEqual(get_profile_name({}, 'analysis'), 'fast')
+        self.assertEqual(
+            get_profile_name({'encoding': 'archive'}, 'weights'), 'archive'
+        )
+        config = {'encoding': {'weights': 'balanced'}}
+        self.assertEqual(get_profile_name(config, 'weights'), 'balanced')
+        self.assertEqual(get_profile_name(config, 'info'), 'fast')
+
+    def test_get_var_encoding_lossy_only_for_floats(self):
+        float_encoding = get_var_encoding(np.float32, 'archive')
+        self.assertEqual(float_encoding['least_significant_digit'], 4)
+        int_encoding = get_var_encoding(np.int32, 'archive')
+        self.assertNotIn('least_significant_digit', int_encoding)
+        self.assertTrue(int_encoding['zlib'])
+        self.assertDictEqual(get_var_encoding(np.dtype('S1'), 'archive'), {})
+
+    def test_get_encoding_roundtrip(self):
+        ds = xr.Dataset({
+            'T': (('rlat', 'rlon'), np.random.normal(size=(10, 10))),
+            'idx': (('rlat', ), np.arange(10)),
+        })
+        file_path = os.path.join(self.data_dir, 'test.nc')
+        ds.to_netcdf(file_path, encoding=get_encoding(ds, 'archive'))
+        with xr.open_dataset(file_path) as ds_read:
+            np.testing.assert_allclose(
+                ds_read['T'].values, ds['T'].values, atol=1E-4
+            )
+            np.testing.assert_equal(ds_read['idx'].values, ds['idx'].values)
+            self.assertTrue(ds_read['T'].encoding['zlib'])
+
+    def test_overlay_uses_encoding_profile(self):
+        source_path = create_ens_files(self.data_dir, ens_size=1)[0][0]
+        target_path = os.path.join(self.data_dir, 'overlay.nc')
+        with xr.open_dataset(source_path) as ds_source:
+            ds_analysis = ds_source.load()
+        write_single_ens_mem(
+            source_path, target_path, ds_analysis, ['T'], strategy='overlay',
+            encoding_profile='balanced'
+        )
+        with nc4.Dataset(target_path) as nc_overlay:
+            var_filters = nc_overlay['T'].filters()
+            self.assertTrue(var_filters['zlib'])
+            self.assertTrue(var_filters['shuffle'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+
+# External modules
+import netCDF4 as nc4
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.handle_cache import HandleCache
+from .test_io import create_ens_files
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestHandleCache(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_paths = [
+            mem_paths[0] for mem_paths in create_ens_files(self.data_dir)
+        ]
+        self.cache = HandleCache(max_size=2)
+
+    def tearDown(self):
+        self.cache.clear()
+        shutil.rmtree(self.data_dir)
+
+    def test_get_returns_cached_handle(self):
+        handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        self.assertIs(self.cache.get(self.file_paths[0], nc4.Dataset), handle)
+        self.assertDictEqual(
+            self.cache.get_stats(), {'hits': 1, 'misses': 1, 'size': 1}
+        )
+
+    def test_get_separates_openers_and_kwargs(self):
+        nc_handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        xr_handle = self.cache.get(self.file_paths[0], xr.open_dataset)
+        self.assertIsNot(nc_handle, xr_handle)
+        _ = self.cache.get(
+            self.file_paths[0], xr.open_dataset, decode_times=False
+        )
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_get_evicts_least_recently_used(self):
+        first_handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        _ = self.cache.get(self.file_paths[1], nc4.Dataset)
+        _ = self.cache.get(self.file_paths[0], nc4.Dataset)
+        _ = self.cache.get(self.file_paths[2], nc4.Dataset)
+        self.assertEqual(len(self.cache), 2)
+        self.assertTrue(first_handle.isopen())
+        self.assertIs(self.cache.get(self.file_paths[0], nc4.Dataset),
+                      first_handle)
+        _ = self.cache.get(self.file_paths[1], nc4.Dataset)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_get_invalidates_rewritten_file(self):
+        old_handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        file_stat = os.stat(self.file_paths[0])
+        os.utime(
+            self.file_paths[0],
+            ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9)
+        )
+        new_handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        self.assertIsNot(new_handle, old_handle)
+        self.assertFalse(old_handle.isopen())
+        self.assertEqual(len(self.cache), 1)
+
+    def test_invalidate_closes_handles(self):
+        handle = self.cache.get(self.file_paths[0], nc4.Dataset)
+        self.cache.invalidate(self.file_paths[0])
+        self.assertFalse(handle.isopen())
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
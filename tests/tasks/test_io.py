@@ -0,0 +1,381 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+import time
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+from distributed import Client, LocalCluster
+
+# Internal modules
+from py_bacy.tasks.io import *
+from py_bacy.tasks.handle_cache import HANDLE_CACHE
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def create_ens_files(data_dir, ens_size=3, n_files=2):
+    file_paths = []
+    for mem in range(1, ens_size+1):
+        mem_paths = []
+        for file_num in range(n_files):
+            ds = xr.Dataset(
+                {
+                    'T': (('time', 'level', 'rlat', 'rlon'),
+                          np.random.normal(size=(1, 3, 4, 5))),
+                    'QV': (('time', 'level', 'rlat', 'rlon'),
+                           np.random.normal(size=(1, 3, 4, 5))),
+                    'T_2M': (('time', 'rlat', 'rlon'),
+                             np.random.normal(size=(1, 4, 5))),
+                },
+                coords={
+                    'time': [pd.Timestamp('2015-07-31 06:00') +
+                             pd.Timedelta(minutes=10*file_num)],
+                    'level': np.arange(3)
+                }
+            )
+            file_path = os.path.join(
+                data_dir, 'ens{0:03d}_{1:02d}.nc'.format(mem, file_num)
+            )
+            ds.to_netcdf(file_path)
+            mem_paths.append(file_path)
+        file_paths.append(mem_paths)
+    return file_paths
+
+
+def create_cosmo_file(file_path):
+    rlat = np.linspace(-2, 2, 4)
+    rlon = np.linspace(-3, 3, 5)
+    ds = xr.Dataset(
+        {
+            'T': (('time', 'level', 'rlat', 'rlon'),
+                  np.random.normal(size=(1, 3, 4, 5))),
+            'QV': (('time', 'level', 'rlat', 'rlon'),
+                   np.random.normal(size=(1, 3, 4, 5))),
+            'T_2M': (('time', 'height_2m', 'rlat', 'rlon'),
+                     np.random.normal(size=(1, 1, 4, 5))),
+            'vcoord': (('level1', ), np.array([22000., 500., 10., 0.])),
+            'rotated_pole': ((), 0),
+        },
+        coords={
+            'time': [pd.Timestamp('2015-07-31 06:00')],
+            'level': np.arange(1, 4),
+            'level1': np.arange(1, 5),
+            'height_2m': [2.],
+            'rlat': rlat,
+            'rlon': rlon,
+            'lat': (('rlat', 'rlon'), np.repeat(rlat[:, None], 5, axis=1)),
+            'lon': (('rlat', 'rlon'), np.repeat(rlon[None, :], 4, axis=0)),
+        }
+    )
+    for var_name in ('T', 'QV', 'T_2M'):
+        ds[var_name].attrs['grid_mapping'] = 'rotated_pole'
+    ds.to_netcdf(file_path)
+    return file_path
+
+
+def post_process_member(analysis, model_dataset):
+    analysis_dataset = model_dataset.copy()
+    analysis_dataset['T'] = analysis.clip(min=0)
+    return analysis_dataset
+
+
+class TestIOTasks(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_paths = create_ens_files(self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_load_ens_data_parallel_equals_serial(self):
+        ds_serial = load_ens_data.run(
+            file_paths=self.file_paths, parallel=False
+        )
+        ds_parallel = load_ens_data.run(
+            file_paths=self.file_paths, parallel=True
+        )
+        xr.testing.assert_identical(ds_parallel, ds_serial)
+        self.assertEqual(len(ds_parallel['ensemble']), 3)
+        self.assertEqual(len(ds_parallel['time']), 2)
+
+    def test_load_members_parallel_keeps_order(self):
+        ds_list = load_members_parallel(self.file_paths)
+        for mem_paths, ds_mem in zip(self.file_paths, ds_list):
+            ds_single = load_single_member(mem_paths)
+            xr.testing.assert_identical(ds_mem, ds_single)
+
+    def test_load_single_member_reuses_cached_handles(self):
+        HANDLE_CACHE.clear()
+        ds_first = load_single_member(self.file_paths[0], parallel=False)
+        self.assertEqual(HANDLE_CACHE.misses, 2)
+        ds_second = load_single_member(self.file_paths[0])
+        self.assertDictEqual(
+            HANDLE_CACHE.get_stats(), {'hits': 2, 'misses': 2, 'size': 2}
+        )
+        xr.testing.assert_identical(ds_second, ds_first)
+        with xr.open_mfdataset(
+                self.file_paths[0], combine='nested', concat_dim='time',
+                data_vars='minimal', coords='minimal', compat='override'
+        ) as ds_mf:
+            xr.testing.assert_identical(ds_first.load(), ds_mf.load())
+        HANDLE_CACHE.clear()
+
+    def test_write_closes_cached_target_handles(self):
+        HANDLE_CACHE.clear()
+        target_path = os.path.join(self.data_dir, 'target.nc')
+        shutil.copyfile(self.file_paths[1][0], target_path)
+        ds_target = load_single_member([target_path], parallel=False)
+        ds_analysis = ds_target.isel(time=0).load() + 1
+        write_single_ens_mem(
+            self.file_paths[0][0], target_path, ds_analysis, ['T'],
+            strategy='copy'
+        )
+        self.assertEqual(len(HANDLE_CACHE), 0)
+        with xr.open_dataset(target_path) as ds_written:
+            np.testing.assert_equal(
+                ds_written['T'].values[0], ds_analysis['T'].values
+            )
+        HANDLE_CACHE.clear()
+
+    def test_get_drop_variables_returns_unneeded_vars(self):
+        drop_vars, skipped_bytes = get_drop_variables(
+            self.file_paths[0][0], ['T']
+        )
+        self.assertListEqual(sorted(drop_vars), ['QV', 'T_2M'])
+        self.assertEqual(skipped_bytes, (3*4*5 + 4*5) * 8)
+
+    def test_get_drop_variables_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            _ = get_drop_variables(self.file_paths[0][0], ['U'])
+
+    def test_load_ens_data_pushes_down_variables(self):
+        ds_ens = load_ens_data.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        self.assertListEqual(list(ds_ens.data_vars), ['T'])
+        self.assertIn('level', ds_ens.coords)
+
+    def test_load_ens_data_keeps_auxiliary_variables(self):
+        cosmo_paths = [
+            create_cosmo_file(
+                os.path.join(self.data_dir, 'lffd{0:03d}.nc'.format(mem))
+            )
+            for mem in range(1, 4)
+        ]
+        ds_ens = load_ens_data.run(
+            file_paths=cosmo_paths, variables=['T', 'T_2M'],
+            keep_variables=['vcoord', 'HHL']
+        )
+        self.assertSetEqual(
+            set(ds_ens.data_vars), {'T', 'T_2M', 'vcoord', 'rotated_pole'}
+        )
+        self.assertIn('lat', ds_ens.coords)
+        self.assertIn('level1', ds_ens.dims)
+        np.testing.assert_equal(
+            ds_ens['vcoord'].isel(ensemble=0).values,
+            [22000., 500., 10., 0.]
+        )
+        ds_ens = load_ens_data.run(
+            file_paths=cosmo_paths, variables=['T', 'T_2M']
+        )
+        self.assertNotIn('vcoord', ds_ens.data_vars)
+
+    def test_copy_file_strategies_copy_content(self):
+        source_path = self.file_paths[0][0]
+        with open(source_path, 'rb') as source_file:
+            source_bytes = source_file.read()
+        for strategy in ('copy', 'sparse', 'reflink'):
+            target_path = os.path.join(self.data_dir, strategy)
+            used_strategy = copy_file(source_path, target_path, strategy)
+            self.assertIn(used_strategy, (strategy, 'copy'))
+            with open(target_path, 'rb') as target_file:
+                self.assertEqual(target_file.read(), source_bytes)
+
+    def test_copy_sparse_skips_zero_chunks(self):
+        source_path = os.path.join(self.data_dir, 'zeros')
+        with open(source_path, 'wb') as source_file:
+            source_file.write(bytes(64) + b'data' + bytes(60))
+        target_path = os.path.join(self.data_dir, 'zeros_copy')
+        copy_sparse(source_path, target_path, chunk_size=32)
+        with open(target_path, 'rb') as target_file:
+            self.assertEqual(target_file.read(), bytes(64) + b'data' +
+                             bytes(60))
+
+    def test_copy_file_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            copy_file(self.file_paths[0][0], 'test.nc', 'overlay')
+
+    def test_overlay_merge_equals_full_write(self):
+        source_path = self.file_paths[0][0]
+        with xr.open_dataset(source_path) as ds_source:
+            ds_analysis = ds_source.load() + 1
+        full_path = os.path.join(self.data_dir, 'full.nc')
+        overlay_path = os.path.join(self.data_dir, 'overlay.nc')
+        merged_path = os.path.join(self.data_dir, 'merged.nc')
+        write_single_ens_mem(
+            source_path, full_path, ds_analysis, ['T'], strategy='copy'
+        )
+        write_single_ens_mem(
+            source_path, overlay_path, ds_analysis, ['T'], strategy='overlay'
+        )
+        self.assertEqual(
+            get_overlay_base(overlay_path), os.path.realpath(source_path)
+        )
+        self.assertIsNone(get_overlay_base(full_path))
+        with xr.open_dataset(overlay_path) as ds_overlay:
+            self.assertListEqual(list(ds_overlay.data_vars), ['T'])
+        merge_overlay(overlay_path, merged_path)
+        with xr.open_dataset(full_path) as ds_full, \
+                xr.open_dataset(merged_path) as ds_merged:
+            xr.testing.assert_identical(ds_merged, ds_full)
+
+    def test_write_ens_data_writes_sliced_members(self):
+        source_paths = [mem_paths[0] for mem_paths in self.file_paths]
+        target_paths = [
+            os.path.join(self.data_dir, 'ana_{0:d}.nc'.format(mem))
+            for mem in range(len(source_paths))
+        ]
+        ds_analysis = load_ens_data.run(
+            file_paths=source_paths, parallel=False
+        ).load() + 1
+        with LocalCluster(n_workers=2, processes=False) as cluster, \
+                Client(cluster) as client:
+            write_ens_data.run(
+                ds_analysis, source_paths, target_paths, ['T'], client=client
+            )
+        for member_num, target_path in enumerate(target_paths):
+            with xr.open_dataset(target_path) as ds_written:
+                np.testing.assert_equal(
+                    ds_written['T'].values,
+                    ds_analysis['T'].isel(ensemble=member_num).values
+                )
+                np.testing.assert_allclose(
+                    ds_written['QV'].values,
+                    ds_analysis['QV'].isel(ensemble=member_num).values - 1
+                )
+
+    def test_load_ens_data_cached_equals_uncached(self):
+        ds_ens = load_ens_data.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        ds_cached = load_ens_data_cached.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        xr.testing.assert_allclose(ds_cached.load(), ds_ens.load())
+        cache_dir = os.path.join(self.data_dir, 'zarr_cache')
+        self.assertEqual(get_cache_dir(self.file_paths), cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        _ = load_ens_data_cached.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_convert_to_zarr_reuses_existing_store(self):
+        ds_ens = load_ens_data.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        store_path = os.path.join(self.data_dir, 'zarr_cache', 'test.zarr')
+        convert_to_zarr(ds_ens, store_path)
+        store_mtime = os.stat(store_path).st_mtime_ns
+        self.assertEqual(convert_to_zarr(ds_ens + 1, store_path), store_path)
+        self.assertEqual(os.stat(store_path).st_mtime_ns, store_mtime)
+        self.assertListEqual(
+            os.listdir(os.path.dirname(store_path)), ['test.zarr']
+        )
+        xr.testing.assert_allclose(
+            xr.open_zarr(store_path).load(), ds_ens.load()
+        )
+
+    def test_clean_zarr_cache_evicts_old_and_large(self):
+        ds_ens = load_ens_data.run(
+            file_paths=self.file_paths, variables=['T']
+        )
+        cache_dir = os.path.join(self.data_dir, 'zarr_cache')
+        store_paths = [
+            convert_to_zarr(
+                ds_ens, os.path.join(cache_dir, '{0:d}.zarr'.format(num))
+            )
+            for num in range(3)
+        ]
+        curr_time = time.time()
+        for num, store_path in enumerate(store_paths):
+            last_used = curr_time - (3-num) * 3600
+            os.utime(store_path, (last_used, last_used))
+        removed_paths = clean_zarr_cache(
+            cache_dir, max_age=2.5*3600, max_size=None
+        )
+        self.assertListEqual(removed_paths, store_paths[:1])
+        removed_paths = clean_zarr_cache(
+            cache_dir, max_age=None, max_size=0, keep=store_paths[1:2]
+        )
+        self.assertListEqual(removed_paths, store_paths[2:])
+        self.assertListEqual(os.listdir(cache_dir), ['1.zarr'])
+
+    def test_get_cache_key_changes_with_mtime(self):
+        old_key = get_cache_key(self.file_paths)
+        self.assertNotEqual(old_key, get_cache_key(self.file_paths, ['T']))
+        file_stat = os.stat(self.file_paths[0][0])
+        os.utime(
+            self.file_paths[0][0],
+            ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9)
+        )
+        self.assertNotEqual(old_key, get_cache_key(self.file_paths))
+
+    def test_stream_ens_data_writes_and_links_members(self):
+        source_paths = [mem_paths[0] for mem_paths in self.file_paths]
+        target_paths = [
+            os.path.join(self.data_dir, 'ana_{0:d}.nc'.format(mem))
+            for mem in range(len(source_paths))
+        ]
+        link_dirs = [
+            os.path.join(self.data_dir, 'link_{0:d}'.format(mem))
+            for mem in range(len(source_paths))
+        ]
+        for link_dir in link_dirs:
+            os.makedirs(link_dir)
+        model_dataset = load_ens_data.run(
+            file_paths=source_paths, parallel=False
+        )
+        analysis = model_dataset['T'] + 1
+        with LocalCluster(n_workers=2, processes=False) as cluster, \
+                Client(cluster) as client:
+            written_paths, linked_paths = stream_ens_data.run(
+                analysis, model_dataset, post_process_member, source_paths,
+                target_paths, ['T'], link_dirs=link_dirs, client=client
+            )
+        self.assertIsNotNone(analysis.chunks)
+        self.assertIsNotNone(model_dataset['QV'].chunks)
+        self.assertListEqual(written_paths, target_paths)
+        for member_num, linked_path in enumerate(linked_paths):
+            self.assertEqual(
+                os.path.realpath(linked_path),
+                os.path.realpath(target_paths[member_num])
+            )
+            with xr.open_dataset(linked_path) as ds_written:
+                np.testing.assert_allclose(
+                    ds_written['T'].values,
+                    analysis.isel(ensemble=member_num).clip(min=0).values
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+
+# External modules
+import numpy as np
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.mmap_io import *
+from py_bacy.tasks.io import load_ens_data
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def create_restart_files(data_dir, ens_size=3, **kwargs):
+    file_paths = []
+    for mem in range(1, ens_size+1):
+        h2osoi = np.random.uniform(size=(1, 6, 4))
+        h2osoi[0, 0, 0] = 1E36
+        ds = xr.Dataset({
+            'H2OSOI_LIQ': (('time', 'column', 'levtot'), h2osoi,
+                           {'units': 'kg/m2'}),
+            'WA': (('time', 'column'), np.random.uniform(size=(1, 6))),
+        })
+        ds['H2OSOI_LIQ'].encoding['_FillValue'] = 1E36
+        file_path = os.path.join(
+            data_dir, 'clm_{0:03d}.nc'.format(mem)
+        )
+        ds.to_netcdf(file_path, **kwargs)
+        file_paths.append(file_path)
+    return file_paths
+
+
+class TestMmapIO(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _assert_equals_xarray(self, file_paths):
+        ds_mmap = load_ens_mmap(file_paths, ['H2OSOI_LIQ', 'WA'])
+        self.assertIsNotNone(ds_mmap)
+        ds_xr = load_ens_data.run(
+            file_paths=file_paths, parallel=False,
+            variables=['H2OSOI_LIQ', 'WA']
+        ).load()
+        xr.testing.assert_identical(ds_mmap, ds_xr)
+        self.assertTrue(
+            np.isnan(ds_mmap['H2OSOI_LIQ'].values[:, 0, 0, 0]).all()
+        )
+
+    def test_get_file_format(self):
+        file_path = create_restart_files(
+            self.data_dir, ens_size=1, format='NETCDF3_64BIT'
+        )[0]
+        self.assertEqual(get_file_format(file_path), 'netcdf3')
+        file_path = create_restart_files(self.data_dir, ens_size=1)[0]
+        self.assertEqual(get_file_format(file_path), 'hdf5')
+
+    def test_load_ens_mmap_netcdf3(self):
+        file_paths = create_restart_files(
+            self.data_dir, format='NETCDF3_64BIT'
+        )
+        self._assert_equals_xarray(file_paths)
+
+    def test_load_ens_mmap_netcdf4_contiguous(self):
+        file_paths = create_restart_files(
+            self.data_dir, format='NETCDF4',
+            encoding={'H2OSOI_LIQ': {'contiguous': True,
+                                     '_FillValue': 1E36},
+                      'WA': {'contiguous': True}}
+        )
+        self._assert_equals_xarray(file_paths)
+
+    def test_load_ens_mmap_returns_none_for_compressed(self):
+        file_paths = create_restart_files(
+            self.data_dir, format='NETCDF4',
+            encoding={'H2OSOI_LIQ': {'zlib': True}}
+        )
+        self.assertIsNone(load_ens_mmap(file_paths, ['H2OSOI_LIQ']))
+
+    def test_load_ens_mmap_returns_none_for_missing_variable(self):
+        file_paths = create_restart_files(
+            self.data_dir, format='NETCDF3_64BIT'
+        )
+        self.assertIsNone(load_ens_mmap(file_paths, ['WA', 'H2OSOI_ICE']))
+
+
+if __name__ == '__main__':
+    unittest.main()
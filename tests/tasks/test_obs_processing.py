@@ -0,0 +1,231 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.obs_processing import superob_observations, \
+    background_check, TemporalLocalization, load_temporal_localization
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def create_obs(n_times=6):
+    obs_index = pd.MultiIndex.from_arrays(
+        [['S1', 'S2', 'S3', 'S4'], [50.01, 50.05, 50.09, 51.5],
+         [8.01, 8.02, 8.05, 9.5]],
+        names=['station_id', 'lat', 'lon']
+    )
+    rnd = np.random.RandomState(42)
+    ds_obs = xr.Dataset(
+        {
+            'observations': (
+                ('time', 'obs_grid_1'), rnd.normal(290, 2, size=(n_times, 4))
+            ),
+            'covariance': (('obs_grid_1', ), np.array([1., 1., 4., 1.])),
+        },
+        coords={
+            'time': pd.date_range('2015-07-31 00:10', periods=n_times,
+                                  freq='10min'),
+            'obs_grid_1': obs_index
+        }
+    )
+    return ds_obs
+
+
+class TestSuperob(unittest.TestCase):
+    def setUp(self):
+        self.ds_obs = create_obs()
+
+    def test_no_thinning_returns_same(self):
+        returned_ds = superob_observations(self.ds_obs)
+        xr.testing.assert_allclose(
+            returned_ds['observations'], self.ds_obs['observations']
+        )
+        xr.testing.assert_allclose(
+            returned_ds['covariance'], self.ds_obs['covariance']
+        )
+
+    def test_spatial_superob_averages_boxes(self):
+        returned_ds = superob_observations(self.ds_obs, box_size=0.5)
+        self.assertListEqual(
+            list(returned_ds.indexes['obs_grid_1'].get_level_values(
+                'station_id'
+            )), ['S2', 'S4']
+        )
+        right_values = self.ds_obs['observations'].values[:, :3].mean(axis=1)
+        np.testing.assert_allclose(
+            returned_ds['observations'].values[:, 0], right_values
+        )
+        np.testing.assert_allclose(returned_ds['covariance'], [6/9, 1.])
+
+    def test_temporal_superob_uses_last_time(self):
+        self.ds_obs['observations'][0, 0] = np.nan
+        returned_ds = superob_observations(self.ds_obs, time_bin='1h')
+        pd.testing.assert_index_equal(
+            returned_ds.indexes['time'],
+            pd.DatetimeIndex(['2015-07-31 01:00'], name='time')
+        )
+        obs_values = self.ds_obs['observations'].values
+        np.testing.assert_allclose(
+            returned_ds['observations'].values[0],
+            np.nanmean(obs_values, axis=0)
+        )
+        np.testing.assert_allclose(
+            returned_ds['covariance'].values,
+            np.array([1/5, 1/6, 4/6, 1/6])
+        )
+
+    def test_correlated_raises_value_error(self):
+        self.ds_obs['covariance'] = (
+            ('obs_grid_1', 'obs_grid_2'), np.eye(4)
+        )
+        with self.assertRaises(ValueError):
+            _ = superob_observations(self.ds_obs, box_size=0.5)
+
+
+class TestBackgroundCheck(unittest.TestCase):
+    def setUp(self):
+        self.ds_obs = create_obs()
+        rnd = np.random.RandomState(0)
+        fg_values = self.ds_obs['observations'].values + rnd.normal(
+            scale=0.1, size=(10, ) + self.ds_obs['observations'].shape
+        )
+        self.obs_equivalent = xr.DataArray(
+            fg_values, dims=('ensemble', 'time', 'obs_grid_1'),
+            coords={'time': self.ds_obs['time']}
+        )
+
+    def test_consistent_obs_are_kept(self):
+        returned_ds, summary = background_check(
+            self.ds_obs, self.obs_equivalent
+        )
+        xr.testing.assert_identical(returned_ds, self.ds_obs)
+        self.assertEqual(summary.loc[0, 'n_rejected'], 0)
+        self.assertEqual(summary.loc[0, 'n_obs'], 24)
+
+    def test_outliers_are_rejected(self):
+        self.ds_obs['observations'][1, 0] += 20
+        returned_ds, summary = background_check(
+            self.ds_obs, self.obs_equivalent, threshold=5.
+        )
+        self.assertTrue(np.isnan(returned_ds['observations'][1, 0]))
+        self.assertEqual(int(returned_ds['observations'].count()), 23)
+        self.assertEqual(summary.loc[0, 'n_rejected'], 1)
+        self.assertEqual(summary.loc[0, 'n_sites_dropped'], 0)
+
+    def test_sites_with_many_rejections_are_dropped(self):
+        self.ds_obs['observations'][:4, 3] += 20
+        returned_ds, summary = background_check(
+            self.ds_obs, self.obs_equivalent, max_reject_fraction=0.5
+        )
+        self.assertEqual(returned_ds.sizes['obs_grid_1'], 3)
+        self.assertNotIn(
+            'S4', returned_ds.indexes['obs_grid_1'].get_level_values(
+                'station_id'
+            )
+        )
+        self.assertEqual(summary.loc[0, 'n_sites_dropped'], 1)
+        self.assertEqual(summary.loc[0, 'n_obs_kept'], 18)
+
+    def test_times_without_obs_are_dropped(self):
+        self.ds_obs['observations'][2, :2] += 20
+        self.ds_obs['observations'][2, 2:] = np.nan
+        returned_ds, summary = background_check(
+            self.ds_obs, self.obs_equivalent, max_reject_fraction=0.5
+        )
+        self.assertEqual(returned_ds.sizes['time'], 5)
+        self.assertNotIn(
+            self.ds_obs.indexes['time'][2], returned_ds.indexes['time']
+        )
+        self.assertEqual(returned_ds.sizes['obs_grid_1'], 4)
+        self.assertEqual(summary.loc[0, 'n_times_dropped'], 1)
+        self.assertEqual(summary.loc[0, 'n_obs_kept'], 20)
+
+
+class TestTemporalLocalization(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.data_dir, 'loc_mat.nc')
+        self.analysis_times = pd.date_range(
+            '2015-07-31 00:00', periods=2, freq='1h'
+        )
+        timedelta = pd.timedelta_range('0min', periods=7, freq='10min')
+        loc_weights = np.array([
+            [0, 0.5, 1, 1, 0.5, 0.25, 0],
+            [1, 1, 1, 0, 0, 0, 0],
+        ])
+        xr.Dataset(
+            {'localization': (('analysis_time', 'timedelta'), loc_weights)},
+            coords={
+                'analysis_time': self.analysis_times, 'timedelta': timedelta
+            }
+        ).to_netcdf(self.file_path)
+        self.ds_obs = create_obs()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_localize_equals_expanded_division(self):
+        localization = TemporalLocalization.from_file(self.file_path)
+        returned_ds = localization.localize(
+            self.ds_obs, self.analysis_times[0]
+        )
+        right_times = pd.date_range(
+            '2015-07-31 00:10', periods=5, freq='10min', name='time'
+        )
+        pd.testing.assert_index_equal(
+            returned_ds.indexes['time'], right_times
+        )
+        right_weights = xr.DataArray(
+            [0.5, 1, 1, 0.5, 0.25], coords={'time': right_times},
+            dims=('time', )
+        )
+        right_cov = self.ds_obs['covariance'].expand_dims(time=right_times)
+        xr.testing.assert_allclose(
+            returned_ds['covariance'], right_cov / right_weights
+        )
+        xr.testing.assert_identical(
+            returned_ds['observations'],
+            self.ds_obs['observations'].sel(time=right_times)
+        )
+
+    def test_zero_weights_are_dropped(self):
+        localization = TemporalLocalization.from_file(self.file_path)
+        self.assertEqual(len(localization.get_weights(
+            self.analysis_times[1]
+        )), 3)
+        returned_ds = localization.localize(
+            self.ds_obs, self.analysis_times[1]
+        )
+        self.assertEqual(returned_ds.sizes['time'], 1)
+
+    def test_load_is_cached(self):
+        self.assertIs(
+            load_temporal_localization(self.file_path),
+            load_temporal_localization(self.file_path)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
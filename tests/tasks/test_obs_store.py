@@ -0,0 +1,124 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.obs_store import get_obs_store, load_obs_window
+import py_bacy.tasks.obs_store as obs_store
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def create_obs_file(file_path, n_stations=4, n_times=12):
+    rnd = np.random.RandomState(42)
+    ds_obs = xr.Dataset(
+        {
+            'observations': (
+                ('time', 'obs_grid_1'), rnd.normal(size=(n_times, n_stations))
+            ),
+            'covariance': (('obs_grid_1', ), np.ones(n_stations)),
+            'station_id': (
+                ('obs_grid_1', ),
+                np.array(['S{0:02d}'.format(k) for k in range(n_stations)])
+            ),
+            'calc_lat': (('obs_grid_1', ), np.linspace(50, 54, n_stations)),
+        },
+        coords={
+            'time': pd.date_range('2015-07-31 00:00', periods=n_times,
+                                  freq='15min'),
+        },
+        attrs={'multiindex': ['station_id', 'calc_lat']}
+    )
+    ds_obs.to_netcdf(file_path)
+
+
+def load_full_obs(file_path, start_time, end_time):
+    with xr.open_dataset(file_path) as ds_obs_raw:
+        ds_obs_raw = ds_obs_raw.load()
+    multiindex = list(ds_obs_raw.attrs['multiindex'])
+    ds_obs = ds_obs_raw.drop_vars(multiindex)
+    ds_obs['obs_grid_1'] = pd.MultiIndex.from_frame(
+        ds_obs_raw[multiindex].to_dataframe()[multiindex]
+    )
+    ds_obs.attrs = {}
+    return ds_obs.sel(time=slice(start_time, end_time))
+
+
+class TestObsStore(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.data_dir, 'obs.nc')
+        create_obs_file(self.file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_window_equals_full_file(self):
+        store_dir = get_obs_store(self.file_path)
+        start_time = pd.Timestamp('2015-07-31 00:30')
+        end_time = pd.Timestamp('2015-07-31 01:45')
+        returned_ds = load_obs_window(store_dir, start_time, end_time)
+        right_ds = load_full_obs(self.file_path, start_time, end_time)
+        xr.testing.assert_identical(
+            returned_ds[['observations', 'covariance']],
+            right_ds[['observations', 'covariance']]
+        )
+
+    def test_window_reads_only_overlapping_partitions(self):
+        store_dir = get_obs_store(self.file_path)
+        self.assertEqual(
+            len(obs_store._read_index(store_dir)['partitions']), 3
+        )
+        with patch('py_bacy.tasks.obs_store.xr.open_dataset',
+                   wraps=xr.open_dataset) as open_mock:
+            _ = load_obs_window(
+                store_dir, pd.Timestamp('2015-07-31 01:00'),
+                pd.Timestamp('2015-07-31 01:45')
+            )
+        opened_files = [
+            os.path.basename(call[0][0]) for call in open_mock.call_args_list
+        ]
+        self.assertListEqual(
+            opened_files, ['static.nc', 'obs_201507310100.nc']
+        )
+
+    def test_store_rebuilt_if_source_modified(self):
+        store_dir = get_obs_store(self.file_path)
+        with patch('py_bacy.tasks.obs_store.build_obs_store') as build_mock:
+            _ = get_obs_store(self.file_path)
+            build_mock.assert_not_called()
+        file_stat = os.stat(self.file_path)
+        os.utime(
+            self.file_path,
+            ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9)
+        )
+        with patch('py_bacy.tasks.obs_store.build_obs_store',
+                   return_value=store_dir) as build_mock:
+            _ = get_obs_store(self.file_path)
+            build_mock.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
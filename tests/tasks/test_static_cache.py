@@ -0,0 +1,102 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+from unittest.mock import MagicMock
+
+# External modules
+import numpy as np
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.static_cache import StaticDataCache
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def read_dataset(file_path):
+    with xr.open_dataset(file_path) as ds:
+        return ds.load()
+
+
+def read_array(file_path):
+    with xr.open_dataset(file_path) as ds:
+        return ds['HSURF'].values
+
+
+class TestStaticDataCache(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.data_dir, 'cosmo_const.nc')
+        xr.Dataset(
+            {'HSURF': (('rlat', 'rlon'), np.random.normal(size=(4, 5)))}
+        ).to_netcdf(self.file_path)
+        self.cache = StaticDataCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_get_decodes_only_once(self):
+        loader = MagicMock(side_effect=read_dataset, __qualname__='loader')
+        first_ds = self.cache.get(self.file_path, loader)
+        second_ds = self.cache.get(self.file_path, loader)
+        loader.assert_called_once()
+        xr.testing.assert_identical(first_ds, second_ds)
+        self.assertDictEqual(
+            self.cache.get_stats(), {'hits': 1, 'misses': 1, 'size': 1}
+        )
+
+    def test_get_returns_shallow_copy(self):
+        first_ds = self.cache.get(self.file_path, read_dataset)
+        first_ds['new_var'] = first_ds['HSURF'] * 2
+        second_ds = self.cache.get(self.file_path, read_dataset)
+        self.assertNotIn('new_var', second_ds.data_vars)
+
+    def test_get_reloads_modified_file(self):
+        loader = MagicMock(side_effect=read_dataset, __qualname__='loader')
+        _ = self.cache.get(self.file_path, loader)
+        file_stat = os.stat(self.file_path)
+        os.utime(
+            self.file_path,
+            ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9)
+        )
+        _ = self.cache.get(self.file_path, loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_persisted_objects_are_shared(self):
+        persist_dir = os.path.join(self.data_dir, 'static_cache')
+        right_array = StaticDataCache(persist_dir=persist_dir).get(
+            self.file_path, read_array
+        )
+        _ = StaticDataCache(persist_dir=persist_dir).get(
+            self.file_path, read_dataset
+        )
+        self.assertListEqual(
+            sorted(os.path.splitext(f)[1] for f in os.listdir(persist_dir)),
+            ['.npy', '.pkl']
+        )
+        loader = MagicMock(side_effect=read_array, __qualname__='read_array')
+        returned_array = StaticDataCache(persist_dir=persist_dir).get(
+            self.file_path, loader
+        )
+        loader.assert_not_called()
+        np.testing.assert_equal(returned_array, right_array)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+import os
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# External modules
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Internal modules
+from py_bacy.tasks.stencil import T2mStencil, get_t2m_stencil, LAPSE_RATE, \
+    build_idw_matrix, get_idw_matrix, latlon_to_cartesian
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestT2mStencil(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.grid_lat, self.grid_lon = np.meshgrid(
+            np.linspace(50, 52, 5), np.linspace(6, 9, 7), indexing='ij'
+        )
+        rnd = np.random.RandomState(42)
+        self.grid_height = rnd.uniform(0, 500, size=self.grid_lat.shape)
+        self.station_pos = np.array([[0, 0], [2, 3], [4, 6]])
+        self.station_lat = self.grid_lat[tuple(self.station_pos.T)] + 0.01
+        self.station_lon = self.grid_lon[tuple(self.station_pos.T)] - 0.01
+        self.station_height = np.array([10., 200., 300.])
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def get_coords(self):
+        return (
+            self.station_lat, self.station_lon, self.station_height,
+            self.grid_lat, self.grid_lon, self.grid_height
+        )
+
+    def test_nearest_neighbour_equals_direct_indexing(self):
+        stencil = T2mStencil.from_coords(*self.get_coords())
+        t2m = np.random.normal(280, 5, size=(3, 4) + self.grid_lat.shape)
+        returned_t2m = stencil.apply(t2m.reshape(3, 4, -1))
+        model_height = self.grid_height[tuple(self.station_pos.T)]
+        right_t2m = (
+            t2m[..., self.station_pos[:, 0], self.station_pos[:, 1]]
+            + LAPSE_RATE * (model_height - self.station_height)
+        )
+        np.testing.assert_allclose(returned_t2m, right_t2m)
+
+    def test_inverse_distance_weights_sum_to_one(self):
+        stencil = T2mStencil.from_coords(*self.get_coords(), n_neighbors=4)
+        self.assertEqual(stencil.matrix.nnz, 12)
+        np.testing.assert_allclose(stencil.matrix.sum(axis=1).A1, 1)
+
+    def test_save_load_roundtrip(self):
+        stencil = T2mStencil.from_coords(*self.get_coords(), n_neighbors=2)
+        file_path = os.path.join(self.data_dir, 'stencil.npz')
+        stencil.save(file_path)
+        loaded_stencil = T2mStencil.load(file_path)
+        np.testing.assert_equal(
+            loaded_stencil.matrix.toarray(), stencil.matrix.toarray()
+        )
+        np.testing.assert_equal(
+            loaded_stencil.height_diff, stencil.height_diff
+        )
+
+    def test_get_stencil_persists_and_reuses(self):
+        stencil = get_t2m_stencil(*self.get_coords(), cache_dir=self.data_dir)
+        self.assertIs(
+            get_t2m_stencil(*self.get_coords(), cache_dir=self.data_dir),
+            stencil
+        )
+        self.assertEqual(len(os.listdir(self.data_dir)), 1)
+        with patch('py_bacy.tasks.stencil._STENCILS', {}), \
+                patch.object(T2mStencil, 'from_coords') as build_mock:
+            _ = get_t2m_stencil(*self.get_coords(), cache_dir=self.data_dir)
+            build_mock.assert_not_called()
+
+
+def reference_idw(lat_lon_src, lat_lon_trg, weights):
+    cart_src = latlon_to_cartesian(
+        lat_lon_src[..., 0], lat_lon_src[..., 1]
+    ).reshape(-1, 3) * 6371000
+    cart_trg = latlon_to_cartesian(
+        lat_lon_trg[..., 0], lat_lon_trg[..., 1]
+    ).reshape(-1, 3) * 6371000
+    dist, neighbors = cKDTree(cart_src).query(cart_trg, k=4)
+    inv_dist_squared = 1 / np.power(dist, 2)
+    lam = inv_dist_squared / np.sum(inv_dist_squared, axis=-1)[:, None]
+    return np.sum(weights[..., neighbors] * lam, axis=-1)
+
+
+class TestIdwMatrix(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.lat_lon_src = np.stack(np.meshgrid(
+            np.linspace(50, 52, 5), np.linspace(6, 9, 7), indexing='ij'
+        ), axis=-1)
+        self.lat_lon_trg = np.stack(np.meshgrid(
+            np.linspace(50.1, 51.9, 8), np.linspace(6.1, 8.9, 9),
+            indexing='ij'
+        ), axis=-1)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_matrix_product_equals_neighbour_sum(self):
+        matrix = build_idw_matrix(self.lat_lon_src, self.lat_lon_trg)
+        self.assertTupleEqual(matrix.shape, (72, 35))
+        weights = np.random.normal(size=(3, 2, 35))
+        returned_weights = (matrix @ weights.reshape(-1, 35).T).T
+        right_weights = reference_idw(
+            self.lat_lon_src, self.lat_lon_trg, weights
+        )
+        np.testing.assert_allclose(
+            returned_weights.reshape(3, 2, 72), right_weights
+        )
+
+    def test_get_idw_matrix_persists_and_reuses(self):
+        matrix = get_idw_matrix(
+            self.lat_lon_src, self.lat_lon_trg, cache_dir=self.data_dir
+        )
+        self.assertEqual(len(os.listdir(self.data_dir)), 1)
+        with patch('py_bacy.tasks.stencil._IDW_MATRICES', {}), \
+                patch('py_bacy.tasks.stencil.build_idw_matrix') as build_mock:
+            loaded_matrix = get_idw_matrix(
+                self.lat_lon_src, self.lat_lon_trg, cache_dir=self.data_dir
+            )
+            build_mock.assert_not_called()
+        np.testing.assert_equal(loaded_matrix.toarray(), matrix.toarray())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Created on 18.10.26
+#
+# Created for py_bacy
+#
+# @author: Tobias Sebastian Finn, tobias.sebastian.finn@uni-hamburg.de
+#
+#    Copyright (C) {2026}  {Tobias Sebastian Finn}
+
+
+# System modules
+import unittest
+import logging
+
+# External modules
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Internal modules
+from py_bacy.tasks.weight_interp import get_columns, get_levels, \
+    coarsen_columns, get_coarse_points, interpolate_ens_weights, \
+    apply_ens_weights, apply_interpolated_weights
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestWeightInterp(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.ens_mems = 5
+        self.grid_index = pd.MultiIndex.from_product(
+            [np.linspace(-2, 2, 9), np.linspace(-3, 3, 7), [0., 1., 2.]],
+            names=['rlat', 'rlon', 'vgrid']
+        )
+        self.background = xr.DataArray(
+            rnd.normal(size=(2, 1, self.ens_mems, len(self.grid_index))),
+            coords={
+                'var_name': ['T', 'QV'],
+                'time': pd.date_range('2015-07-31 12:00', periods=1),
+                'ensemble': np.arange(self.ens_mems),
+                'grid': self.grid_index
+            },
+            dims=['var_name', 'time', 'ensemble', 'grid']
+        )
+
+    def test_get_columns_splits_horizontal(self):
+        column_of_grid, column_coords, column_first = get_columns(
+            self.grid_index
+        )
+        self.assertTupleEqual(column_coords.shape, (63, 2))
+        np.testing.assert_equal(column_of_grid, np.repeat(np.arange(63), 3))
+        np.testing.assert_equal(column_first, np.arange(0, 189, 3))
+
+    def test_coarsen_columns_keeps_every_nth(self):
+        _, column_coords, _ = get_columns(self.grid_index)
+        coarse_columns = coarsen_columns(column_coords, stride=2)
+        self.assertEqual(len(coarse_columns), 5*4)
+        np.testing.assert_equal(
+            np.unique(column_coords[coarse_columns, 0]),
+            np.linspace(-2, 2, 9)[::2]
+        )
+        np.testing.assert_equal(
+            coarsen_columns(column_coords, stride=1), np.arange(63)
+        )
+
+    def test_get_levels_splits_vertical(self):
+        level_of_grid, n_levels = get_levels(self.grid_index)
+        self.assertEqual(n_levels, 3)
+        np.testing.assert_equal(level_of_grid, np.tile(np.arange(3), 63))
+        horiz_index = self.grid_index.droplevel('vgrid').unique()
+        level_of_grid, n_levels = get_levels(horiz_index)
+        self.assertEqual(n_levels, 1)
+        np.testing.assert_equal(level_of_grid, 0)
+
+    def test_get_coarse_points_returns_all_levels(self):
+        coarse_points, coarse_coords = get_coarse_points(
+            self.grid_index, stride=2
+        )
+        self.assertTupleEqual(coarse_points.shape, (3, 20))
+        self.assertTupleEqual(coarse_coords.shape, (20, 2))
+        column_of_grid, column_coords, _ = get_columns(self.grid_index)
+        level_of_grid, _ = get_levels(self.grid_index)
+        np.testing.assert_equal(
+            level_of_grid[coarse_points],
+            np.repeat(np.arange(3)[:, None], 20, axis=1)
+        )
+        np.testing.assert_equal(
+            column_coords[column_of_grid[coarse_points]],
+            np.broadcast_to(coarse_coords, (3, 20, 2))
+        )
+
+    def test_get_coarse_points_raises_missing_level(self):
+        with self.assertRaises(ValueError):
+            _ = get_coarse_points(self.grid_index[1:], stride=1)
+
+    def test_interpolation_exact_at_coarse_columns(self):
+        _, column_coords, _ = get_columns(self.grid_index)
+        coarse_columns = coarsen_columns(column_coords, stride=2)
+        coarse_weights = np.random.normal(
+            size=(len(coarse_columns), self.ens_mems, self.ens_mems)
+        )
+        column_weights = interpolate_ens_weights(
+            coarse_weights, column_coords[coarse_columns], column_coords
+        )
+        self.assertTupleEqual(
+            column_weights.shape, (63, self.ens_mems, self.ens_mems)
+        )
+        np.testing.assert_allclose(
+            column_weights[coarse_columns], coarse_weights
+        )
+
+    def test_apply_identity_returns_background(self):
+        column_of_grid, column_coords, _ = get_columns(self.grid_index)
+        weights = np.tile(np.eye(self.ens_mems), (len(column_coords), 1, 1))
+        analysis = apply_ens_weights(
+            self.background, weights, column_of_grid, chunk_size=50
+        )
+        self.assertTupleEqual(analysis.dims, self.background.dims)
+        xr.testing.assert_allclose(analysis, self.background)
+
+    def test_apply_equals_reference(self):
+        column_of_grid, column_coords, _ = get_columns(self.grid_index)
+        weights = np.random.normal(
+            size=(len(column_coords), self.ens_mems, self.ens_mems)
+        )
+        analysis = apply_ens_weights(
+            self.background, weights, column_of_grid, chunk_size=50
+        )
+        bg_mean = self.background.mean('ensemble')
+        bg_perts = self.background - bg_mean
+        for grid_idx in [0, 10, 100]:
+            point_weights = weights[column_of_grid[grid_idx]]
+            right_analysis = bg_mean[..., grid_idx].values[..., None] + (
+                bg_perts[..., grid_idx].values @ point_weights
+            )
+            np.testing.assert_allclose(
+                analysis[..., grid_idx].values, right_analysis
+            )
+
+    def test_apply_interpolated_transforms_columns(self):
+        _, column_coords, _ = get_columns(self.grid_index)
+        coarse_coords = column_coords + np.array([10., 20.])
+        weights = np.random.normal(
+            size=(len(coarse_coords), self.ens_mems, self.ens_mems)
+        )
+        column_of_grid, _, _ = get_columns(self.grid_index)
+        right_analysis = apply_ens_weights(
+            self.background, weights, column_of_grid
+        )
+        returned_analysis = apply_interpolated_weights(
+            self.background, weights, coarse_coords,
+            coords_transform=lambda coords: coords + np.array([10., 20.])
+        )
+        xr.testing.assert_allclose(returned_analysis, right_analysis)
+
+    def test_apply_interpolated_uses_level_weights(self):
+        coarse_points, coarse_coords = get_coarse_points(
+            self.grid_index, stride=1
+        )
+        weights = np.random.normal(
+            size=(3, len(coarse_coords), self.ens_mems, self.ens_mems)
+        )
+        returned_analysis = apply_interpolated_weights(
+            self.background, weights, coarse_coords
+        )
+        for level in range(3):
+            right_analysis = apply_ens_weights(
+                self.background, weights[level],
+                get_columns(self.grid_index)[0]
+            )
+            level_points = coarse_points[level]
+            xr.testing.assert_allclose(
+                returned_analysis.isel(grid=level_points),
+                right_analysis.isel(grid=level_points)
+            )
+        with self.assertRaises(ValueError):
+            _ = apply_interpolated_weights(
+                self.background, weights[:2], coarse_coords
+            )
+
+    def test_apply_interpolated_level_uses_lowest_height(self):
+        heights = [22000., 2., 500., 10.]
+        grid_index = pd.MultiIndex.from_product(
+            [np.linspace(-2, 2, 5), np.linspace(-3, 3, 4), heights],
+            names=['rlat', 'rlon', 'vgrid']
+        )
+        level_of_grid, n_levels = get_levels(grid_index)
+        self.assertEqual(n_levels, 4)
+        np.testing.assert_equal(level_of_grid[:4], [3, 0, 2, 1])
+        background = xr.DataArray(
+            np.random.normal(size=(self.ens_mems, len(grid_index))),
+            coords={'ensemble': np.arange(self.ens_mems), 'grid': grid_index},
+            dims=['ensemble', 'grid']
+        )
+        column_of_grid, column_coords, _ = get_columns(grid_index)
+        weights = np.random.normal(
+            size=(4, len(column_coords), self.ens_mems, self.ens_mems)
+        )
+        returned_analysis = apply_interpolated_weights(
+            background, weights, column_coords, level=0
+        )
+        right_analysis = apply_ens_weights(
+            background, weights[level_of_grid[1]], column_of_grid
+        )
+        xr.testing.assert_allclose(returned_analysis, right_analysis)
+
+
+if __name__ == '__main__':
+    unittest.main()